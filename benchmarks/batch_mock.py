@@ -0,0 +1,238 @@
+# Copyright (c) 2024 Microsoft Corporation.
+
+"""Local mock of the OpenAI Files/Batches endpoints, exercising the batch LLMs end to end.
+
+Run from the repository root with `python -m benchmarks.batch_mock`. `MockBatchServer` is
+an `httpx.MockTransport` handler answering every chat completion with an echo of its last
+message (or a 400 error for the message "bad") and every embeddings request with a fixed
+vector, completing each batch `completion_delay` seconds after its submission. The script checks the responses,
+the error, the cache and the deadline of the batch LLMs built on it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+import time
+from typing import Any
+
+import httpx
+import openai
+
+from fnllm.caching.base import Cache
+from fnllm.openai import (
+    PublicOpenAIConfig,
+    create_openai_batch_chat_llm,
+    create_openai_batch_client,
+    create_openai_batch_embeddings_llm,
+)
+from fnllm.services.errors import BatchRequestError, DeadlineExceededError
+
+
+class MockBatchServer:
+    """Serves the Files and Batches endpoints from memory."""
+
+    def __init__(self, *, completion_delay: float = 0):
+        """Create a new MockBatchServer completing its batches after `completion_delay` seconds."""
+        self.completion_delay = completion_delay
+        self.files: dict[str, str] = {}
+        self.batches: dict[str, dict[str, Any]] = {}
+        self._completes_at: dict[str, float] = {}
+
+    def client(self) -> openai.AsyncOpenAI:
+        """Create an OpenAI client talking to this server."""
+        return openai.AsyncOpenAI(
+            api_key="mock",
+            base_url="http://mock/v1",
+            http_client=httpx.AsyncClient(transport=httpx.MockTransport(self.handle)),
+        )
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        """Answer one HTTP request."""
+        path = request.url.path
+        if request.method == "POST" and path.endswith("/files"):
+            return self._create_file(request)
+        if request.method == "POST" and path.endswith("/batches"):
+            return self._create_batch(json.loads(request.content))
+        if match := re.search(r"/batches/([^/]+)$", path):
+            return httpx.Response(200, json=self._retrieve_batch(match.group(1)))
+        if match := re.search(r"/files/([^/]+)/content$", path):
+            return httpx.Response(200, content=self.files[match.group(1)].encode())
+        return httpx.Response(404, json={"error": {"message": f"no route {path}"}})
+
+    def _create_file(self, request: httpx.Request) -> httpx.Response:
+        boundary = request.headers["content-type"].split("boundary=")[1].encode()
+        content = b""
+        for part in request.content.split(b"--" + boundary):
+            headers, _, body = part.partition(b"\r\n\r\n")
+            if b'name="file"' in headers:
+                content = body.removesuffix(b"\r\n")
+
+        file_id = f"file-{len(self.files)}"
+        self.files[file_id] = content.decode()
+        return httpx.Response(
+            200,
+            json={
+                "id": file_id,
+                "object": "file",
+                "bytes": len(content),
+                "created_at": 0,
+                "filename": "batch.jsonl",
+                "purpose": "batch",
+                "status": "processed",
+            },
+        )
+
+    def _create_batch(self, body: dict[str, Any]) -> httpx.Response:
+        batch_id = f"batch-{len(self.batches)}"
+        output = [
+            json.dumps(self._answer(json.loads(line)))
+            for line in self.files[body["input_file_id"]].splitlines()
+            if line.strip()
+        ]
+        output_file_id = f"file-output-{batch_id}"
+        self.files[output_file_id] = "\n".join(output)
+        self.batches[batch_id] = {
+            "id": batch_id,
+            "object": "batch",
+            "endpoint": body["endpoint"],
+            "input_file_id": body["input_file_id"],
+            "completion_window": body["completion_window"],
+            "status": "in_progress",
+            "created_at": 0,
+            "output_file_id": output_file_id,
+        }
+        self._completes_at[batch_id] = time.monotonic() + self.completion_delay
+        return httpx.Response(200, json=self.batches[batch_id])
+
+    def _retrieve_batch(self, batch_id: str) -> dict[str, Any]:
+        batch = self.batches[batch_id]
+        if time.monotonic() >= self._completes_at[batch_id]:
+            batch["status"] = "completed"
+        return batch
+
+    def _answer(self, request: dict[str, Any]) -> dict[str, Any]:
+        body = request["body"]
+        if request["url"].endswith("/embeddings"):
+            inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+            response = {
+                "object": "list",
+                "model": body["model"],
+                "data": [
+                    {"object": "embedding", "index": index, "embedding": [0.1, 0.2]}
+                    for index in range(len(inputs))
+                ],
+                "usage": {"prompt_tokens": len(inputs), "total_tokens": len(inputs)},
+            }
+            return _line(request, 200, response)
+
+        content = body["messages"][-1]["content"]
+        if content == "bad":
+            return _line(request, 400, {"error": {"message": "bad request"}})
+
+        response = {
+            "id": request["custom_id"],
+            "object": "chat.completion",
+            "created": 0,
+            "model": body["model"],
+            "choices": [
+                {
+                    "index": 0,
+                    "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": f"echo {content}"},
+                }
+            ],
+            "usage": {"prompt_tokens": 3, "completion_tokens": 2, "total_tokens": 5},
+        }
+        return _line(request, 200, response)
+
+
+def _line(request: dict[str, Any], status_code: int, body: Any) -> dict[str, Any]:
+    return {
+        "id": f"response-{request['custom_id']}",
+        "custom_id": request["custom_id"],
+        "response": {"status_code": status_code, "body": body},
+        "error": None,
+    }
+
+
+class _MemoryCache(Cache):
+    def __init__(self):
+        self._values: dict[str, Any] = {}
+
+    async def has(self, key: str) -> bool:
+        return key in self._values
+
+    async def get(self, key: str) -> Any | None:
+        return self._values.get(key, {}).get("result")
+
+    async def remove(self, key: str) -> None:
+        self._values.pop(key, None)
+
+    async def clear(self) -> None:
+        self._values.clear()
+
+    async def set(
+        self, key: str, value: Any, metadata: dict[str, Any] | None = None
+    ) -> None:
+        self._values[key] = {"result": value, "metadata": metadata}
+
+    def child(self, key: str) -> _MemoryCache:
+        return self
+
+
+async def main() -> None:
+    """Run the batch LLMs against the mock server."""
+    server = MockBatchServer(completion_delay=0.2)
+    config = PublicOpenAIConfig(
+        api_key="mock",
+        model="gpt-4o",
+        batch_flush_interval=0.05,
+        batch_poll_interval=0.05,
+    )
+    batch_client = create_openai_batch_client(config, client=server.client())
+    chat = create_openai_batch_chat_llm(
+        config, batch_client=batch_client, cache=_MemoryCache()
+    )
+    embeddings = create_openai_batch_embeddings_llm(
+        config.model_copy(update={"model": "text-embedding-3-small"}),
+        batch_client=batch_client,
+    )
+
+    answers = await asyncio.gather(*(chat(f"question {i}") for i in range(5)))
+    assert [answer.output.content for answer in answers] == [
+        f"echo question {i}" for i in range(5)
+    ]
+    assert len(server.batches) == 1
+
+    vectors = await embeddings(["a", "b"])
+    assert vectors.output.embeddings == [[0.1, 0.2], [0.1, 0.2]]
+
+    try:
+        await chat("bad")
+    except BatchRequestError:
+        pass
+    else:
+        raise AssertionError("a failed batch request must raise")
+
+    batches = len(server.batches)
+    cached = await chat("question 1")
+    assert cached.output.content == "echo question 1"
+    assert len(server.batches) == batches
+
+    start = time.monotonic()
+    try:
+        await chat("late", timeout=0.1)
+    except DeadlineExceededError:
+        pass
+    else:
+        raise AssertionError("a batch outliving the deadline must raise")
+    assert time.monotonic() - start < 0.2
+
+    await batch_client.aclose()
+    print(f"ok: {len(server.batches)} batches")  # noqa: T201
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,72 @@
+# Copyright (c) 2024 Microsoft Corporation.
+
+"""Import time regression benchmark.
+
+Run with `python benchmarks/import_time.py`. Imports every package in a fresh interpreter
+with `python -X importtime`, keeps the best of a few runs, and exits with an error when a
+package exceeds its budget or loads a heavy dependency that should only load on first use.
+"""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+
+_RUNS = 5
+
+_BUDGETS_MS: dict[str, float] = {
+    "fnllm": 5,
+    "fnllm.openai": 60,
+    "fnllm.caching": 100,
+    "fnllm.limiting": 150,
+    "fnllm.events": 350,
+    "fnllm.base": 350,
+}
+"""Max cumulative import time of each package, in milliseconds (about 1.5x the times
+measured when the budgets were set, most of it being pydantic and asyncio)."""
+
+_LAZY_MODULES = ("openai", "tiktoken", "azure", "langfuse")
+"""Heavy modules importing the packages must not load."""
+
+
+def _import(package: str) -> tuple[float, list[str]]:
+    """Import `package` in a fresh interpreter, get its import time (ms) and the lazy modules it loaded."""
+    code = (
+        f"import {package}, sys; "
+        f"print(','.join(m for m in {_LAZY_MODULES!r} if m in sys.modules))"
+    )
+    process = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative_us = 0
+    for line in process.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        _, cumulative, name = line.rsplit("|", 2)
+        if name.strip() == package:
+            cumulative_us = int(cumulative)
+    loaded = [module for module in process.stdout.strip().split(",") if module]
+    return cumulative_us / 1e3, loaded
+
+
+def main() -> int:
+    """Run the benchmark, returning the exit code."""
+    failed = False
+    for package, budget in _BUDGETS_MS.items():
+        runs = [_import(package) for _ in range(_RUNS)]
+        elapsed = min(elapsed for elapsed, _ in runs)
+        loaded = runs[0][1]
+        ok = elapsed <= budget and not loaded
+        failed |= not ok
+        print(  # noqa: T201
+            f"{'ok' if ok else 'FAIL':>4} {package:<16} {elapsed:7.1f}ms "
+            f"(budget {budget:g}ms)"
+            + (f", loaded {', '.join(loaded)}" if loaded else "")
+        )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+# Copyright (c) 2024 Microsoft Corporation.
+
+"""Microbenchmarks of the limiter token bucket against aiolimiter.
+
+Run from the repository root with `python -m benchmarks.token_bucket`. The aiolimiter
+numbers are only reported when it is installed (`pip install aiolimiter`).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any
+
+from fnllm.limiting.token_bucket import TokenBucket
+
+try:
+    from aiolimiter import AsyncLimiter
+except ImportError:
+    AsyncLimiter = None
+
+
+def _create(kind: str, rate: float, capacity: float) -> Any:
+    if kind == "TokenBucket":
+        return TokenBucket(rate, capacity)
+    return AsyncLimiter(capacity, time_period=capacity / rate)
+
+
+async def _uncontended(kind: str, iterations: int = 100_000) -> float:
+    """Seconds per acquisition when the bucket always has capacity."""
+    bucket = _create(kind, 1e12, 1e12)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await bucket.acquire(1)
+    return (time.perf_counter() - start) / iterations
+
+
+async def _contended(kind: str, waiters: int = 500, rate: float = 1_000) -> float:
+    """Extra seconds, on top of the ideal refill time, to serve many queued waiters."""
+    bucket = _create(kind, rate, 1)
+    start = time.perf_counter()
+    await asyncio.gather(*(bucket.acquire(1) for _ in range(waiters)))
+    return time.perf_counter() - start - (waiters - 1) / rate
+
+
+async def _wakeup_lag(kind: str, samples: int = 20, rate: float = 50) -> float:
+    """Mean lateness (seconds) of a single waiter compared to when its token is available."""
+    bucket = _create(kind, rate, 1)
+    lag = 0.0
+    for _ in range(samples):
+        await bucket.acquire(1)
+        start = time.perf_counter()
+        await bucket.acquire(1)
+        lag += time.perf_counter() - start - 1 / rate
+    return lag / samples
+
+
+async def main() -> None:
+    """Run the benchmarks."""
+    kinds = ["TokenBucket"] + (["aiolimiter"] if AsyncLimiter else [])
+    for kind in kinds:
+        uncontended = await _uncontended(kind)
+        contended = await _contended(kind)
+        lag = await _wakeup_lag(kind)
+        print(  # noqa: T201
+            f"{kind:>12}: uncontended {uncontended * 1e6:7.2f}us/acquire, "
+            f"contended overhead {contended * 1e3:8.2f}ms, "
+            f"wakeup lag {lag * 1e3:6.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,66 @@
+# Copyright (c) 2024 Microsoft Corporation.
+
+"""Microbenchmark of the tracing overhead on the LLM invocation hot path.
+
+Run from the repository root with `python -m benchmarks.tracing`. Invokes an LLM
+answering instantly behind a rate limiter and a retryer, with tracing off, at `info`
+level and at `debug` level (the records are dropped by the sink, so only the tracing cost
+is measured).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any
+
+from fnllm.base.base import BaseLLM
+from fnllm.limiting.concurrency import ConcurrencyLimiter
+from fnllm.services.rate_limiter import RateLimiter
+from fnllm.services.retryer import Retryer
+from fnllm.utils.tracing import configure_tracing
+
+
+class _RateLimiter(RateLimiter):
+    def _estimate_request_tokens(self, prompt: Any, kwargs: Any) -> int:
+        return 1
+
+
+class _Retryer(Retryer):
+    async def _on_retryable_error(self, error: BaseException) -> None:
+        pass
+
+
+class _LLM(BaseLLM):
+    async def _execute_llm(self, prompt: Any, **kwargs: Any) -> Any:
+        return prompt
+
+
+def _create() -> _LLM:
+    return _LLM(
+        rate_limiter=_RateLimiter(ConcurrencyLimiter.from_max_concurrency(1_000)),
+        retryer=_Retryer(retryable_errors=[], tag="benchmark", max_retries=1),
+    )
+
+
+async def _throughput(level: str | None, invocations: int = 20_000) -> float:
+    """Invocations per second, `invocations` at a time."""
+    configure_tracing(level, sinks=[lambda record: None])
+    llm = _create()
+    start = time.perf_counter()
+    await asyncio.gather(*(llm("prompt", name="benchmark") for _ in range(invocations)))
+    return invocations / (time.perf_counter() - start)
+
+
+async def main() -> None:
+    """Run the benchmarks."""
+    # warm up
+    await _throughput(None, 1_000)
+    for level in (None, "info", "debug"):
+        throughput = await _throughput(level)
+        print(f"{level or 'off':>6}: {throughput:9.0f} invocations/s")  # noqa: T201
+    configure_tracing(None)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -9,6 +9,7 @@
 # * `fnllm.caching`: Caching utilities for LLMs.
 # * `fnllm.limiting`: Limiting utilities for LLMs.
 # * `fnllm.events`: Events system.
+# * `fnllm.observability`: Optional export of the model requests to an observability backend.
 # * `fnllm.tools`: Tools Usage for LLMs.
 # * `fnllm.utils`: General fnllm utilities.
 # * `fnllm.openai`: OpenAI specific implementations.
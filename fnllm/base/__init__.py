@@ -3,5 +3,15 @@
 """LLM base package."""
 
 from .base import BaseLLM
+from .bulk import LLMMapMixin, LLMMapProgress, LLMMapResult, llm_map
+from .journal import JobJournal, JournalEntry
 
-__all__ = ["BaseLLM"]
+__all__ = [
+    "BaseLLM",
+    "JobJournal",
+    "JournalEntry",
+    "LLMMapMixin",
+    "LLMMapProgress",
+    "LLMMapResult",
+    "llm_map",
+]
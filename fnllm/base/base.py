@@ -11,6 +11,7 @@ from typing import TYPE_CHECKING, Generic
 from typing_extensions import Unpack
 
 from fnllm.events.base import LLMEvents
+from fnllm.types.generalized import StreamingLLMOutput
 from fnllm.types.generics import (
     THistoryEntry,
     TInput,
@@ -19,14 +20,19 @@ from fnllm.types.generics import (
     TOutput,
 )
 from fnllm.types.io import LLMInput, LLMOutput
-from fnllm.types.metrics import LLMUsageMetrics
+from fnllm.types.metrics import LLMStreamMetrics, LLMUsageMetrics
 from fnllm.types.protocol import LLM
+from fnllm.utils.deadline import resolve_timeout
+from fnllm.utils.tracing import TraceLevel, tracer
+from .bulk import LLMMapMixin
 
 if TYPE_CHECKING:
     from collections.abc import Sequence
 
     from fnllm.caching.base import Cache
+    from fnllm.services.circuit_breaker import CircuitBreaker
     from fnllm.services.decorator import LLMDecorator
+    from fnllm.services.hedger import Hedger
     from fnllm.services.history_extractor import HistoryExtractor
     from fnllm.services.json import JsonHandler
     from fnllm.services.rate_limiter import RateLimiter
@@ -37,6 +43,7 @@ if TYPE_CHECKING:
 
 class BaseLLM(
     ABC,
+    LLMMapMixin,
     LLM[TInput, TOutput, THistoryEntry, TModelParameters],
     Generic[TInput, TOutput, THistoryEntry, TModelParameters],
 ):
@@ -54,10 +61,15 @@ class BaseLLM(
                           | None = None,
             retryer: Retryer[TInput, TOutput, THistoryEntry, TModelParameters]
                      | None = None,
+            hedger: Hedger[TInput, TOutput, THistoryEntry, TModelParameters]
+                    | None = None,
+            circuit_breaker: CircuitBreaker[
+                                 TInput, TOutput, THistoryEntry, TModelParameters
+                             ]
+                             | None = None,
             json_handler: JsonHandler[TOutput, THistoryEntry] | None = None,
     ) -> None:
         """Base constructor for the BaseLLM."""
-        print("fnllm/base/base.py BaseLLM.__init__() start...")
         self._events = events or LLMEvents()
         self._cache = cache
         self._usage_extractor = usage_extractor
@@ -65,62 +77,66 @@ class BaseLLM(
         self._variable_injector = variable_injector
         self._rate_limiter = rate_limiter
         self._retryer = retryer
+        self._hedger = hedger
+        self._circuit_breaker = circuit_breaker
         self._json_handler = json_handler
 
         decorated = self._decorator_target
-        print(f"fnllm/base/base.py BaseLLM.__init__() {decorated=}")
-        print(f"fnllm/base/base.py BaseLLM.__init__() {self.decorators=}")
-        print(f"fnllm/base/base.py BaseLLM.__init__() run `for decorator in self.decorators` start...")
         for decorator in self.decorators:
-            print(f"fnllm/base/base.py BaseLLM.__init__() invoke decorator.decorate({decorator=}) start")
             decorated = decorator.decorate(decorated)
-            print(f"fnllm/base/base.py BaseLLM.__init__() {decorated=}")
-            print(f"fnllm/base/base.py BaseLLM.__init__() invoke decorator.decorate({decorator=}) end")
-        print(f"fnllm/base/base.py BaseLLM.__init__() run `for decorator in self.decorators` end...")
         self._decorated_target = decorated
-        print(f"fnllm/base/base.py BaseLLM.__init__() {self._decorated_target=}")
-        print("fnllm/base/base.py BaseLLM.__init__() end...")
 
     def child(
             self, name: str
     ) -> BaseLLM[TInput, TOutput, THistoryEntry, TModelParameters]:
         """Create a child LLM."""
-        print("fnllm/base/base.py BaseLLM.child() start...")
-        if self._cache is None:
+        if self._cache is None and self._rate_limiter is None:
             return self
         return self.__class__(
             events=self._events,
-            cache=self._cache.child(name),
+            cache=self._cache.child(name) if self._cache else None,
             usage_extractor=self._usage_extractor,
             history_extractor=self._history_extractor,
             variable_injector=self._variable_injector,
-            rate_limiter=self._rate_limiter,
+            rate_limiter=self._rate_limiter.child(name) if self._rate_limiter else None,
             retryer=self._retryer,
+            hedger=self._hedger,
+            circuit_breaker=self._circuit_breaker,
             json_handler=self._json_handler,
         )
 
     @property
     def events(self) -> LLMEvents:
         """Registered LLM events handler."""
-        print("fnllm/base/base.py BaseLLM.events() start...")
         return self._events
 
+    @property
+    def rate_limiter(
+            self,
+    ) -> RateLimiter[TInput, TOutput, THistoryEntry, TModelParameters] | None:
+        """The rate limiter of the LLM, if any."""
+        return self._rate_limiter
+
     @property
     def decorators(self) -> list[LLMDecorator[TOutput, THistoryEntry]]:
         """Get the list of LLM decorators."""
-        print()
-        print("fnllm/base/base.py BaseLLM.decorators() start...")
         decorators: list[LLMDecorator] = []
         if self._json_handler and self._json_handler.requester:
             decorators.append(self._json_handler.requester)
+        if self._hedger:
+            decorators.append(
+                self._hedger.with_rate_limiter(self._rate_limiter)
+                if self._rate_limiter
+                else self._hedger
+            )
         if self._rate_limiter:
             decorators.append(self._rate_limiter)
+        if self._circuit_breaker:
+            decorators.append(self._circuit_breaker)
         if self._retryer:
             decorators.append(self._retryer)
         if self._json_handler and self._json_handler.receiver:
             decorators.append(self._json_handler.receiver)
-        print(f"fnllm/base/base.py BaseLLM.decorators() return {decorators=}")
-        print()
 
         return decorators
 
@@ -130,13 +146,13 @@ class BaseLLM(
             **kwargs: Unpack[LLMInput[TJsonModel, THistoryEntry, TModelParameters]],
     ) -> LLMOutput[TOutput, TJsonModel, THistoryEntry]:
         """Invoke the LLM."""
-        print()
-        print("fnllm/base/base.py BaseLLM.__call__() start...")
-        print(f"fnllm/base/base.py BaseLLM.__call__() {prompt=}")
-        print(f"fnllm/base/base.py BaseLLM.__call__() {kwargs=}")
         try:
-            print(f"fnllm/base/base.py BaseLLM.__call__() return self._invoke(prompt, **kwargs)")
-            return await self._invoke(prompt, **kwargs)
+            if not tracer.info:
+                return await self._invoke(prompt, **kwargs)
+            with tracer.call(
+                    "llm.call", llm=type(self).__name__, name=kwargs.get("name")
+            ):
+                return await self._invoke(prompt, **kwargs)
         except BaseException as e:
             stack_trace = traceback.format_exc()
             if self._events:
@@ -151,15 +167,7 @@ class BaseLLM(
             **kwargs: Unpack[LLMInput[TJsonModel, THistoryEntry, TModelParameters]],
     ) -> LLMOutput[TOutput, TJsonModel, THistoryEntry]:
         """Run the LLM invocation, returning an LLMOutput."""
-        print("fnllm/base/base.py BaseLLM._invoke() start...")
-        print(f"fnllm/base/base.py BaseLLM._invoke() {prompt=}")
-        print(f"fnllm/base/base.py BaseLLM._invoke() {kwargs=}")
-        print(f"fnllm/base/base.py BaseLLM._invoke() invoke self._rewrite_input(prompt, kwargs) start...")
         prompt, kwargs = self._rewrite_input(prompt, kwargs)
-        print(f"fnllm/base/base.py BaseLLM._invoke() {prompt=}")
-        print(f"fnllm/base/base.py BaseLLM._invoke() {kwargs=}")
-        print(f"fnllm/base/base.py BaseLLM._invoke() {self._decorated_target=}")
-        print("fnllm/base/base.py BaseLLM._invoke() return self._decorated_target(prompt, **kwargs)...")
         return await self._decorated_target(prompt, **kwargs)
 
     def _rewrite_input(
@@ -168,15 +176,11 @@ class BaseLLM(
             kwargs: LLMInput[TJsonModel, THistoryEntry, TModelParameters],
     ) -> tuple[TInput, LLMInput[TJsonModel, THistoryEntry, TModelParameters]]:
         """Rewrite the input prompt and arguments.."""
-        print("fnllm/base/base.py BaseLLM._rewrite_input() start...")
-        print(f"fnllm/base/base.py BaseLLM._rewrite_input() {prompt=}")
-        print(f"fnllm/base/base.py BaseLLM._rewrite_input() {kwargs=}")
-        print(f"fnllm/base/base.py BaseLLM._rewrite_input() {self._variable_injector=}")
+        kwargs = resolve_timeout(kwargs)
         if self._variable_injector:
             prompt = self._variable_injector.inject_variables(
                 prompt, kwargs.get("variables")
             )
-        print(f"fnllm/base/base.py BaseLLM._rewrite_input() return {prompt=}, {kwargs=}...")
         return prompt, kwargs
 
     async def _decorator_target(
@@ -188,57 +192,48 @@ class BaseLLM(
 
         Leave signature alone as prompt, **kwargs.
         """
-        print("fnllm/base/base.py BaseLLM._decorator_target() start...")
-        print(f"fnllm/base/base.py BaseLLM._decorator_target() {prompt=}")
-        print(f"fnllm/base/base.py BaseLLM._decorator_target() {kwargs=}")
-        print(f"fnllm/base/base.py BaseLLM._decorator_target() {self._events=}")
-        print(f"fnllm/base/base.py BaseLLM._decorator_target() invoke self._events.on_execute_llm() start...")
         await self._events.on_execute_llm()
-        print(f"fnllm/base/base.py BaseLLM._decorator_target() invoke self._events.on_execute_llm() end...")
-        print(f"fnllm/base/base.py BaseLLM._decorator_target() invoke self._execute_llm(prompt, **kwargs) start...")
-        output = await self._execute_llm(prompt, **kwargs)
-        print(f"fnllm/base/base.py BaseLLM._decorator_target() {output=}")
-        print(f"fnllm/base/base.py BaseLLM._decorator_target() invoke self._execute_llm(prompt, **kwargs) end...")
+        if tracer.debug:
+            tracer.emit("llm.input", TraceLevel.DEBUG, prompt=prompt, kwargs=kwargs)
+        with tracer.span("llm.execute"):
+            output = await self._execute_llm(prompt, **kwargs)
         result: LLMOutput[TOutput, TJsonModel, THistoryEntry] = LLMOutput(output=output)
-        print(f"fnllm/base/base.py BaseLLM._decorator_target() {result=}")
 
-        print(f"fnllm/base/base.py BaseLLM._decorator_target() invoke self._inject_usage(result) start...")
+        if isinstance(output, StreamingLLMOutput):
+            # only the metrics are referenced, the stream must stay collectable
+            metrics = result.metrics
+
+            async def set_stream_metrics(stream: LLMStreamMetrics) -> None:
+                metrics.stream = stream
+                if stream.usage is not None and stream.usage_reported:
+                    metrics.usage = stream.usage
+
+            output.on_stream_end(set_stream_metrics)
+
         await self._inject_usage(result)
-        print(f"fnllm/base/base.py BaseLLM._decorator_target() invoke self._inject_usage(result) end...")
 
-        print(
-            f"fnllm/base/base.py BaseLLM._decorator_target() invoke self._inject_history(result, kwargs.get('history')) start...")
         self._inject_history(result, kwargs.get("history"))
-        print(
-            f"fnllm/base/base.py BaseLLM._decorator_target() invoke self._inject_history(result, kwargs.get('history')) end...")
-        print(f"fnllm/base/base.py BaseLLM._decorator_target() return {result=}...")
 
         return result
 
     async def _inject_usage(
             self, result: LLMOutput[TOutput, TJsonModel, THistoryEntry]
     ):
-        print("fnllm/base/base.py BaseLLM._inject_usage() start...")
-        print(f"fnllm/base/base.py BaseLLM._inject_usage() {result=}")
         usage = LLMUsageMetrics()
-        print(f"fnllm/base/base.py BaseLLM._inject_usage() {self._usage_extractor=}")
         if self._usage_extractor:
             usage = self._usage_extractor.extract_usage(result.output)
             await self._events.on_usage(usage)
         result.metrics.usage = usage
-        print("fnllm/base/base.py BaseLLM._inject_usage() end...")
 
     def _inject_history(
             self,
             result: LLMOutput[TOutput, TJsonModel, THistoryEntry],
             history: Sequence[THistoryEntry] | None,
     ) -> None:
-        print("fnllm/base/base.py BaseLLM._inject_history() start...")
         if self._history_extractor:
             result.history = self._history_extractor.extract_history(
                 history, result.output
             )
-        print("fnllm/base/base.py BaseLLM._inject_history() end...")
 
     @abstractmethod
     async def _execute_llm(
@@ -0,0 +1,212 @@
+# Copyright (c) 2024 Microsoft Corporation.
+
+"""Bulk invocation of an LLM over many prompts."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import AsyncIterable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Generic, TypeVar
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Callable, Iterable
+
+    from .journal import JobJournal
+
+TPrompt = TypeVar("TPrompt")
+
+
+@dataclass
+class LLMMapResult(Generic[TPrompt]):
+    """The outcome of one prompt of `LLM.map`."""
+
+    index: int
+    """The position of the prompt in the input."""
+
+    prompt: TPrompt
+    """The prompt."""
+
+    output: Any = None
+    """The `LLMOutput` of the prompt, `None` if it failed."""
+
+    error: BaseException | None = None
+    """The error raised by the prompt, if any."""
+
+    item_id: str | None = None
+    """The id of the prompt in the job journal, if any."""
+
+
+@dataclass
+class LLMMapProgress:
+    """Progress of an `LLM.map` run."""
+
+    completed: int
+    """Number of prompts done, failed ones included."""
+
+    failed: int
+    """Number of prompts that raised an error."""
+
+    in_flight: int
+    """Number of prompts started and not done yet."""
+
+    elapsed: float
+    """Seconds since the run started."""
+
+    skipped: int = 0
+    """Number of prompts skipped as completed by a previous run (see `JobJournal`)."""
+
+    @property
+    def throughput(self) -> float:
+        """Prompts done per second."""
+        return self.completed / self.elapsed if self.elapsed > 0 else 0.0
+
+
+async def llm_map(
+        llm: Callable[..., Any],
+        prompts: Iterable[TPrompt] | AsyncIterable[TPrompt],
+        *,
+        max_in_flight: int = 64,
+        ordered: bool = False,
+        on_progress: Callable[[LLMMapProgress], Any] | None = None,
+        journal: JobJournal | None = None,
+        item_id: Callable[[int, TPrompt], str] | None = None,
+        **kwargs: Any,
+) -> AsyncIterator[LLMMapResult[TPrompt]]:
+    """Invoke `llm` on every prompt, yielding the results as they are done.
+
+    Prompts are read lazily and at most `max_in_flight` of them are started and not yet
+    yielded, so memory stays constant whatever the input size; the started prompts are the
+    ones queued on the LLM limiter. With `ordered`, results are yielded in input order,
+    otherwise in completion order. Errors are captured on the results instead of stopping
+    the run. Breaking out of the iteration cancels the prompts in flight.
+
+    With a `journal`, prompts completed by a previous run are skipped (and not yielded), and
+    every successful result is recorded, with its output when the journal has an output file.
+    Prompts are identified by `item_id(index, prompt)`, their index by default, which
+    requires the input to be in the same order on restart.
+    """
+    if max_in_flight < 1:
+        msg = "max_in_flight must be at least 1"
+        raise ValueError(msg)
+
+    prompt_iterator = _aiter(prompts)
+    in_flight: deque[asyncio.Task[LLMMapResult[TPrompt]]] = deque()
+    start = time.monotonic()
+    completed = failed = skipped = index = 0
+    exhausted = False
+
+    async def invoke(
+            index: int, prompt: TPrompt, id_: str | None
+    ) -> LLMMapResult[TPrompt]:
+        try:
+            output = await llm(prompt, **kwargs)
+        except Exception as error:  # noqa: BLE001
+            return LLMMapResult(index, prompt, error=error, item_id=id_)
+        return LLMMapResult(index, prompt, output=output, item_id=id_)
+
+    try:
+        while True:
+            while not exhausted and len(in_flight) < max_in_flight:
+                try:
+                    prompt = await anext(prompt_iterator)
+                except StopAsyncIteration:
+                    exhausted = True
+                    break
+
+                id_ = None
+                if journal is not None:
+                    id_ = item_id(index, prompt) if item_id else str(index)
+                    if id_ in journal:
+                        skipped += 1
+                        index += 1
+                        continue
+
+                in_flight.append(asyncio.create_task(invoke(index, prompt, id_)))
+                index += 1
+
+            if not in_flight:
+                return
+
+            if ordered:
+                task = in_flight.popleft()
+                await asyncio.wait([task])
+            else:
+                done, _ = await asyncio.wait(
+                    in_flight, return_when=asyncio.FIRST_COMPLETED
+                )
+                task = next(iter(done))
+                in_flight.remove(task)
+
+            result = task.result()
+            completed += 1
+            failed += result.error is not None
+            if journal is not None and result.item_id is not None and not result.error:
+                _record(journal, result)
+            if on_progress is not None:
+                on_progress(
+                    LLMMapProgress(
+                        completed=completed,
+                        failed=failed,
+                        in_flight=len(in_flight),
+                        elapsed=time.monotonic() - start,
+                        skipped=skipped,
+                    )
+                )
+            yield result
+    finally:
+        for task in in_flight:
+            task.cancel()
+        await asyncio.gather(*in_flight, return_exceptions=True)
+
+
+class LLMMapMixin:
+    """Adds `map` to an LLM."""
+
+    def map(
+            self,
+            prompts: Iterable[Any] | AsyncIterable[Any],
+            *,
+            max_in_flight: int = 64,
+            ordered: bool = False,
+            on_progress: Callable[[LLMMapProgress], Any] | None = None,
+            journal: JobJournal | None = None,
+            item_id: Callable[[int, Any], str] | None = None,
+            **kwargs: Any,
+    ) -> AsyncIterator[LLMMapResult[Any]]:
+        """Invoke the LLM on every prompt with bounded concurrency, see `llm_map`."""
+        return llm_map(
+            self,  # type: ignore[arg-type]
+            prompts,
+            max_in_flight=max_in_flight,
+            ordered=ordered,
+            on_progress=on_progress,
+            journal=journal,
+            item_id=item_id,
+            **kwargs,
+        )
+
+
+def _record(journal: JobJournal, result: LLMMapResult[Any]) -> None:
+    assert result.item_id is not None  # noqa: S101
+    inner = getattr(result.output, "output", None)
+    cache_key = getattr(inner, "cache_key", None)
+    output = None
+    if journal.output_path is not None:
+        output = result.output
+        if hasattr(output, "model_dump"):
+            output = output.model_dump(mode="json")
+    journal.record(result.item_id, output, cache_key=cache_key)
+
+
+async def _aiter(
+        prompts: Iterable[TPrompt] | AsyncIterable[TPrompt],
+) -> AsyncIterator[TPrompt]:
+    if isinstance(prompts, AsyncIterable):
+        async for prompt in prompts:
+            yield prompt
+    else:
+        for prompt in prompts:
+            yield prompt
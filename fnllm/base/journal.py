@@ -0,0 +1,170 @@
+# Copyright (c) 2024 Microsoft Corporation.
+
+"""Job journal for checkpointed, resumable bulk runs."""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from types import TracebackType
+
+
+@dataclass(frozen=True)
+class JournalEntry:
+    """A completed item of a job."""
+
+    id: str
+    """The id of the item."""
+
+    cache_key: str | None = None
+    """The cache key of the item response, if it was cached."""
+
+    offset: int | None = None
+    """The byte offset of the item result in the output file, if it was written."""
+
+
+class JobJournal:
+    """An append-only record of the completed items of a bulk job.
+
+    Every completed item gets a JSONL line `{"id", "cache_key", "offset"}` in the journal
+    file, and its result (if given) a JSONL line in the output file at `offset`. The result
+    is written and flushed before the journal line, so the journal never refers to a missing
+    result. On restart the journal is loaded into memory, so checking whether an item is
+    done is O(1) and does not touch the LLM cache. A line truncated by a crash is ignored.
+    """
+
+    def __init__(
+            self,
+            path: str | Path,
+            *,
+            output_path: str | Path | None = None,
+            encoding: str = "utf-8",
+    ):
+        """Open the journal at `path`, loading the items completed by previous runs."""
+        self._path = Path(path)
+        self._output_path = Path(output_path) if output_path is not None else None
+        self._encoding = encoding
+        self._entries = self._load()
+        self._file: IO[bytes] | None = None
+        self._output_file: IO[bytes] | None = None
+
+    @property
+    def path(self) -> Path:
+        """The path of the journal file."""
+        return self._path
+
+    @property
+    def output_path(self) -> Path | None:
+        """The path of the output file, if any."""
+        return self._output_path
+
+    def __contains__(self, item_id: str) -> bool:
+        """Check whether the item is completed."""
+        return item_id in self._entries
+
+    def __len__(self) -> int:
+        """Get the number of completed items."""
+        return len(self._entries)
+
+    def get(self, item_id: str) -> JournalEntry | None:
+        """Get the entry of a completed item."""
+        return self._entries.get(item_id)
+
+    def record(
+            self, item_id: str, result: Any = None, *, cache_key: str | None = None
+    ) -> JournalEntry:
+        """Mark an item as completed, appending its JSON `result` to the output file."""
+        offset = None
+        if result is not None and self._output_path is not None:
+            output_file = self._output_file or self._open_output()
+            offset = output_file.tell()
+            line = {"id": item_id, "result": result}
+            output_file.write(self._encode(line))
+            output_file.flush()
+
+        entry = JournalEntry(id=item_id, cache_key=cache_key, offset=offset)
+        file = self._file or self._open()
+        file.write(
+            self._encode({"id": item_id, "cache_key": cache_key, "offset": offset})
+        )
+        file.flush()
+        self._entries[item_id] = entry
+        return entry
+
+    def read_result(self, item_id: str) -> Any:
+        """Read the result of a completed item back from the output file."""
+        entry = self._entries.get(item_id)
+        if entry is None or entry.offset is None or self._output_path is None:
+            return None
+
+        if self._output_file is not None:
+            self._output_file.flush()
+        with self._output_path.open("rb") as file:
+            file.seek(entry.offset)
+            return json.loads(file.readline().decode(self._encoding))["result"]
+
+    def close(self) -> None:
+        """Close the journal and output files."""
+        for file in (self._file, self._output_file):
+            if file is not None:
+                file.close()
+        self._file = self._output_file = None
+
+    def __enter__(self) -> JobJournal:
+        """Enter the journal context."""
+        return self
+
+    def __exit__(
+            self,
+            exc_type: type[BaseException] | None,
+            exc_value: BaseException | None,
+            traceback: TracebackType | None,
+    ) -> None:
+        """Close the journal."""
+        self.close()
+
+    def _load(self) -> dict[str, JournalEntry]:
+        entries: dict[str, JournalEntry] = {}
+        if not self._path.exists():
+            return entries
+
+        with self._path.open(encoding=self._encoding) as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                entries[record["id"]] = JournalEntry(
+                    id=record["id"],
+                    cache_key=record.get("cache_key"),
+                    offset=record.get("offset"),
+                )
+        return entries
+
+    def _open(self) -> IO[bytes]:
+        self._file = _open_append(self._path)
+        return self._file
+
+    def _open_output(self) -> IO[bytes]:
+        assert self._output_path is not None  # noqa: S101
+        self._output_file = _open_append(self._output_path)
+        return self._output_file
+
+    def _encode(self, record: dict[str, Any]) -> bytes:
+        return (json.dumps(record) + "\n").encode(self._encoding)
+
+
+def _open_append(path: Path) -> IO[bytes]:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    file = path.open("ab")
+    # terminate a line truncated by a crash, so the next line is readable
+    if file.tell() > 0:
+        with path.open("rb") as reader:
+            reader.seek(-1, 2)
+            if reader.read(1) != b"\n":
+                file.write(b"\n")
+    return file
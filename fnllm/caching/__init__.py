@@ -2,7 +2,17 @@
 
 """Caching base package."""
 
+from typing import TYPE_CHECKING
+
+from fnllm.utils.lazy import lazy_exports
+
 from .base import Cache
 from .file import FileCache
 
-__all__ = ["Cache", "FileCache"]
+if TYPE_CHECKING:
+    from .blob import BlobCache
+
+# the blob cache needs the azure-storage-blob package, only imported when used
+__getattr__, __dir__ = lazy_exports(__name__, {"BlobCache": ".blob"})
+
+__all__ = ["BlobCache", "Cache", "FileCache"]
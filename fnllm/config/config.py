@@ -5,6 +5,8 @@
 
 from __future__ import annotations
 
+from typing import Literal
+
 from pydantic import BaseModel, Field
 
 from .json_strategy import JsonStrategy
@@ -23,7 +25,57 @@ class Config(BaseModel, frozen=True, extra="allow"):
     )
 
     max_retry_wait: float = Field(
-        default=10, description="The maximum retry wait time."
+        default=10,
+        description="The maximum retry wait time, including the waits recommended by the service (e.g. `Retry-After`).",
+    )
+
+    retry_budget_ratio: float | None = Field(
+        default=None,
+        description="The max number of retries, as a fraction of the requests of the last `retry_budget_window` seconds, shared by every LLM of the process (e.g. 0.1). None disables the retry budget.",
+    )
+
+    retry_budget_min_retries: int = Field(
+        default=10,
+        description="The number of retries always allowed per `retry_budget_window`, on top of `retry_budget_ratio`.",
+    )
+
+    retry_budget_window: float = Field(
+        default=10,
+        description="The sliding window, in seconds, the retry budget is computed over.",
+    )
+
+    hedge_quantile: float | None = Field(
+        default=None,
+        description="Send a duplicate request when a non-streaming call is slower than this latency quantile (e.g. 0.95) of its previous calls, keeping the first response. None disables hedging.",
+    )
+
+    max_hedges: int = Field(
+        default=1, description="The max number of duplicate requests sent per call."
+    )
+
+    hedge_min_delay: float = Field(
+        default=0,
+        description="The minimum seconds a call runs before being hedged.",
+    )
+
+    circuit_failure_rate: float | None = Field(
+        default=None,
+        description="Open the circuit of the endpoint/deployment, failing calls fast, once this fraction of its calls in the last `circuit_window` seconds failed with server or connection errors. None disables the circuit breaker.",
+    )
+
+    circuit_min_calls: int = Field(
+        default=20,
+        description="The minimum number of calls in the window before the circuit can open.",
+    )
+
+    circuit_window: float = Field(
+        default=30,
+        description="The sliding window, in seconds, the failure rate is computed over.",
+    )
+
+    circuit_open_duration: float = Field(
+        default=30,
+        description="The seconds the circuit stays open before a probe call checks whether the endpoint recovered.",
     )
 
     max_concurrency: int | None = Field(
@@ -44,6 +96,86 @@ class Config(BaseModel, frozen=True, extra="allow"):
         default=True, description="Use burst mode when submitting requests."
     )
 
+    requests_burst_size: int | None = Field(
+        default=None,
+        description="The max number of requests sent at once, overriding `requests_burst_mode`.",
+    )
+
+    tokens_burst_size: int | None = Field(
+        default=None,
+        description="The max number of tokens used at once. Defaults to `tokens_per_minute`.",
+    )
+
+    reserve_output_tokens: bool = Field(
+        default=False,
+        description="Reserve TPM capacity for the response up front (`max_completion_tokens`/`max_tokens`, or the p90 of previous responses with the same name) and reconcile it once the real usage is known.",
+    )
+
+    atomic_limiting: bool = Field(
+        default=False,
+        description="Wait until the concurrency, RPM and TPM limits can all be satisfied and acquire them together, instead of one after another. Request priorities and tenant fair sharing are only honoured in this mode.",
+    )
+
+    tenant_weights: dict[str, float] = Field(
+        default_factory=dict,
+        description="Relative share of the limits given to each tenant (child LLM name or `tenant` input) when requests queue in atomic limiting mode. Tenants default to a weight of 1.",
+    )
+
+    max_concurrency_per_tenant: int | None = Field(
+        default=None,
+        description="The maximum concurrency of each tenant, on top of `max_concurrency`.",
+    )
+
+    tokens_per_minute_per_tenant: int | None = Field(
+        default=None,
+        description="The max number of tokens per minute of each tenant, on top of `tokens_per_minute`.",
+    )
+
+    max_queue_size: int | None = Field(
+        default=None,
+        description="The max number of requests waiting for the limits. Requests beyond it are rejected immediately with `LimiterQueueFullError` instead of queueing.",
+    )
+
+    token_budgets: dict[Literal["hourly", "daily", "monthly"], int] = Field(
+        default_factory=dict,
+        description="Hard input+output token budgets per calendar window (UTC), e.g. `{'daily': 1_000_000}`. Usage is persisted in `budget_path` and survives restarts.",
+    )
+
+    budget_path: str = Field(
+        default="fnllm_budgets.sqlite",
+        description="The SQLite database where the token budget usage is stored.",
+    )
+
+    budget_project: str = Field(
+        default="default",
+        description="The project the token budgets are accounted to.",
+    )
+
+    wait_for_budget: bool = Field(
+        default=False,
+        description="Queue requests until an exhausted budget window resets, instead of rejecting them with `BudgetExhaustedError`.",
+    )
+
+    limiter_state_path: str | None = Field(
+        default=None,
+        description="A JSON file where the RPM/TPM bucket levels are saved periodically and at shutdown, and restored from at startup, so restarts do not burst into an already spent quota.",
+    )
+
+    limiter_state_interval: float = Field(
+        default=10,
+        description="Seconds between two saves of the limiter state.",
+    )
+
+    quota_pool: str | None = Field(
+        default=None,
+        description="Name of a quota pool. LLMs created with the same pool share one set of limits (the ones of the first LLM created), even across models or endpoints. By default, limits are shared by the LLMs targeting the same endpoint, model/deployment and API key with the same limit settings.",
+    )
+
+    priority_aging_interval: float = Field(
+        default=30,
+        description="Seconds a queued request has to wait to gain one priority level, so low priority requests are not starved. 0 disables aging.",
+    )
+
     json_strategy: JsonStrategy = Field(
         default=JsonStrategy.VALID,
         description="The strategy to use for JSON parsing.",
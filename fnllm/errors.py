@@ -7,13 +7,25 @@ All custom errors for fnllm are re-exported from here.
 """
 
 from .caching.blob import InvalidBlobCacheArgumentsError, InvalidBlobContainerNameError
-from .services.errors import FailedToGenerateValidJsonError, RetriesExhaustedError
+from .limiting.errors import BudgetExhaustedError, LimiterQueueFullError
+from .services.errors import (
+    BatchRequestError,
+    CircuitOpenError,
+    DeadlineExceededError,
+    FailedToGenerateValidJsonError,
+    RetriesExhaustedError,
+)
 from .tools.errors import ToolInvalidArgumentsError, ToolNotFoundError
 
 __all__ = [
+    "BatchRequestError",
+    "BudgetExhaustedError",
+    "CircuitOpenError",
+    "DeadlineExceededError",
     "FailedToGenerateValidJsonError",
     "InvalidBlobCacheArgumentsError",
     "InvalidBlobContainerNameError",
+    "LimiterQueueFullError",
     "RetriesExhaustedError",
     "ToolInvalidArgumentsError",
     "ToolNotFoundError",
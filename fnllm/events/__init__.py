@@ -3,8 +3,15 @@
 """Package with utilities for LLM event handling."""
 
 from .base import LLMEvents
+from .budget import LLMBudgetEvents
 from .composite import LLMCompositeEvents
 from .logger import LLMEventsLogger
 from .usage_tracker import LLMUsageTracker
 
-__all__ = ["LLMCompositeEvents", "LLMEvents", "LLMEventsLogger", "LLMUsageTracker"]
+__all__ = [
+    "LLMBudgetEvents",
+    "LLMCompositeEvents",
+    "LLMEvents",
+    "LLMEventsLogger",
+    "LLMUsageTracker",
+]
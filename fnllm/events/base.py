@@ -37,9 +37,20 @@ class LLMEvents:
     async def on_limit_released(self, manifest: Manifest) -> None:
         """Called when limit is released for a request (does not include post limiting)."""
 
+    async def on_limit_wait(self, manifest: Manifest, wait_time: float) -> None:
+        """Called with the seconds a request waited in the limiter queue before acquiring its limit."""
+
     async def on_post_limit(self, manifest: Manifest) -> None:
         """Called when post request limiting is triggered (called by the rate limiting LLM)."""
 
+    async def on_limit_refunded(self, manifest: Manifest) -> None:
+        """Called when unused tokens are given back to the limiter after the request (called by the rate limiting LLM)."""
+
+    async def on_circuit_state_change(
+            self, circuit: str, old_state: str, new_state: str
+    ) -> None:
+        """Called when a circuit changes state (closed, open, half_open) (called by the circuit breaker LLM)."""
+
     async def on_success(
             self,
             metrics: LLMMetrics,
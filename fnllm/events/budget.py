@@ -0,0 +1,25 @@
+# Copyright (c) 2024 Microsoft Corporation.
+
+"""Class for recording LLM usage into token budgets."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from fnllm.events.base import LLMEvents
+
+if TYPE_CHECKING:
+    from fnllm.limiting.budget import TokenBudget
+    from fnllm.types.metrics import LLMUsageMetrics
+
+
+class LLMBudgetEvents(LLMEvents):
+    """Implementation of the LLM events that records the usage into a token budget."""
+
+    def __init__(self, budget: TokenBudget) -> None:
+        """Create a new LLMBudgetEvents."""
+        self._budget = budget
+
+    async def on_usage(self, usage: LLMUsageMetrics) -> None:
+        """Called when there is any LLM usage."""
+        self._budget.record(usage.total_tokens)
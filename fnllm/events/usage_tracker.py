@@ -5,14 +5,17 @@
 
 from __future__ import annotations
 
+from collections import defaultdict
 from typing import TYPE_CHECKING
 
 from fnllm.events.base import LLMEvents
 from fnllm.types.metrics import LLMUsageMetrics
+from fnllm.utils.rolling_quantile import RollingQuantile
 from fnllm.utils.sliding_window import SlidingWindow
 
 if TYPE_CHECKING:
     from fnllm.limiting.base import Manifest
+    from fnllm.limiting.budget import BudgetWindow, TokenBudget
 
 
 class LLMUsageTracker(LLMEvents):
@@ -22,18 +25,17 @@ class LLMUsageTracker(LLMEvents):
             self,
             rpm_sliding_window: SlidingWindow,
             tpm_sliding_window: SlidingWindow,
+            budget: TokenBudget | None = None,
     ) -> None:
         """Create a new LLMUsageTracker."""
-        print()
-        print("fnllm/events/usage_tracker.py LLMUsageTracker.__init__() start...")
         self._rpm_sliding_window = rpm_sliding_window
         self._tpm_sliding_window = tpm_sliding_window
         self._current_concurrency = 0
         self._max_concurrency = 0
         self._total_usage = LLMUsageMetrics()
         self._total_requests = 0
-        print("fnllm/events/usage_tracker.py LLMUsageTracker.__init__() end...")
-        print()
+        self._queue_waits = defaultdict[int, RollingQuantile](RollingQuantile)
+        self._budget = budget
 
     @property
     def total_usage(self) -> LLMUsageMetrics:
@@ -71,50 +73,47 @@ class LLMUsageTracker(LLMEvents):
         """Return the total average TPM since the beginning."""
         return await self._tpm_sliding_window.avg()
 
+    def remaining_budget(self) -> dict[BudgetWindow, int]:
+        """Tokens left in the current period of every budget window (empty without a budget)."""
+        return self._budget.remaining() if self._budget else {}
+
+    def queue_wait(self, priority: int = 0, q: float = 0.5) -> float:
+        """Return the `q` quantile of the recent limiter queue wait times (seconds) for a priority."""
+        waits = self._queue_waits.get(priority)
+        return (waits.quantile(q) if waits else None) or 0
+
     async def on_usage(self, usage: LLMUsageMetrics) -> None:
         """Called when there is any LLM usage."""
-        print()
-        print("fnllm/events/usage_tracker.py LLMUsageTracker.on_usage() start...")
         self._total_requests += 1
         self._total_usage.input_tokens += usage.input_tokens
         self._total_usage.output_tokens += usage.output_tokens
-        print("fnllm/events/usage_tracker.py LLMUsageTracker.on_usage() end...")
-        print()
 
     async def on_limit_acquired(self, manifest: Manifest) -> None:
         """Called when limit is acquired for a request (does not include post limiting)."""
-        print()
-        print("fnllm/events/usage_tracker.py LLMUsageTracker.on_limit_acquired() start...")
         self._current_concurrency += 1
         self._max_concurrency = max(self._max_concurrency, self._current_concurrency)
 
         await self._rpm_sliding_window.insert(1)
         await self._tpm_sliding_window.insert(manifest.request_tokens)
-        print("fnllm/events/usage_tracker.py LLMUsageTracker.on_limit_acquired() end...")
-        print()
 
     async def on_limit_released(self, manifest: Manifest) -> None:
         """Called when limit is released for a request (does not include post limiting)."""
-        print()
-        print("fnllm/events/usage_tracker.py LLMUsageTracker.on_limit_released() start...")
         self._current_concurrency = max(0, self._current_concurrency - 1)
-        print("fnllm/events/usage_tracker.py LLMUsageTracker.on_limit_released() end...")
-        print()
+
+    async def on_limit_wait(self, manifest: Manifest, wait_time: float) -> None:
+        """Called with the seconds a request waited in the limiter queue before acquiring its limit."""
+        self._queue_waits[manifest.priority].insert(wait_time)
 
     async def on_post_limit(self, manifest: Manifest) -> None:
         """Called when post request limiting is triggered (called by the rate limiting LLM)."""
-        print()
-        print("fnllm/events/usage_tracker.py LLMUsageTracker.on_post_limit() start...")
         await self._tpm_sliding_window.insert(manifest.post_request_tokens)
-        print("fnllm/events/usage_tracker.py LLMUsageTracker.on_post_limit() end...")
-        print()
+
+    async def on_limit_refunded(self, manifest: Manifest) -> None:
+        """Called when unused tokens are given back to the limiter after the request (called by the rate limiting LLM)."""
+        await self._tpm_sliding_window.insert(-manifest.post_request_tokens)
 
     @classmethod
-    def create(cls) -> LLMUsageTracker:
+    def create(cls, budget: TokenBudget | None = None) -> LLMUsageTracker:
         """Create a new LLMUsageTracker with proper sliding windows."""
-        print()
-        print("fnllm/events/usage_tracker.py LLMUsageTracker.create() start...")
-        print(
-            "fnllm/events/usage_tracker.py LLMUsageTracker.create() return `cls(SlidingWindow(60), SlidingWindow(60))`...")
 
-        return cls(SlidingWindow(60), SlidingWindow(60))
+        return cls(SlidingWindow(60), SlidingWindow(60), budget)
@@ -2,19 +2,36 @@
 
 """Limiting base package."""
 
-from .base import Limiter, Manifest
+from .base import Limiter, Manifest, Priority
+from .budget import BudgetLimiter, BudgetWindow, TokenBudget
 from .composite import CompositeLimiter
 from .concurrency import ConcurrencyLimiter
+from .errors import BudgetExhaustedError, LimiterQueueFullError
 from .noop_llm import NoopLimiter
+from .registry import LimiterRegistry, limiter_registry
 from .rpm import RPMLimiter
+from .snapshots import LimiterSnapshots
+from .tenant import TenantLimiter
+from .token_bucket import TokenBucket
 from .tpm import TPMLimiter
 
 __all__ = [
+    "BudgetExhaustedError",
+    "BudgetLimiter",
+    "BudgetWindow",
     "CompositeLimiter",
     "ConcurrencyLimiter",
     "Limiter",
+    "LimiterQueueFullError",
+    "LimiterRegistry",
+    "LimiterSnapshots",
     "Manifest",
     "NoopLimiter",
+    "Priority",
     "RPMLimiter",
     "TPMLimiter",
+    "TenantLimiter",
+    "TokenBucket",
+    "TokenBudget",
+    "limiter_registry",
 ]
@@ -4,14 +4,29 @@
 
 from __future__ import annotations
 
+import math
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import TYPE_CHECKING
+from enum import IntEnum
+from typing import TYPE_CHECKING, Any
 
 if TYPE_CHECKING:
     from types import TracebackType
 
 
+class Priority(IntEnum):
+    """Common request priority classes. Any integer can be used, higher values are served first."""
+
+    BATCH = -1
+    """Bulk/background work that can wait."""
+
+    NORMAL = 0
+    """Default priority."""
+
+    INTERACTIVE = 1
+    """Latency sensitive requests, e.g. a user waiting on a chat answer."""
+
+
 @dataclass
 class Manifest:
     """Parameters for limiting."""
@@ -20,7 +35,16 @@ class Manifest:
     """The number of tokens to acquire or release."""
 
     post_request_tokens: int = 0
-    """The number of tokens to acquire or release after the request is complete."""
+    """The number of tokens to acquire, release or refund after the request is complete."""
+
+    priority: int = 0
+    """The request priority, higher values are served first by schedulers that support it."""
+
+    tenant: str = ""
+    """The tenant issuing the request, used for fair sharing and per-tenant limits."""
+
+    deadline: float | None = None
+    """The `time.monotonic()` timestamp after which the request is useless, if any."""
 
 
 class LimitContext:
@@ -57,12 +81,50 @@ class Limiter(ABC):
     async def release(self, manifest: Manifest) -> None:
         """Release a pass through the limiter."""
 
+    async def refund(self, manifest: Manifest) -> None:
+        """Give back tokens that were acquired but ended up unused (`manifest.post_request_tokens`).
+
+        Limiters that do not track tokens ignore refunds.
+        """
+
+    @abstractmethod
+    def can_acquire(self, manifest: Manifest) -> bool:
+        """Check whether a pass can be acquired right now, without waiting.
+
+        Used with `acquire_nowait` for atomic acquisition (see `CompositeLimiter`).
+        """
+
+    @abstractmethod
+    def acquire_nowait(self, manifest: Manifest) -> None:
+        """Acquire a pass without waiting. Only valid right after `can_acquire` returned `True`."""
+
+    def acquire_delay(self, manifest: Manifest) -> float:
+        """Estimate how many seconds until a pass can be acquired without waiting.
+
+        Returns `math.inf` when it depends on other passes being released.
+        """
+        return 0 if self.can_acquire(manifest) else math.inf
+
+    def rate_delay(self, manifest: Manifest) -> float:
+        """Estimate how many seconds the rate limits (e.g. tokens per minute) delay a pass.
+
+        Unlike `acquire_delay`, waits on other passes being released (e.g. for concurrency)
+        are not counted, as their length is unknown.
+        """
+        delay = self.acquire_delay(manifest)
+        return delay if math.isfinite(delay) else 0
+
+    def snapshot(self) -> Any:
+        """Get a JSON-serializable snapshot of the limiter state, `None` when it is stateless.
+
+        Only state that is meaningful across restarts (e.g. bucket levels) is captured.
+        """
+        return None
+
+    def restore(self, state: Any) -> None:
+        """Restore the limiter state from a `snapshot`."""
+
     def use(self, manifest: Manifest) -> LimitContext:
         """Limit for a given amount (default = 1)."""
-        print()
-        print("fnllm/limiting/base.py Limiter.use() start...")
-        print(f"fnllm/limiting/base.py Limiter.use() {manifest=}")
-        print("fnllm/limiting/base.py Limiter.use() return LimitContext(self, manifest)...")
-        print()
 
         return LimitContext(self, manifest)
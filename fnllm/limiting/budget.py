@@ -0,0 +1,320 @@
+# Copyright (c) 2024 Microsoft Corporation.
+
+"""Persistent token budget limiter module."""
+
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from fnllm.limiting.base import Limiter, Manifest
+from fnllm.limiting.errors import BudgetExhaustedError
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+
+class BudgetWindow(str, Enum):
+    """Calendar windows (UTC) a token budget applies to."""
+
+    HOURLY = "hourly"
+    DAILY = "daily"
+    MONTHLY = "monthly"
+
+    def period(self, now: datetime) -> str:
+        """Get the key of the period containing `now`."""
+        match self:
+            case BudgetWindow.HOURLY:
+                return f"{self.value}:{now:%Y-%m-%dT%H}"
+            case BudgetWindow.DAILY:
+                return f"{self.value}:{now:%Y-%m-%d}"
+            case BudgetWindow.MONTHLY:
+                return f"{self.value}:{now:%Y-%m}"
+
+    def next_period_start(self, now: datetime) -> datetime:
+        """Get the moment the period following the one containing `now` starts."""
+        match self:
+            case BudgetWindow.HOURLY:
+                start = now.replace(minute=0, second=0, microsecond=0)
+                return start + timedelta(hours=1)
+            case BudgetWindow.DAILY:
+                start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+                return start + timedelta(days=1)
+            case BudgetWindow.MONTHLY:
+                start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+                return (start + timedelta(days=32)).replace(day=1)
+
+
+class TokenBudget:
+    """Cumulative token usage of a project, checked against hourly/daily/monthly budgets.
+
+    Usage is stored in a SQLite database, so it survives restarts and is shared by every
+    process using the same file. The totals of the current periods are kept in memory:
+    recorded usage is written in batches every `flush_interval` seconds, off the event loop,
+    and totals older than that are refreshed with the usage of the other processes.
+
+    Requests reserve their estimate until they complete (`reserve`/`unreserve`), so
+    concurrent requests cannot all pass the check before any usage is recorded.
+    """
+
+    def __init__(
+            self,
+            path: str | Path,
+            limits: Mapping[BudgetWindow | str, int],
+            *,
+            project: str = "default",
+            flush_interval: float = 1.0,
+    ):
+        """Create a new TokenBudget stored in the SQLite database at `path`."""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        # written from worker threads, one at a time
+        self._connection = sqlite3.connect(
+            path, isolation_level=None, check_same_thread=False
+        )
+        self._connection_lock = threading.Lock()
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS usage ("
+            "project TEXT NOT NULL, period TEXT NOT NULL, tokens INTEGER NOT NULL, "
+            "PRIMARY KEY (project, period))"
+        )
+        self._limits = {BudgetWindow(window): limit for window, limit in limits.items()}
+        self._project = project
+        self._flush_interval = flush_interval
+        self._periods: dict[BudgetWindow, tuple[str, datetime]] = {}
+        self._used: dict[BudgetWindow, int] = {}
+        self._pending = defaultdict[str, int](int)
+        self._reserved = 0
+        self._flush_task: asyncio.Task[None] | None = None
+        self._closed = False
+        self._refreshed_at = 0.0
+
+        now = _utcnow()
+        for window in self._limits:
+            self._roll(window, now)
+        self._refresh(self._write({}, self._period_keys()))
+
+    @property
+    def project(self) -> str:
+        """The project the budget belongs to."""
+        return self._project
+
+    @property
+    def limits(self) -> dict[BudgetWindow, int]:
+        """The token budget of every window."""
+        return dict(self._limits)
+
+    def record(self, tokens: int) -> None:
+        """Add used tokens to the current period of every window, writing them in the background."""
+        if tokens <= 0:
+            return
+
+        now = _utcnow()
+        for window in self._limits:
+            period = self._current_period(window, now)
+            self._used[window] += tokens
+            self._pending[period] += tokens
+
+        if not self._schedule_flush(self._flush_interval):
+            # no event loop to write from, write right away
+            self._flush_now()
+
+    def reserve(self, tokens: int) -> None:
+        """Hold `tokens` of every window for a request in flight."""
+        self._reserved += tokens
+
+    def unreserve(self, tokens: int) -> None:
+        """Give back tokens held by `reserve`, once the request usage is recorded."""
+        self._reserved = max(0, self._reserved - tokens)
+
+    def used(self, window: BudgetWindow) -> int:
+        """Get the tokens used in the current period of a window."""
+        self._current_period(window, _utcnow())
+        if time.monotonic() - self._refreshed_at > self._flush_interval:
+            # pick up the usage of the other processes
+            self._schedule_flush(0)
+        return self._used[window]
+
+    def remaining(self) -> dict[BudgetWindow, int]:
+        """Get the tokens left in the current period of every window, not counting the reservations."""
+        return {
+            window: max(0, limit - self.used(window))
+            for window, limit in self._limits.items()
+        }
+
+    def exhausted(self, tokens: int = 0) -> list[BudgetWindow]:
+        """Get the windows that cannot afford `tokens` more tokens on top of the reservations."""
+        return [
+            window
+            for window, remaining in self.remaining().items()
+            if remaining <= 0 or remaining - self._reserved < tokens
+        ]
+
+    def reset_delay(self, windows: list[BudgetWindow]) -> float:
+        """Get the seconds until every given window starts a new period."""
+        now = _utcnow()
+        return max(
+            ((window.next_period_start(now) - now).total_seconds() for window in windows),
+            default=0,
+        )
+
+    async def flush(self) -> None:
+        """Write the recorded usage and refresh the totals, in a worker thread."""
+        pending = self._take_pending()
+        try:
+            totals = await asyncio.to_thread(self._write, pending, self._period_keys())
+        except sqlite3.Error:
+            # keep the usage for the next write
+            for period, tokens in pending.items():
+                self._pending[period] += tokens
+            raise
+        self._refresh(totals)
+
+    def close(self) -> None:
+        """Write the recorded usage and close the database connection."""
+        self._closed = True
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        self._flush_now()
+        with self._connection_lock:
+            self._connection.close()
+
+    def _schedule_flush(self, delay: float) -> bool:
+        """Flush after `delay` seconds, unless already scheduled. Returns whether there is an event loop to flush from."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        if self._flush_task is None and not self._closed:
+            self._flush_task = loop.create_task(self._flush_later(delay))
+        return True
+
+    async def _flush_later(self, delay: float) -> None:
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            # e.g. the event loop is shutting down, do not lose the usage
+            if not self._closed:
+                self._flush_now()
+            raise
+        finally:
+            self._flush_task = None
+        if not self._closed:
+            await self.flush()
+
+    def _flush_now(self) -> None:
+        self._refresh(self._write(self._take_pending(), self._period_keys()))
+
+    def _take_pending(self) -> dict[str, int]:
+        pending = dict(self._pending)
+        self._pending.clear()
+        return pending
+
+    def _period_keys(self) -> dict[BudgetWindow, str]:
+        return {window: period for window, (period, _) in self._periods.items()}
+
+    def _write(
+            self, pending: dict[str, int], periods: dict[BudgetWindow, str]
+    ) -> dict[BudgetWindow, tuple[str, int]]:
+        """Add the pending usage of every period and read back the totals of `periods`."""
+        with self._connection_lock:
+            with self._connection:
+                self._connection.executemany(
+                    "INSERT INTO usage (project, period, tokens) VALUES (?, ?, ?) "
+                    "ON CONFLICT (project, period) DO UPDATE SET tokens = tokens + excluded.tokens",
+                    [
+                        (self._project, period, tokens)
+                        for period, tokens in pending.items()
+                    ],
+                )
+            totals = {}
+            for window, period in periods.items():
+                row = self._connection.execute(
+                    "SELECT tokens FROM usage WHERE project = ? AND period = ?",
+                    (self._project, period),
+                ).fetchone()
+                totals[window] = (period, row[0] if row else 0)
+        return totals
+
+    def _refresh(self, totals: dict[BudgetWindow, tuple[str, int]]) -> None:
+        self._refreshed_at = time.monotonic()
+        for window, (period, total) in totals.items():
+            if self._periods[window][0] != period:
+                # a new period started while writing
+                continue
+            # usage recorded while writing is not in the database yet
+            self._used[window] = total + self._pending.get(period, 0)
+
+    def _current_period(self, window: BudgetWindow, now: datetime) -> str:
+        period, end = self._periods[window]
+        if now >= end:
+            period = self._roll(window, now)
+        return period
+
+    def _roll(self, window: BudgetWindow, now: datetime) -> str:
+        period = window.period(now)
+        self._periods[window] = (period, window.next_period_start(now))
+        self._used[window] = 0
+        return period
+
+
+class BudgetLimiter(Limiter):
+    """Limits requests to the token budgets of a project.
+
+    The request estimate is reserved until the request is released, the real usage being
+    recorded by `LLMBudgetEvents` once known. When a budget cannot afford the request
+    estimate, the request is rejected with `BudgetExhaustedError` or, with `wait=True`,
+    queued until the exhausted windows reset.
+    """
+
+    def __init__(self, budget: TokenBudget, *, wait: bool = False):
+        """Create a new BudgetLimiter."""
+        self._budget = budget
+        self._wait = wait
+
+    @property
+    def budget(self) -> TokenBudget:
+        """The token budget of the limiter."""
+        return self._budget
+
+    async def acquire(self, manifest: Manifest) -> None:
+        """Check the budget can afford the request, waiting for a reset if configured to."""
+        while exhausted := self._exhausted(manifest):
+            if not self._wait:
+                raise BudgetExhaustedError(self._budget.project, exhausted[0].value)
+            await asyncio.sleep(self._budget.reset_delay(exhausted))
+        self._budget.reserve(manifest.request_tokens)
+
+    async def release(self, manifest: Manifest) -> None:
+        """Give back the reserved request estimate."""
+        self._budget.unreserve(manifest.request_tokens)
+
+    def can_acquire(self, manifest: Manifest) -> bool:
+        """Check whether the budget can afford the request."""
+        return not self._exhausted(manifest)
+
+    def acquire_nowait(self, manifest: Manifest) -> None:
+        """Reserve the request estimate."""
+        self._budget.reserve(manifest.request_tokens)
+
+    def acquire_delay(self, manifest: Manifest) -> float:
+        """Estimate how many seconds until the budget can afford the request."""
+        exhausted = self._exhausted(manifest)
+        return self._budget.reset_delay(exhausted) if exhausted else 0
+
+    def _exhausted(self, manifest: Manifest) -> list[BudgetWindow]:
+        if manifest.request_tokens <= 0:
+            # post request accounting always goes through
+            return []
+        return self._budget.exhausted(manifest.request_tokens)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
@@ -4,54 +4,189 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+import asyncio
+import math
+from itertools import islice
+from typing import TYPE_CHECKING, Any
 
 from .base import Limiter, Manifest
+from .errors import LimiterQueueFullError
+from .wait_queue import Waiter, WaitQueue
 
 if TYPE_CHECKING:
-    from collections.abc import Sequence
+    from collections.abc import Mapping, Sequence
+
+_MAX_LOOKAHEAD = 64
+"""Maximum number of queued waiters inspected on every dispatch in atomic mode."""
 
 
 class CompositeLimiter(Limiter):
-    """A composite limiter that combines multiple limiters."""
+    """A composite limiter that combines multiple limiters.
+
+    By default, limiters are acquired one after another. In `atomic` mode, a request waits
+    until every limiter can grant its pass and then takes all of them at once, so it never
+    holds a concurrency slot while waiting for RPM/TPM capacity. Waiters are served by
+    priority and shared fairly between tenants (see `WaitQueue`), but a waiter that does not fit yet can be overtaken by the
+    ones behind it at most `max_skips` times, after which nobody is served ahead of it.
 
-    def __init__(self, limiters: Sequence[Limiter]):
+    When `max_queue_size` is set, requests that would have to wait while that many requests
+    are already waiting are rejected with `LimiterQueueFullError` instead of queueing.
+    """
+
+    def __init__(
+            self,
+            limiters: Sequence[Limiter],
+            *,
+            atomic: bool = False,
+            max_skips: int = 16,
+            priority_aging_interval: float = 30,
+            tenant_weights: Mapping[str, float] | None = None,
+            max_queue_size: int | None = None,
+    ):
         """A composite limiter that combines multiple limiters."""
-        print()
-        print("fnllm/limiting/composite.py CompositeLimiter.__init__() start...")
         self._limiters = limiters
         self._acquire_order = limiters
         self._release_order = limiters[::-1]
-        print("fnllm/limiting/composite.py CompositeLimiter.__init__() end...")
-        print()
+        self._atomic = atomic
+        self._max_skips = max_skips
+        self._queue = WaitQueue(priority_aging_interval, tenant_weights)
+        self._max_queue_size = max_queue_size
+        self._waiting = 0
+        self._wakeup: asyncio.TimerHandle | None = None
 
     async def acquire(self, manifest: Manifest) -> None:
         """Acquire the specified amount of tokens from all limiters."""
+        if self._atomic:
+            await self._acquire_atomic(manifest)
+            return
+
         # this needs to be sequential, the order of the limiters must be respected
         # to avoid deadlocks
-        print()
-        print("fnllm/limiting/composite.py CompositeLimiter.acquire() start...")
-        print(f"fnllm/limiting/composite.py CompositeLimiter.acquire() {manifest=}")
-        for limiter in self._acquire_order:
-            print(f"fnllm/limiting/composite.py CompositeLimiter.acquire() {limiter=}")
-            print(f"fnllm/limiting/composite.py CompositeLimiter.acquire() invoke {limiter} acquire() start...")
-            await limiter.acquire(manifest)
-            print(f"fnllm/limiting/composite.py CompositeLimiter.acquire() invoke {limiter} acquire() end...")
-
-        print("fnllm/limiting/composite.py CompositeLimiter.acquire() end...")
-        print()
+        self._check_queue_size()
+        acquired: list[Limiter] = []
+        self._waiting += 1
+        try:
+            for limiter in self._acquire_order:
+                await limiter.acquire(manifest)
+                acquired.append(limiter)
+        except BaseException:
+            # e.g. cancelled on timeout, do not keep the passes acquired so far
+            for limiter in reversed(acquired):
+                await limiter.release(manifest)
+            raise
+        finally:
+            self._waiting -= 1
 
     async def release(self, manifest: Manifest) -> None:
         """Release all tokens from all limiters."""
         # release in the opposite order we acquired
         # the last limiter acquired should be the first one released
-        print()
-        print("fnllm/limiting/composite.py CompositeLimiter.release() start...")
         for limiter in self._release_order:
-            print(f"fnllm/limiting/composite.py CompositeLimiter.release() {limiter=}")
-            print(f"fnllm/limiting/composite.py CompositeLimiter.release() invoke {limiter} release() start...")
             await limiter.release(manifest)
-            print(f"fnllm/limiting/composite.py CompositeLimiter.release() invoke {limiter} release() end...")
 
-        print("fnllm/limiting/composite.py CompositeLimiter.release() end...")
-        print()
+        if self._atomic:
+            self._dispatch()
+
+    async def refund(self, manifest: Manifest) -> None:
+        """Refund the unused tokens to all limiters."""
+        for limiter in self._release_order:
+            await limiter.refund(manifest)
+
+        if self._atomic:
+            self._dispatch()
+
+    def can_acquire(self, manifest: Manifest) -> bool:
+        """Check whether every limiter can grant a pass right now."""
+        return all(limiter.can_acquire(manifest) for limiter in self._acquire_order)
+
+    def acquire_nowait(self, manifest: Manifest) -> None:
+        """Acquire a pass from every limiter without waiting."""
+        for limiter in self._acquire_order:
+            limiter.acquire_nowait(manifest)
+
+    def acquire_delay(self, manifest: Manifest) -> float:
+        """Estimate how many seconds until every limiter can grant a pass."""
+        return max(
+            (limiter.acquire_delay(manifest) for limiter in self._acquire_order),
+            default=0,
+        )
+
+    def rate_delay(self, manifest: Manifest) -> float:
+        """Estimate how many seconds the rate limits of the limiters delay a pass."""
+        return max(
+            (limiter.rate_delay(manifest) for limiter in self._acquire_order),
+            default=0,
+        )
+
+    def snapshot(self) -> Any:
+        """Get the state of every limiter."""
+        return [limiter.snapshot() for limiter in self._limiters]
+
+    def restore(self, state: Any) -> None:
+        """Restore the state of every limiter."""
+        if len(state) != len(self._limiters):
+            # the limits changed since the snapshot was taken
+            return
+
+        for limiter, limiter_state in zip(self._limiters, state, strict=True):
+            if limiter_state is not None:
+                limiter.restore(limiter_state)
+
+    async def _acquire_atomic(self, manifest: Manifest) -> None:
+        if not self._queue and self.can_acquire(manifest):
+            self.acquire_nowait(manifest)
+            return
+
+        self._check_queue_size()
+        waiter = Waiter(manifest, asyncio.get_running_loop().create_future())
+        self._queue.push(waiter)
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # the passes were granted right before the cancellation landed
+                await self.release(manifest)
+            else:
+                # a cancelled waiter may have been blocking the ones behind it
+                self._dispatch()
+            raise
+
+    def _check_queue_size(self) -> None:
+        waiting = len(self._queue) if self._atomic else self._waiting
+        if self._max_queue_size is not None and waiting >= self._max_queue_size:
+            raise LimiterQueueFullError(self._max_queue_size)
+
+    def _dispatch(self) -> None:
+        """Grant passes to the queued waiters that can be satisfied by all limiters at once."""
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+
+        granted: list[Waiter] = []
+        blocked: Waiter | None = None
+        delay = math.inf
+        for waiter in islice(self._queue.ordered(), _MAX_LOOKAHEAD):
+            if waiter.future.done():
+                continue
+
+            if self.can_acquire(waiter.manifest):
+                self.acquire_nowait(waiter.manifest)
+                waiter.future.set_result(None)
+                granted.append(waiter)
+                if blocked is not None:
+                    blocked.skipped += 1
+                continue
+
+            delay = min(delay, self.acquire_delay(waiter.manifest))
+            if blocked is None:
+                blocked = waiter
+            if blocked.skipped >= self._max_skips:
+                # the first blocked waiter has been overtaken enough, it goes next
+                break
+
+        for waiter in granted:
+            self._queue.remove(waiter)
+
+        if self._queue and delay < math.inf:
+            self._wakeup = asyncio.get_running_loop().call_later(delay, self._dispatch)
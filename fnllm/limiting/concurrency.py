@@ -4,49 +4,75 @@
 
 from __future__ import annotations
 
-from asyncio import Semaphore
+import asyncio
+from collections import deque
 
 from fnllm.limiting.base import Limiter, Manifest
 
 
 class ConcurrencyLimiter(Limiter):
-    """Concurrency limiter class definition."""
+    """Concurrency limiter class definition.
 
-    def __init__(self, semaphore: Semaphore):
+    Slots are counted by the limiter itself (rather than an `asyncio.Semaphore`) so they
+    can also be taken synchronously by `acquire_nowait`. Released slots are handed over to
+    the waiters in arrival order.
+    """
+
+    def __init__(self, max_concurrency: int):
         """Create a new ConcurrencyLimiter."""
-        print("fnllm/limiting/concurrency.py ConcurrencyLimiter.__init__() start...")
-        self._semaphore = semaphore
-        print("fnllm/limiting/concurrency.py ConcurrencyLimiter.__init__() end...")
+        self._max_concurrency = max_concurrency
+        self._in_use = 0
+        self._waiters: deque[asyncio.Future[None]] = deque()
 
     async def acquire(self, manifest: Manifest) -> None:
         """Acquire a concurrency slot."""
-        print()
-        print("fnllm/limiting/concurrency.py ConcurrencyLimiter.acquire() start...")
-        if manifest.request_tokens > 0:
-            await self._semaphore.acquire()
-        print("fnllm/limiting/concurrency.py ConcurrencyLimiter.acquire() end...")
-        print()
+        if manifest.request_tokens <= 0:
+            return
+
+        if not self._waiters and self._in_use < self._max_concurrency:
+            self._in_use += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # the slot was handed over right before the cancellation
+                self._release_slot()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
 
     async def release(self, manifest: Manifest) -> None:
         """Release the concurrency slot."""
-        print()
-        print("fnllm/limiting/concurrency.py ConcurrencyLimiter.release() start...")
-        print(f"fnllm/limiting/concurrency.py ConcurrencyLimiter.release() {manifest.request_tokens > 0=}...")
         if manifest.request_tokens > 0:
-            print(
-                "fnllm/limiting/concurrency.py ConcurrencyLimiter.release() invoke self._semaphore.release() start...")
-            self._semaphore.release()
-            print("fnllm/limiting/concurrency.py ConcurrencyLimiter.release() invoke self._semaphore.release() end...")
+            self._release_slot()
+
+    def can_acquire(self, manifest: Manifest) -> bool:
+        """Check whether a concurrency slot is free."""
+        return manifest.request_tokens <= 0 or (
+            not self._waiters and self._in_use < self._max_concurrency
+        )
+
+    def acquire_nowait(self, manifest: Manifest) -> None:
+        """Take a concurrency slot without waiting."""
+        if manifest.request_tokens > 0:
+            self._in_use += 1
+
+    def _release_slot(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # the slot goes straight to the waiter, `_in_use` is unchanged
+                waiter.set_result(None)
+                return
 
-        print("fnllm/limiting/concurrency.py ConcurrencyLimiter.release() end...")
-        print()
+        self._in_use -= 1
 
     @classmethod
     def from_max_concurrency(cls, max_concurrency: int) -> ConcurrencyLimiter:
         """Create a new ConcurrencyLimiter."""
-        print()
-        print("fnllm/limiting/concurrency.py ConcurrencyLimiter.from_max_concurrency() start...")
-        print("fnllm/limiting/concurrency.py ConcurrencyLimiter.from_max_concurrency() return cls(Semaphore())...")
-        print()
 
-        return cls(Semaphore(max_concurrency))
+        return cls(max_concurrency)
@@ -0,0 +1,23 @@
+# Copyright (c) 2024 Microsoft Corporation.
+
+"""Limiting related errors."""
+
+from __future__ import annotations
+
+
+class LimiterQueueFullError(RuntimeError):
+    """Raised when a request is shed because too many requests are already waiting for the limiter."""
+
+    def __init__(self, max_queue_size: int) -> None:
+        """Init method definition."""
+        super().__init__(
+            f"Limiter queue is full - {max_queue_size} requests are already waiting."
+        )
+
+
+class BudgetExhaustedError(RuntimeError):
+    """Raised when a request does not fit in the remaining token budget."""
+
+    def __init__(self, project: str, window: str) -> None:
+        """Init method definition."""
+        super().__init__(f"Token budget of '{project}' is exhausted for the {window} window.")
@@ -15,3 +15,10 @@ class NoopLimiter(Limiter):
 
     async def release(self, manifest: Manifest) -> None:
         """Do nothing."""
+
+    def can_acquire(self, manifest: Manifest) -> bool:
+        """Always available."""
+        return True
+
+    def acquire_nowait(self, manifest: Manifest) -> None:
+        """Do nothing."""
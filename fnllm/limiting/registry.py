@@ -0,0 +1,69 @@
+# Copyright (c) 2024 Microsoft Corporation.
+
+"""Registry of limiters shared across LLMs."""
+
+from __future__ import annotations
+
+import asyncio
+import weakref
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Hashable
+
+    from .base import Limiter
+
+
+class LimiterRegistry:
+    """Keeps one limiter per quota, so every LLM drawing from the same quota shares the same limits.
+
+    Limiters hold asyncio primitives bound to the event loop they are first contended on,
+    so limiters are registered per running event loop: a later `asyncio.run` gets fresh
+    limiters instead of ones bound to a closed loop. Limiters created outside of an event
+    loop are shared by every LLM created outside of one.
+    """
+
+    def __init__(self):
+        """Create a new LimiterRegistry."""
+        self._limiters: dict[Hashable, Limiter] = {}
+        self._loop_limiters: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, dict[Hashable, Limiter]
+        ] = weakref.WeakKeyDictionary()
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Check whether a limiter is registered for the key in the running event loop."""
+        return key in self._scope()
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], Limiter]) -> Limiter:
+        """Get the limiter registered for the key, creating it with `factory` the first time."""
+        limiters = self._scope()
+        limiter = limiters.get(key)
+        if limiter is None:
+            limiter = limiters[key] = factory()
+        return limiter
+
+    def remove(self, key: Hashable) -> None:
+        """Forget the limiter registered for the key, the next LLM created for it starts fresh."""
+        self._scope().pop(key, None)
+
+    def clear(self) -> None:
+        """Forget every registered limiter, in every event loop."""
+        self._limiters.clear()
+        self._loop_limiters.clear()
+
+    def _scope(self) -> dict[Hashable, Limiter]:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return self._limiters
+
+        limiters = self._loop_limiters.get(loop)
+        if limiters is None:
+            for closed in [other for other in self._loop_limiters if other.is_closed()]:
+                del self._loop_limiters[closed]
+            limiters = self._loop_limiters[loop] = {}
+        return limiters
+
+
+limiter_registry = LimiterRegistry()
+"""The process-wide limiter registry used by the LLM factories."""
@@ -4,70 +4,70 @@
 
 from __future__ import annotations
 
-from datetime import datetime
-
-from aiolimiter import AsyncLimiter
+from typing import Any
 
 from fnllm.limiting.base import Limiter, Manifest
+from fnllm.limiting.token_bucket import TokenBucket
+from fnllm.utils.tracing import TraceLevel, tracer
 
 
 class RPMLimiter(Limiter):
     """RPM limiter class definition."""
 
-    def __init__(self, limiter: AsyncLimiter):
+    def __init__(self, limiter: TokenBucket):
         """Create a new RPMLimiter."""
-        print("fnllm/limiting/rpm.py RPMLimiter.__init__() start...")
         self._limiter = limiter
-        print("fnllm/limiting/rpm.py RPMLimiter.__init__() end...")
-        print()
 
     async def acquire(self, manifest: Manifest) -> None:
         """Acquire a new request."""
-        print()
-        print("fnllm/limiting/rpm.py RPMLimiter.acquire() start...")
-        print(f"fnllm/limiting/rpm.py RPMLimiter.acquire() {self._limiter=}")
-        print(f"fnllm/limiting/rpm.py RPMLimiter.acquire() {manifest=}")
-        print(f"fnllm/limiting/rpm.py RPMLimiter.acquire() {manifest.request_tokens > 0=}")
         # print(f"fnllm/limiting/rpm.py RPMLimiter.acquire() {self._limiter.has_capacity()=}")
 
         if manifest.request_tokens > 0:
-            start_time = datetime.now()
-            print(
-                f"fnllm/limiting/rpm.py RPMLimiter.acquire() at {start_time.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]} start...")
-
-            await self._limiter.acquire()
-            end_time = datetime.now()
-            print(
-                f"fnllm/limiting/rpm.py RPMLimiter.acquire() at {end_time.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]} end...")
-
-            elapsed_time = (end_time - start_time).total_seconds()
-            print(
-                f"fnllm/limiting/rpm.py RPMLimiter.acquire() executed at {elapsed_time:>5.3f} seconds")
+            with tracer.span("limiter.rpm", TraceLevel.DEBUG):
+                await self._limiter.acquire()
 
         # await self._limiter.acquire()
-        print("fnllm/limiting/rpm.py RPMLimiter.acquire() end...")
-        print()
 
     async def release(self, manifest: Manifest) -> None:
         """Do nothing."""
-        print()
-        print("fnllm/limiting/rpm.py RPMLimiter.release() start...")
-        print("fnllm/limiting/rpm.py RPMLimiter.release() Do nothing.")
-        print("fnllm/limiting/rpm.py RPMLimiter.release() end...")
-        print()
+
+    def can_acquire(self, manifest: Manifest) -> bool:
+        """Check whether a request can be sent right now."""
+        return manifest.request_tokens <= 0 or self._limiter.has_capacity()
+
+    def acquire_nowait(self, manifest: Manifest) -> None:
+        """Account for a new request without waiting."""
+        if manifest.request_tokens > 0:
+            self._limiter.consume()
+
+    def acquire_delay(self, manifest: Manifest) -> float:
+        """Estimate how many seconds until a request can be sent."""
+        if manifest.request_tokens <= 0:
+            return 0
+        return self._limiter.delay()
+
+    def snapshot(self) -> Any:
+        """Get the bucket level."""
+        return self._limiter.snapshot()
+
+    def restore(self, state: Any) -> None:
+        """Restore the bucket level."""
+        self._limiter.restore(state)
 
     @classmethod
-    def from_rpm(cls, requests_per_minute: int, burst_mode: bool = True) -> RPMLimiter:
-        """Create a new RPMLimiter."""
-        print()
-        print("fnllm/limiting/rpm.py RPMLimiter.from_rpm() start...")
-        print(f"fnllm/limiting/rpm.py RPMLimiter.from_rpm() {requests_per_minute=}")
-        print(f"fnllm/limiting/rpm.py RPMLimiter.from_rpm() {burst_mode=}")
-        if burst_mode:
-            print(
-                f"fnllm/limiting/rpm.py RPMLimiter.from_rpm() return cls(AsyncLimiter({requests_per_minute}, time_period=60)...")
-            return cls(AsyncLimiter(requests_per_minute, time_period=60))
-
-        print(
-            f"fnllm/limiting/rpm.py RPMLimiter.from_rpm() return cls(AsyncLimiter(1, time_period=60 / {requests_per_minute})...")
-        return cls(AsyncLimiter(1, time_period=60 / requests_per_minute))
+    def from_rpm(
+            cls,
+            requests_per_minute: int,
+            burst_mode: bool = True,
+            burst_size: int | None = None,
+    ) -> RPMLimiter:
+        """Create a new RPMLimiter.
+
+        In burst mode, the whole minute worth of requests can be sent at once, otherwise
+        requests are spread evenly. `burst_size` sets the number of requests that can be
+        sent at once explicitly.
+        """
+        if burst_size is None:
+            burst_size = requests_per_minute if burst_mode else 1
+
+        return cls(TokenBucket(requests_per_minute / 60, burst_size))
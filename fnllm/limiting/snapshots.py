@@ -0,0 +1,86 @@
+# Copyright (c) 2024 Microsoft Corporation.
+
+"""Persistence of limiter state across restarts."""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .base import Limiter
+
+
+class LimiterSnapshots:
+    """Saves the state of named limiters to a JSON file and restores it on startup.
+
+    Snapshots are written every `interval` seconds from a background thread and once more
+    at interpreter shutdown, so a restarted worker resumes with the bucket levels of its
+    predecessor instead of full buckets.
+    """
+
+    def __init__(self, path: str | Path, *, interval: float = 10):
+        """Create a new LimiterSnapshots, loading the snapshots previously saved at `path`."""
+        self._path = Path(path)
+        self._interval = interval
+        self._limiters: dict[str, Limiter] = {}
+        self._states: dict[str, Any] = self._load()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+        atexit.register(self.close)
+
+    def track(self, name: str, limiter: Limiter) -> None:
+        """Restore the last saved state of `limiter` (if any) and save it from now on.
+
+        A limiter tracked under a name already in use (the same quota in a new event loop)
+        takes over the live state of the one it replaces.
+        """
+        with self._lock:
+            previous = self._limiters.get(name)
+            state = previous.snapshot() if previous is not None else self._states.get(name)
+            if state is not None:
+                limiter.restore(state)
+            self._limiters[name] = limiter
+
+        if self._thread is None and self._interval > 0:
+            self._thread = threading.Thread(
+                target=self._run, name="fnllm-limiter-snapshots", daemon=True
+            )
+            self._thread.start()
+
+    def save(self) -> None:
+        """Write the state of the tracked limiters to disk."""
+        with self._lock:
+            for name, limiter in self._limiters.items():
+                self._states[name] = limiter.snapshot()
+
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self._path.with_suffix(f"{self._path.suffix}.tmp")
+            temp_path.write_text(json.dumps(self._states))
+            # atomic, a crash while writing never leaves a truncated file behind
+            os.replace(temp_path, self._path)
+
+    def close(self) -> None:
+        """Stop the periodic snapshots and save a final one."""
+        if self._stopped.is_set():
+            return
+
+        self._stopped.set()
+        atexit.unregister(self.close)
+        if self._limiters:
+            self.save()
+
+    def _load(self) -> dict[str, Any]:
+        try:
+            return json.loads(self._path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self._interval):
+            self.save()
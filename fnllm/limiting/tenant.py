@@ -0,0 +1,112 @@
+# Copyright (c) 2024 Microsoft Corporation.
+
+"""Per-tenant limiter module."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any
+
+from fnllm.limiting.base import Limiter, Manifest
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+class TenantLimiter(Limiter):
+    """Applies a separate limiter to every tenant (`manifest.tenant`).
+
+    The tenant limiters are created lazily with `factory` the first time a tenant is seen,
+    so every tenant gets its own concurrency/TPM caps on top of the shared limits. Beyond
+    `max_tenants`, the limiters of the least recently used idle tenants (no pass acquiring
+    or held) are evicted, an evicted tenant starts again with fresh limits.
+    """
+
+    def __init__(self, factory: Callable[[str], Limiter], *, max_tenants: int = 1000):
+        """Create a new TenantLimiter."""
+        self._factory = factory
+        self._max_tenants = max_tenants
+        self._limiters: OrderedDict[str, Limiter] = OrderedDict()
+        self._active: dict[str, int] = {}
+
+    def limiter(self, tenant: str) -> Limiter:
+        """Get the limiter of a tenant."""
+        limiter = self._limiters.get(tenant)
+        if limiter is None:
+            limiter = self._limiters[tenant] = self._factory(tenant)
+            self._evict(keep=tenant)
+        else:
+            self._limiters.move_to_end(tenant)
+        return limiter
+
+    async def acquire(self, manifest: Manifest) -> None:
+        """Acquire a pass from the tenant limiter."""
+        limiter = self.limiter(manifest.tenant)
+        self._activate(manifest.tenant)
+        try:
+            await limiter.acquire(manifest)
+        except BaseException:
+            self._deactivate(manifest.tenant)
+            raise
+
+    async def release(self, manifest: Manifest) -> None:
+        """Release the pass to the tenant limiter."""
+        await self.limiter(manifest.tenant).release(manifest)
+        self._deactivate(manifest.tenant)
+
+    async def refund(self, manifest: Manifest) -> None:
+        """Refund the unused tokens to the tenant limiter."""
+        await self.limiter(manifest.tenant).refund(manifest)
+
+    def can_acquire(self, manifest: Manifest) -> bool:
+        """Check whether the tenant limiter can grant a pass right now."""
+        return self.limiter(manifest.tenant).can_acquire(manifest)
+
+    def acquire_nowait(self, manifest: Manifest) -> None:
+        """Acquire a pass from the tenant limiter without waiting."""
+        self.limiter(manifest.tenant).acquire_nowait(manifest)
+        self._activate(manifest.tenant)
+
+    def acquire_delay(self, manifest: Manifest) -> float:
+        """Estimate how many seconds until the tenant limiter can grant a pass."""
+        return self.limiter(manifest.tenant).acquire_delay(manifest)
+
+    def rate_delay(self, manifest: Manifest) -> float:
+        """Estimate how many seconds the rate limits of the tenant limiter delay a pass."""
+        return self.limiter(manifest.tenant).rate_delay(manifest)
+
+    def snapshot(self) -> Any:
+        """Get the state of every tenant limiter."""
+        limiters = list(self._limiters.items())
+        return {tenant: limiter.snapshot() for tenant, limiter in limiters}
+
+    def restore(self, state: Any) -> None:
+        """Restore the state of every tenant limiter."""
+        for tenant, limiter_state in state.items():
+            if limiter_state is not None:
+                self.limiter(tenant).restore(limiter_state)
+
+    def _activate(self, tenant: str) -> None:
+        self._active[tenant] = self._active.get(tenant, 0) + 1
+
+    def _deactivate(self, tenant: str) -> None:
+        active = self._active.get(tenant, 0) - 1
+        if active > 0:
+            self._active[tenant] = active
+            return
+
+        self._active.pop(tenant, None)
+        self._evict()
+
+    def _evict(self, keep: str | None = None) -> None:
+        excess = len(self._limiters) - self._max_tenants
+        evicted: list[str] = []
+        # least recently used first, usually stops at the first tenant
+        for tenant in self._limiters:
+            if len(evicted) >= excess:
+                break
+            if tenant != keep and tenant not in self._active:
+                evicted.append(tenant)
+
+        for tenant in evicted:
+            del self._limiters[tenant]
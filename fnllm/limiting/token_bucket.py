@@ -0,0 +1,158 @@
+# Copyright (c) 2024 Microsoft Corporation.
+
+"""Async token bucket on the monotonic clock."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+
+
+@dataclass
+class _Waiter:
+    amount: float
+    future: asyncio.Future[None]
+
+
+class TokenBucket:
+    """An async token bucket refilled continuously on `time.monotonic()`.
+
+    The bucket holds up to `capacity` tokens (the burst size) and refills at `rate` tokens
+    per second, fractional tokens included. Waiters are served in FIFO order and woken up by
+    a single timer set for the moment the first of them fits, instead of polling.
+
+    An acquisition larger than the capacity waits for a full bucket and then takes it into
+    debt, which the following acquisitions wait out, so oversized requests never deadlock.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        """Create a new full TokenBucket refilling `rate` tokens per second, up to `capacity`."""
+        if rate <= 0 or capacity <= 0:
+            msg = "rate and capacity must be positive"
+            raise ValueError(msg)
+
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._waiters: deque[_Waiter] = deque()
+        self._wakeup: asyncio.TimerHandle | None = None
+
+    @property
+    def rate(self) -> float:
+        """Tokens added per second."""
+        return self._rate
+
+    @property
+    def capacity(self) -> float:
+        """Maximum number of tokens held by the bucket (the burst size)."""
+        return self._capacity
+
+    @property
+    def tokens(self) -> float:
+        """Tokens currently available, negative while the bucket is in debt."""
+        self._refill()
+        return self._tokens
+
+    def has_capacity(self, amount: float = 1) -> bool:
+        """Check whether `amount` tokens can be taken right now, without jumping the queue."""
+        self._refill()
+        return not self._waiters and self._tokens >= self._needed(amount)
+
+    def consume(self, amount: float = 1) -> None:
+        """Take `amount` tokens without waiting, possibly putting the bucket into debt."""
+        self._refill()
+        self._tokens -= amount
+
+    def delay(self, amount: float = 1) -> float:
+        """Estimate how many seconds until `amount` tokens can be taken, after the queued waiters."""
+        self._refill()
+        queued = sum(
+            self._needed(waiter.amount)
+            for waiter in self._waiters
+            if not waiter.future.done()
+        )
+        return max(0.0, (queued + self._needed(amount) - self._tokens) / self._rate)
+
+    def snapshot(self) -> dict[str, float]:
+        """Get the bucket level, timestamped on the wall clock so it can be restored after a restart.
+
+        Does not modify the bucket, so it is safe to call from another thread.
+        """
+        elapsed = time.monotonic() - self._updated_at
+        tokens = min(self._capacity, self._tokens + elapsed * self._rate)
+        return {"tokens": tokens, "timestamp": time.time()}
+
+    def restore(self, state: dict[str, float]) -> None:
+        """Restore the bucket level from a `snapshot`, refilled for the time elapsed since."""
+        elapsed = max(0.0, time.time() - state["timestamp"])
+        self._tokens = min(self._capacity, state["tokens"] + elapsed * self._rate)
+        self._updated_at = time.monotonic()
+
+    def refund(self, amount: float) -> None:
+        """Put unused tokens back into the bucket."""
+        self._refill()
+        self._tokens = min(self._capacity, self._tokens + amount)
+        self._wake()
+
+    async def acquire(self, amount: float = 1) -> None:
+        """Wait until `amount` tokens can be taken and take them."""
+        if amount <= 0:
+            return
+
+        if self.has_capacity(amount):
+            # `has_capacity` has just refilled the bucket
+            self._tokens -= amount
+            return
+
+        waiter = _Waiter(amount, asyncio.get_running_loop().create_future())
+        self._waiters.append(waiter)
+        self._wake()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # the tokens were granted right before the cancellation landed
+                self.refund(amount)
+            else:
+                # the cancelled waiter may have been blocking the ones behind it,
+                # `_wake` drops it from the queue
+                self._wake()
+            raise
+
+    def _needed(self, amount: float) -> float:
+        # an amount larger than the bucket only waits for a full bucket
+        return amount if amount < self._capacity else self._capacity
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        tokens = self._tokens + (now - self._updated_at) * self._rate
+        self._tokens = tokens if tokens < self._capacity else self._capacity
+        self._updated_at = now
+
+    def _wake(self) -> None:
+        """Grant tokens to the waiters at the head of the queue and schedule the next wakeup."""
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+
+        self._refill()
+        waiters = self._waiters
+        while waiters:
+            waiter = waiters[0]
+            if waiter.future.done():
+                waiters.popleft()
+                continue
+
+            if self._tokens < self._needed(waiter.amount):
+                break
+
+            self._tokens -= waiter.amount
+            waiter.future.set_result(None)
+            waiters.popleft()
+
+        if waiters:
+            delay = (self._needed(waiters[0].amount) - self._tokens) / self._rate
+            self._wakeup = asyncio.get_running_loop().call_later(delay, self._wake)
@@ -4,48 +4,63 @@
 
 from __future__ import annotations
 
-from aiolimiter import AsyncLimiter
+from typing import Any
 
 from fnllm.limiting.base import Limiter, Manifest
+from fnllm.limiting.token_bucket import TokenBucket
 
 
 class TPMLimiter(Limiter):
     """TPM limiter class definition."""
 
-    def __init__(self, limiter: AsyncLimiter):
+    def __init__(self, limiter: TokenBucket):
         """Create a new RpmLimiter."""
-        print("fnllm/limiting/tpm.py TPMLimiter.__init__() start...")
         self._limiter = limiter
-        print("fnllm/limiting/tpm.py TPMLimiter.__init__() end...")
-        print()
 
     async def acquire(self, manifest: Manifest) -> None:
         """Acquire limiter permission."""
-        print()
-        print("fnllm/limiting/tpm.py TPMLimiter.acquire() start...")
         total_tokens = manifest.request_tokens + manifest.post_request_tokens
-        print(f"fnllm/limiting/tpm.py TPMLimiter.acquire() {total_tokens=}")
 
         if total_tokens > 0:
-            print(f"fnllm/limiting/tpm.py TPMLimiter.acquire() {total_tokens > 0=}")
-            print(f"fnllm/limiting/tpm.py TPMLimiter.acquire() invoke self._limiter.acquire({total_tokens=}) start...")
             await self._limiter.acquire(total_tokens)
-            print(f"fnllm/limiting/tpm.py TPMLimiter.acquire() invoke self._limiter.acquire({total_tokens=}) end...")
-        print("fnllm/limiting/tpm.py TPMLimiter.acquire() end...")
-        print()
 
     async def release(self, manifest: Manifest) -> None:
         """Do nothing."""
-        print()
-        print("fnllm/limiting/tpm.py TPMLimiter.release() start...")
-        print("fnllm/limiting/tpm.py TPMLimiter.release() Do nothing....")
-        print("fnllm/limiting/tpm.py TPMLimiter.release() end...")
-        print()
+
+    async def refund(self, manifest: Manifest) -> None:
+        """Return unused tokens to the bucket."""
+        if manifest.post_request_tokens > 0:
+            self._limiter.refund(manifest.post_request_tokens)
+
+    def can_acquire(self, manifest: Manifest) -> bool:
+        """Check whether the tokens fit in the bucket right now."""
+        total_tokens = manifest.request_tokens + manifest.post_request_tokens
+        return total_tokens <= 0 or self._limiter.has_capacity(total_tokens)
+
+    def acquire_nowait(self, manifest: Manifest) -> None:
+        """Consume the tokens without waiting."""
+        total_tokens = manifest.request_tokens + manifest.post_request_tokens
+        if total_tokens > 0:
+            self._limiter.consume(total_tokens)
+
+    def acquire_delay(self, manifest: Manifest) -> float:
+        """Estimate how many seconds until the tokens fit in the bucket."""
+        total_tokens = manifest.request_tokens + manifest.post_request_tokens
+        if total_tokens <= 0:
+            return 0
+        return self._limiter.delay(total_tokens)
+
+    def snapshot(self) -> Any:
+        """Get the bucket level."""
+        return self._limiter.snapshot()
+
+    def restore(self, state: Any) -> None:
+        """Restore the bucket level."""
+        self._limiter.restore(state)
 
     @classmethod
-    def from_tpm(cls, tokens_per_minute: int) -> TPMLimiter:
-        """Create a new RpmLimiter."""
-        print()
-        print("fnllm/limiting/tpm.py TPMLimiter.from_tpm() start...")
-        print(f"fnllm/limiting/tpm.py TPMLimiter.from_tpm() return cls(AsyncLimiter({tokens_per_minute=}))...")
-        return cls(AsyncLimiter(tokens_per_minute))
+    def from_tpm(
+            cls, tokens_per_minute: int, burst_size: int | None = None
+    ) -> TPMLimiter:
+        """Create a new TPMLimiter, allowing up to `burst_size` tokens (a minute worth by default) at once."""
+        return cls(TokenBucket(tokens_per_minute / 60, burst_size or tokens_per_minute))
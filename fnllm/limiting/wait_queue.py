@@ -0,0 +1,164 @@
+# Copyright (c) 2024 Microsoft Corporation.
+
+"""Queue of requests waiting for their limiter passes."""
+
+from __future__ import annotations
+
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from heapq import heappop, heappush
+from itertools import count
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import asyncio
+    from collections.abc import Iterator, Mapping
+
+    from .base import Manifest
+
+_sequence = count()
+
+
+@dataclass
+class Waiter:
+    """A request waiting for its limiter passes."""
+
+    manifest: Manifest
+    """The manifest to acquire."""
+
+    future: asyncio.Future[None]
+    """Resolved once the passes have been granted."""
+
+    enqueued_at: float = field(default_factory=time.monotonic)
+    """When the waiter joined the queue (monotonic clock)."""
+
+    skipped: int = 0
+    """How many times waiters behind this one were served ahead of it."""
+
+    start_tag: float = 0
+    """Virtual start time used to share the priority class fairly between tenants."""
+
+    sequence: int = field(default_factory=lambda: next(_sequence))
+    """Insertion order, used to break ties."""
+
+
+@dataclass
+class _PriorityClass:
+    """The waiters of one priority, queued per tenant."""
+
+    tenants: dict[str, deque[Waiter]] = field(default_factory=dict)
+    finish_tags: dict[str, float] = field(default_factory=dict)
+    virtual_time: float = 0
+
+    def oldest(self) -> float:
+        return min(waiters[0].enqueued_at for waiters in self.tenants.values())
+
+
+class WaitQueue:
+    """A priority-aware, tenant-fair queue with aging.
+
+    Priority classes are served by effective priority: their priority plus one level for
+    every `aging_interval` seconds the oldest waiter spent waiting, so low priority requests
+    are not starved by a steady stream of higher priority ones.
+
+    Inside a priority class, tenants (`manifest.tenant`) share the service using start-time
+    fair queuing: every request costs its tokens divided by the tenant weight, so a tenant
+    submitting a large backlog cannot monopolize the queue. Requests of the same tenant are
+    served in FIFO order.
+    """
+
+    def __init__(
+            self,
+            aging_interval: float = 30,
+            tenant_weights: Mapping[str, float] | None = None,
+    ):
+        """Create a new WaitQueue. An `aging_interval` of 0 disables aging."""
+        self._aging_interval = aging_interval
+        self._tenant_weights = tenant_weights or {}
+        self._classes: dict[int, _PriorityClass] = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        """Number of queued waiters."""
+        return self._size
+
+    def push(self, waiter: Waiter) -> None:
+        """Add a waiter to the end of its tenant queue."""
+        manifest = waiter.manifest
+        klass = self._classes.setdefault(manifest.priority, _PriorityClass())
+        waiter.start_tag = max(
+            klass.virtual_time, klass.finish_tags.get(manifest.tenant, 0)
+        )
+        weight = self._tenant_weights.get(manifest.tenant, 1)
+        cost = max(1, manifest.request_tokens + manifest.post_request_tokens)
+        klass.finish_tags[manifest.tenant] = waiter.start_tag + cost / weight
+        klass.tenants.setdefault(manifest.tenant, deque()).append(waiter)
+        self._size += 1
+
+    def remove(self, waiter: Waiter) -> None:
+        """Remove a waiter from the queue, advancing the virtual time of its class."""
+        manifest = waiter.manifest
+        klass = self._classes[manifest.priority]
+        waiters = klass.tenants[manifest.tenant]
+        waiters.remove(waiter)
+        self._size -= 1
+        if waiter.future.done() and not waiter.future.cancelled():
+            klass.virtual_time = max(klass.virtual_time, waiter.start_tag)
+        self._discard_empty(manifest.priority, manifest.tenant)
+
+    def ordered(self) -> Iterator[Waiter]:
+        """Iterate over the waiters in service order.
+
+        Waiters that are already done (e.g. cancelled) are dropped from the front of each
+        tenant queue, others may still be yielded and should be skipped by the caller. The
+        queue must not be modified while iterating.
+        """
+        self._drop_done()
+        now = time.monotonic()
+        heap: list[tuple[float, float, int, int, str, int]] = []
+        for priority, klass in self._classes.items():
+            effective_priority = float(priority)
+            if self._aging_interval > 0:
+                effective_priority += (now - klass.oldest()) / self._aging_interval
+            for tenant in klass.tenants:
+                self._push_candidate(heap, -effective_priority, priority, tenant, 0)
+
+        while heap:
+            rank, *_, priority, tenant, index = heappop(heap)
+            yield self._classes[priority].tenants[tenant][index]
+            self._push_candidate(heap, rank, priority, tenant, index + 1)
+
+    def _push_candidate(
+            self,
+            heap: list[tuple[float, float, int, int, str, int]],
+            rank: float,
+            priority: int,
+            tenant: str,
+            index: int,
+    ) -> None:
+        waiters = self._classes[priority].tenants[tenant]
+        if index < len(waiters):
+            waiter = waiters[index]
+            heappush(
+                heap,
+                (rank, waiter.start_tag, waiter.sequence, priority, tenant, index),
+            )
+
+    def _drop_done(self) -> None:
+        for priority, klass in list(self._classes.items()):
+            for tenant, waiters in list(klass.tenants.items()):
+                while waiters and waiters[0].future.done():
+                    waiters.popleft()
+                    self._size -= 1
+                self._discard_empty(priority, tenant)
+
+    def _discard_empty(self, priority: int, tenant: str) -> None:
+        klass = self._classes[priority]
+        if klass.tenants[tenant]:
+            return
+
+        del klass.tenants[tenant]
+        if not klass.tenants:
+            # nobody is waiting anymore, the fair share accounting starts over
+            del self._classes[priority]
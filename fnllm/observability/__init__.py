@@ -0,0 +1,8 @@
+# Copyright (c) 2024 Microsoft Corporation.
+
+"""Observability package, exporting the model requests to a backend (e.g. Langfuse)."""
+
+from .base import Generation, ObservabilityExporter
+from .recorder import ObservabilityRecorder
+
+__all__ = ["Generation", "ObservabilityExporter", "ObservabilityRecorder"]
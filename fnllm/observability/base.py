@@ -0,0 +1,52 @@
+# Copyright (c) 2024 Microsoft Corporation.
+
+"""Base observability types."""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any
+
+
+@dataclass
+class Generation:
+    """A model request, as exported to an observability backend."""
+
+    name: str
+    """The operation, e.g. `chat.completions` or `embeddings`."""
+
+    model: str | None
+    """The requested model."""
+
+    input: Any
+    """The messages (chat) or input (embeddings) of the request."""
+
+    parameters: dict[str, Any] = field(default_factory=dict)
+    """The other parameters of the request."""
+
+    output: Any = None
+    """The response, `None` for failed requests and streams."""
+
+    usage: dict[str, int] | None = None
+    """The `input`, `output` and `total` tokens, if reported."""
+
+    start_time: float = 0
+    """The `time.time()` the request was sent."""
+
+    end_time: float = 0
+    """The `time.time()` the response (or the first chunk of a stream) was received."""
+
+    error: str | None = None
+    """The error of a failed request."""
+
+
+class ObservabilityExporter(ABC):
+    """Sends the recorded generations to an observability backend."""
+
+    @abstractmethod
+    async def export(self, generations: list[Generation]) -> None:
+        """Export a batch of generations."""
+
+    async def aclose(self) -> None:
+        """Flush and close the backend client."""
@@ -0,0 +1,59 @@
+# Copyright (c) 2024 Microsoft Corporation.
+
+"""Langfuse observability exporter."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any
+
+from .base import Generation, ObservabilityExporter
+
+if TYPE_CHECKING:
+    from langfuse import Langfuse
+
+
+class LangfuseExporter(ObservabilityExporter):
+    """Exports the generations to Langfuse (requires the `langfuse` package).
+
+    The client is configured from the `LANGFUSE_*` environment variables unless given.
+    """
+
+    def __init__(self, client: Langfuse | None = None, **kwargs: Any):
+        """Create a new LangfuseExporter, `kwargs` being passed to the `Langfuse` client."""
+        if client is None:
+            from langfuse import Langfuse
+
+            client = Langfuse(**kwargs)
+        self._client = client
+
+    async def export(self, generations: list[Generation]) -> None:
+        """Send the generations to the Langfuse client, which uploads them in the background."""
+        for generation in generations:
+            self._client.generation(
+                name=generation.name,
+                model=generation.model,
+                model_parameters=generation.parameters,
+                input=generation.input,
+                output=_to_json(generation.output),
+                usage_details=generation.usage,
+                start_time=_datetime(generation.start_time),
+                end_time=_datetime(generation.end_time),
+                level="ERROR" if generation.error else None,
+                status_message=generation.error,
+            )
+
+    async def aclose(self) -> None:
+        """Upload the pending generations."""
+        await asyncio.to_thread(self._client.flush)
+
+
+def _datetime(timestamp: float) -> datetime:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc)
+
+
+def _to_json(value: Any) -> Any:
+    if hasattr(value, "model_dump"):
+        return value.model_dump(exclude_unset=True)
+    return value
@@ -0,0 +1,91 @@
+# Copyright (c) 2024 Microsoft Corporation.
+
+"""Sampled, asynchronous recording of the model requests."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+from collections import deque
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .base import Generation, ObservabilityExporter
+
+_log = logging.getLogger(__name__)
+
+
+class ObservabilityRecorder:
+    """Queues the sampled generations and exports them in the background.
+
+    `sample_rate` of the requests are recorded, the others cost a random draw. Recording
+    never blocks the request: generations are appended to a queue of `max_queue_size`,
+    dropped (and counted in `dropped`) when it is full, and a background task exports them
+    in batches of up to `batch_size`. Export errors are logged and the batch dropped.
+    """
+
+    def __init__(
+            self,
+            exporter: ObservabilityExporter,
+            *,
+            sample_rate: float = 1.0,
+            max_queue_size: int = 1000,
+            batch_size: int = 100,
+    ):
+        """Create a new ObservabilityRecorder."""
+        self._exporter = exporter
+        self._sample_rate = sample_rate
+        self._max_queue_size = max_queue_size
+        self._batch_size = batch_size
+        self._queue: deque[Generation] = deque()
+        self._worker: asyncio.Task[None] | None = None
+        self.dropped = 0
+
+    @property
+    def exporter(self) -> ObservabilityExporter:
+        """The exporter of the generations."""
+        return self._exporter
+
+    def sampled(self) -> bool:
+        """Draw whether the next request is recorded."""
+        return (
+                self._sample_rate >= 1
+                or random.random() < self._sample_rate  # noqa: S311
+        )
+
+    def record(self, generation: Generation) -> None:
+        """Queue a generation for export, dropping it when the queue is full."""
+        if len(self._queue) >= self._max_queue_size:
+            self.dropped += 1
+            return
+
+        self._queue.append(generation)
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._export_loop())
+
+    async def flush(self) -> None:
+        """Export the queued generations right away."""
+        while self._queue:
+            await self._export_batch()
+
+    async def aclose(self) -> None:
+        """Export the queued generations and close the exporter."""
+        if self._worker is not None:
+            await self._worker
+            self._worker = None
+        await self.flush()
+        await self._exporter.aclose()
+
+    async def _export_loop(self) -> None:
+        # runs until the queue is empty, `record` starts a new one afterwards
+        while self._queue:
+            await self._export_batch()
+
+    async def _export_batch(self) -> None:
+        size = min(self._batch_size, len(self._queue))
+        batch = [self._queue.popleft() for _ in range(size)]
+        try:
+            await self._exporter.export(batch)
+        except Exception:
+            _log.exception("failed to export %d generations", len(batch))
@@ -1,34 +1,94 @@
 # Copyright (c) 2024 Microsoft Corporation.
 
 
-"""OpenAI LLM implementations."""
+"""OpenAI LLM implementations.
 
-from .config import AzureOpenAIConfig, OpenAIConfig, PublicOpenAIConfig
-from .factories import (
-    create_openai_chat_llm,
-    create_openai_client,
-    create_openai_embeddings_llm,
-)
-from .roles import OpenAIChatRole
-from .types.client import (
-    OpenAIClient,
-    OpenAIEmbeddingsLLM,
-    OpenAIStreamingChatLLM,
-    OpenAITextChatLLM,
+The exports are imported lazily, on first use, so importing the package stays cheap.
+"""
+
+from typing import TYPE_CHECKING
+
+from fnllm.utils.lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .config import AzureOpenAIConfig, OpenAIConfig, PublicOpenAIConfig
+    from .factories import (
+        OpenAILLMRegistry,
+        close_http_clients,
+        create_openai_batch_chat_llm,
+        create_openai_batch_client,
+        create_openai_batch_embeddings_llm,
+        create_openai_chat_llm,
+        create_openai_client,
+        create_openai_embeddings_llm,
+        create_openai_load_balanced_chat_llm,
+        create_openai_load_balanced_embeddings_llm,
+        openai_llm_registry,
+        prewarm_openai_client,
+    )
+    from .llm.batch import OpenAIBatchClient
+    from .llm.load_balancer import LoadBalancedEndpoint, OpenAILoadBalancedLLM
+    from .roles import OpenAIChatRole
+    from .types.client import (
+        OpenAIClient,
+        OpenAIEmbeddingsLLM,
+        OpenAIStreamingChatLLM,
+        OpenAITextChatLLM,
+    )
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "AzureOpenAIConfig": ".config",
+        "OpenAIConfig": ".config",
+        "PublicOpenAIConfig": ".config",
+        "OpenAILLMRegistry": ".factories",
+        "close_http_clients": ".factories",
+        "create_openai_batch_chat_llm": ".factories",
+        "create_openai_batch_client": ".factories",
+        "create_openai_batch_embeddings_llm": ".factories",
+        "create_openai_chat_llm": ".factories",
+        "create_openai_client": ".factories",
+        "create_openai_embeddings_llm": ".factories",
+        "create_openai_load_balanced_chat_llm": ".factories",
+        "create_openai_load_balanced_embeddings_llm": ".factories",
+        "openai_llm_registry": ".factories",
+        "prewarm_openai_client": ".factories",
+        "OpenAIBatchClient": ".llm.batch",
+        "LoadBalancedEndpoint": ".llm.load_balancer",
+        "OpenAILoadBalancedLLM": ".llm.load_balancer",
+        "OpenAIChatRole": ".roles",
+        "OpenAIClient": ".types.client",
+        "OpenAIEmbeddingsLLM": ".types.client",
+        "OpenAIStreamingChatLLM": ".types.client",
+        "OpenAITextChatLLM": ".types.client",
+    },
 )
 
 # TODO: include type aliases?
 __all__ = [
     "AzureOpenAIConfig",
+    "LoadBalancedEndpoint",
+    "OpenAIBatchClient",
     "OpenAIChatRole",
     "OpenAIClient",
     "OpenAIConfig",
     "OpenAIConfig",
     "OpenAIEmbeddingsLLM",
+    "OpenAILLMRegistry",
+    "OpenAILoadBalancedLLM",
     "OpenAIStreamingChatLLM",
     "OpenAITextChatLLM",
     "PublicOpenAIConfig",
+    "close_http_clients",
+    "create_openai_batch_chat_llm",
+    "create_openai_batch_client",
+    "create_openai_batch_embeddings_llm",
     "create_openai_chat_llm",
     "create_openai_client",
     "create_openai_embeddings_llm",
+    "create_openai_load_balanced_chat_llm",
+    "create_openai_load_balanced_embeddings_llm",
+    "openai_llm_registry",
+    "prewarm_openai_client",
 ]
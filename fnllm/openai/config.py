@@ -43,9 +43,64 @@ class CommonOpenAIConfig(Config, frozen=True, extra="allow", protected_namespace
         description="Global embeddings parameters to be used across calls.",
     )
 
-    sleep_on_rate_limit_recommendation: bool = Field(
+    fallback_models: list[str] = Field(
+        default_factory=list,
+        description="Chat models (deployments on Azure) to fall back to, in order, when the model retries are exhausted, its circuit is open or its limiter wait exceeds `fallback_wait_threshold`.",
+    )
+
+    fallback_wait_threshold: float | None = Field(
+        default=None,
+        description="Fall back to the next model when the projected limiter wait exceeds this many seconds. None never falls back on waits.",
+    )
+
+    batch_max_size: int = Field(
+        default=50_000,
+        description="The max number of requests of a Batch API batch.",
+    )
+
+    batch_flush_interval: float = Field(
+        default=5,
+        description="Seconds to accumulate requests before submitting a Batch API batch.",
+    )
+
+    batch_poll_interval: float = Field(
+        default=30,
+        description="Seconds between two Batch API batch status checks.",
+    )
+
+    batch_dir: str | None = Field(
+        default=None,
+        description="The directory to keep the Batch API JSONL request files in. Temporary files are used and removed when not set.",
+    )
+
+    http_max_connections: int | None = Field(
+        default=None,
+        description="The max number of open HTTP connections. Defaults to `max_concurrency` (or the OpenAI client default of 1000 without it).",
+    )
+
+    http_max_keepalive_connections: int | None = Field(
+        default=None,
+        description="The max number of idle HTTP connections kept alive for reuse. Defaults to `http_max_connections`, so concurrent requests do not pay a new TLS handshake.",
+    )
+
+    http_keepalive_expiry: float = Field(
+        default=30,
+        description="Seconds an idle HTTP connection is kept alive.",
+    )
+
+    http2: bool = Field(
         default=False,
-        description="Whether to sleep on rate limit recommendation.",
+        description="Whether to use HTTP/2, multiplexing the requests over a few connections. Requires the `h2` package (`httpx[http2]`).",
+    )
+
+    http_prewarm_connections: int = Field(
+        default=0,
+        description="The number of HTTP connections opened ahead of the first request by `prewarm_openai_client`.",
+    )
+
+    sleep_on_rate_limit_recommendation: bool = Field(
+        default=True,
+        description="Whether to wait as recommended by the `retry-after-ms`/`retry-after` headers (or the Azure error message) before retrying.",
     )
 
 
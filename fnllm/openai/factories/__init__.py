@@ -2,12 +2,55 @@
 
 """Methods to create OpenAI instances."""
 
-from .chat import create_openai_chat_llm
-from .client import create_openai_client
-from .embeddings import create_openai_embeddings_llm
+from typing import TYPE_CHECKING
+
+from fnllm.utils.lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .batch import (
+        create_openai_batch_chat_llm,
+        create_openai_batch_client,
+        create_openai_batch_embeddings_llm,
+    )
+    from .chat import create_openai_chat_llm
+    from .client import create_openai_client
+    from .embeddings import create_openai_embeddings_llm
+    from .http_client import close_http_clients, prewarm_openai_client
+    from .load_balancer import (
+        create_openai_load_balanced_chat_llm,
+        create_openai_load_balanced_embeddings_llm,
+    )
+    from .registry import OpenAILLMRegistry, openai_llm_registry
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "create_openai_batch_chat_llm": ".batch",
+        "create_openai_batch_client": ".batch",
+        "create_openai_batch_embeddings_llm": ".batch",
+        "create_openai_chat_llm": ".chat",
+        "create_openai_client": ".client",
+        "create_openai_embeddings_llm": ".embeddings",
+        "close_http_clients": ".http_client",
+        "prewarm_openai_client": ".http_client",
+        "create_openai_load_balanced_chat_llm": ".load_balancer",
+        "create_openai_load_balanced_embeddings_llm": ".load_balancer",
+        "OpenAILLMRegistry": ".registry",
+        "openai_llm_registry": ".registry",
+    },
+)
 
 __all__ = [
+    "OpenAILLMRegistry",
+    "close_http_clients",
+    "create_openai_batch_chat_llm",
+    "create_openai_batch_client",
+    "create_openai_batch_embeddings_llm",
     "create_openai_chat_llm",
     "create_openai_client",
     "create_openai_embeddings_llm",
+    "create_openai_load_balanced_chat_llm",
+    "create_openai_load_balanced_embeddings_llm",
+    "openai_llm_registry",
+    "prewarm_openai_client",
 ]
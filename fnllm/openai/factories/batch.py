@@ -0,0 +1,98 @@
+# Copyright (c) 2024 Microsoft Corporation.
+
+"""Factory functions for creating OpenAI LLMs running on the Batch API."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from fnllm.openai.llm.batch import OpenAIBatchClient
+from fnllm.openai.llm.chat_text import OpenAITextChatLLMImpl
+from fnllm.openai.llm.embeddings import OpenAIEmbeddingsLLMImpl
+from fnllm.openai.llm.features.tools_parsing import OpenAIParseToolsLLM
+from fnllm.openai.llm.services.history_extractor import OpenAIHistoryExtractor
+from fnllm.openai.llm.services.json import create_json_handler
+from fnllm.openai.llm.services.usage_extractor import OpenAIUsageExtractor
+from fnllm.services.cache_interactor import CacheInteractor
+from fnllm.services.variable_injector import VariableInjector
+
+from .client import create_openai_client
+from .utils import create_events
+
+if TYPE_CHECKING:
+    from fnllm.caching.base import Cache
+    from fnllm.events.base import LLMEvents
+    from fnllm.openai.config import OpenAIConfig
+    from fnllm.openai.types.client import (
+        OpenAIClient,
+        OpenAIEmbeddingsLLM,
+        OpenAITextChatLLM,
+    )
+
+
+def create_openai_batch_client(
+        config: OpenAIConfig, *, client: OpenAIClient | None = None
+) -> OpenAIBatchClient:
+    """Create a client running the calls of the batch LLMs through the Batch API."""
+    return OpenAIBatchClient(
+        client or create_openai_client(config),
+        max_batch_size=config.batch_max_size,
+        flush_interval=config.batch_flush_interval,
+        poll_interval=config.batch_poll_interval,
+        batch_dir=config.batch_dir,
+        # Azure batch files use deployment relative URLs
+        url_prefix="" if config.azure else "/v1",
+    )
+
+
+def create_openai_batch_chat_llm(
+        config: OpenAIConfig,
+        *,
+        batch_client: OpenAIBatchClient,
+        cache: Cache | None = None,
+        cache_interactor: CacheInteractor | None = None,
+        events: LLMEvents | None = None,
+) -> OpenAITextChatLLM:
+    """Create an OpenAI chat LLM whose calls run through the Batch API.
+
+    Batches are not rate limited, so the LLM has no rate limiter nor retryer. Responses
+    are cached like the ones of `create_openai_chat_llm`.
+    """
+    events = create_events(config, events)
+    result = OpenAITextChatLLMImpl(
+        batch_client,  # type: ignore[arg-type]
+        model=config.model,
+        model_parameters=config.chat_parameters,
+        cache=cache_interactor or CacheInteractor(events, cache),
+        events=events,
+        json_handler=create_json_handler(config.json_strategy, config.max_json_retries),
+        usage_extractor=OpenAIUsageExtractor(),
+        history_extractor=OpenAIHistoryExtractor(),
+        variable_injector=VariableInjector(),
+    )
+    return OpenAIParseToolsLLM(result)
+
+
+def create_openai_batch_embeddings_llm(
+        config: OpenAIConfig,
+        *,
+        batch_client: OpenAIBatchClient,
+        cache: Cache | None = None,
+        cache_interactor: CacheInteractor | None = None,
+        events: LLMEvents | None = None,
+) -> OpenAIEmbeddingsLLM:
+    """Create an OpenAI embeddings LLM whose calls run through the Batch API.
+
+    Batches are not rate limited, so the LLM has no rate limiter nor retryer. Responses
+    are cached like the ones of `create_openai_embeddings_llm`.
+    """
+    events = create_events(config, events)
+    return OpenAIEmbeddingsLLMImpl(
+        batch_client,  # type: ignore[arg-type]
+        model=config.model,
+        model_parameters=config.embeddings_parameters,
+        cache=cache_interactor or CacheInteractor(events, cache),
+        events=events,
+        usage_extractor=OpenAIUsageExtractor(),
+        variable_injector=VariableInjector(),
+    )
@@ -2,9 +2,10 @@
 
 """Factory functions for creating OpenAI LLMs."""
 
+from typing import Any, cast
+
 from fnllm.caching.base import Cache
 from fnllm.events.base import LLMEvents
-from fnllm.limiting.base import Limiter
 from fnllm.openai.config import OpenAIConfig
 from fnllm.openai.llm.chat import OpenAIChatLLMImpl
 from fnllm.openai.llm.chat_streaming import OpenAIStreamingChatLLMImpl
@@ -20,10 +21,19 @@ from fnllm.openai.types.client import (
     OpenAITextChatLLM,
 )
 from fnllm.services.cache_interactor import CacheInteractor
+from fnllm.services.rate_limiter import RateLimiter
 from fnllm.services.variable_injector import VariableInjector
 
 from .client import create_openai_client
-from .utils import create_limiter, create_rate_limiter, create_retryer
+from .utils import (
+    create_circuit_breaker,
+    create_encoder,
+    create_events,
+    create_hedger,
+    create_rate_limiter,
+    create_retryer,
+    get_limiter,
+)
 
 
 def create_openai_chat_llm(
@@ -34,41 +44,83 @@ def create_openai_chat_llm(
         cache_interactor: CacheInteractor | None = None,
         events: LLMEvents | None = None,
 ) -> OpenAIChatLLM:
-    """Create an OpenAI chat LLM."""
-    print()
-    print("fnllm/openai/factories/chat.py create_openai_chat_llm() start...")
+    """Create an OpenAI chat LLM, falling back to the `fallback_models` chain if any."""
+    fallback = _create_fallback_chat_llm(
+        config,
+        client=client,
+        cache=cache,
+        cache_interactor=cache_interactor,
+        events=events,
+    )
     if client is None:
-        print("fnllm/openai/factories/chat.py create_openai_chat_llm() invoke create_openai_client()start...")
         client = create_openai_client(config)
-        print("fnllm/openai/factories/chat.py create_openai_chat_llm() invoke create_openai_client() end...")
 
-    print("fnllm/openai/factories/chat.py create_openai_chat_llm() invoke create_limiter() start...")
-    limiter = create_limiter(config)
-    print("fnllm/openai/factories/chat.py create_openai_chat_llm() invoke create_limiter() end...")
+    events = create_events(config, events)
+    # shared by the text and streaming LLMs, which learn the output sizes together
+    rate_limiter = create_rate_limiter(
+        limiter=get_limiter(config),
+        config=config,
+        events=events,
+        max_tokens=config.chat_parameters.get("max_completion_tokens")
+        or config.chat_parameters.get("max_tokens"),
+    )
 
-    print("fnllm/openai/factories/chat.py create_openai_chat_llm() invoke _create_openai_text_chat_llm() start...")
     text_chat_llm = _create_openai_text_chat_llm(
         client=client,
         config=config,
         cache=cache,
         cache_interactor=cache_interactor,
         events=events,
-        limiter=limiter,
+        rate_limiter=rate_limiter,
     )
-    print("fnllm/openai/factories/chat.py create_openai_chat_llm() invoke _create_openai_text_chat_llm() end...")
 
-    print("fnllm/openai/factories/chat.py create_openai_chat_llm() invoke _create_openai_streaming_chat_llm() end...")
     streaming_chat_llm = _create_openai_streaming_chat_llm(
         client=client,
         config=config,
         events=events,
-        limiter=limiter,
+        rate_limiter=rate_limiter,
     )
-    print("fnllm/openai/factories/chat.py create_openai_chat_llm() invoke _create_openai_streaming_chat_llm() end...")
 
     return OpenAIChatLLMImpl(
         text_chat_llm=text_chat_llm,
         streaming_chat_llm=streaming_chat_llm,
+        model=config.model,
+        fallback=fallback,
+        rate_limiter=rate_limiter,
+        fallback_wait_threshold=config.fallback_wait_threshold,
+    )
+
+
+def _create_fallback_chat_llm(
+        config: OpenAIConfig,
+        *,
+        client: OpenAIClient | None,
+        cache: Cache | None,
+        cache_interactor: CacheInteractor | None,
+        events: LLMEvents | None,
+) -> OpenAIChatLLMImpl | None:
+    """Create the LLM of the next model of the fallback chain, if any."""
+    if not config.fallback_models:
+        return None
+
+    model, *fallback_models = config.fallback_models
+    update: dict[str, Any] = {"model": model, "fallback_models": fallback_models}
+    if config.azure:
+        # the client is bound to the deployment
+        update["deployment"] = model
+        client = None
+
+    # the model is part of the cache keys and of the limiter key, so every model of the
+    # chain gets its own cache entries and limits
+    return cast(
+        OpenAIChatLLMImpl,
+        create_openai_chat_llm(
+            config.model_copy(update=update),
+            client=client,
+            cache=cache,
+            cache_interactor=cache_interactor,
+            events=events,
+        ),
     )
 
 
@@ -76,33 +128,16 @@ def _create_openai_text_chat_llm(
         *,
         client: OpenAIClient,
         config: OpenAIConfig,
-        limiter: Limiter,
+        rate_limiter: RateLimiter[Any, Any, Any, Any],
         cache: Cache | None,
         cache_interactor: CacheInteractor | None,
         events: LLMEvents | None,
 ) -> OpenAITextChatLLM:
-    print("fnllm/openai/factories/chat.py _create_openai_text_chat_llm() start...")
-    print(f"fnllm/openai/factories/chat.py _create_openai_text_chat_llm() {config=}")
-    print(f"fnllm/openai/factories/chat.py _create_openai_text_chat_llm() {limiter=}")
-    print(f"fnllm/openai/factories/chat.py _create_openai_text_chat_llm() {cache=}")
-    print(f"fnllm/openai/factories/chat.py _create_openai_text_chat_llm() {cache_interactor=}")
-    print(f"fnllm/openai/factories/chat.py _create_openai_text_chat_llm() {events=}")
     operation = "chat"
-    print("fnllm/openai/factories/chat.py _create_openai_text_chat_llm() invoke create_json_handler() start...")
     json_handler = create_json_handler(config.json_strategy, config.max_json_retries)
-    print("fnllm/openai/factories/chat.py _create_openai_text_chat_llm() invoke create_json_handler() end...")
 
-    print("fnllm/openai/factories/chat.py _create_openai_text_chat_llm() invoke create_retryer() start...")
     retryer = create_retryer(config=config, operation=operation, events=events)
-    print(f"fnllm/openai/factories/chat.py _create_openai_text_chat_llm() {retryer=}")
-    print("fnllm/openai/factories/chat.py _create_openai_text_chat_llm() invoke create_retryer() end...")
-
-    print("fnllm/openai/factories/chat.py _create_openai_text_chat_llm() invoke create_rate_limiter() start...")
-    rate_limiter = create_rate_limiter(config=config, limiter=limiter, events=events)
-    print(f"fnllm/openai/factories/chat.py _create_openai_text_chat_llm() {rate_limiter=}")
-    print("fnllm/openai/factories/chat.py _create_openai_text_chat_llm() invoke create_rate_limiter() end...")
 
-    print("fnllm/openai/factories/chat.py _create_openai_text_chat_llm() invoke OpenAITextChatLLMImpl() start...")
     result = OpenAITextChatLLMImpl(
         client,
         model=config.model,
@@ -114,11 +149,11 @@ def _create_openai_text_chat_llm(
         history_extractor=OpenAIHistoryExtractor(),
         variable_injector=VariableInjector(),
         retryer=retryer,
+        hedger=create_hedger(config=config, operation=operation),
+        circuit_breaker=create_circuit_breaker(config=config, events=events),
         rate_limiter=rate_limiter,
     )
-    print("fnllm/openai/factories/chat.py _create_openai_text_chat_llm() invoke OpenAITextChatLLMImpl() end...")
 
-    print(f"fnllm/openai/factories/chat.py _create_openai_text_chat_llm() return OpenAIParseToolsLLM({result=})...")
     return OpenAIParseToolsLLM(result)
 
 
@@ -126,28 +161,18 @@ def _create_openai_streaming_chat_llm(
         *,
         client: OpenAIClient,
         config: OpenAIConfig,
-        limiter: Limiter,
+        rate_limiter: RateLimiter[Any, Any, Any, Any],
         events: LLMEvents | None,
 ) -> OpenAIStreamingChatLLM:
     """Create an OpenAI streaming chat LLM."""
-    print("fnllm/openai/factories/chat.py _create_openai_streaming_chat_llm() start...")
-    print(f"fnllm/openai/factories/chat.py _create_openai_streaming_chat_llm() {config=}")
-    print(f"fnllm/openai/factories/chat.py _create_openai_streaming_chat_llm() {limiter=}")
-    print(f"fnllm/openai/factories/chat.py _create_openai_streaming_chat_llm() {events=}")
-
-    print("fnllm/openai/factories/chat.py _create_openai_streaming_chat_llm() invoke create_rate_limiter() start...")
-    rate_limiter = create_rate_limiter(limiter=limiter, config=config, events=events)
-    print(f"fnllm/openai/factories/chat.py _create_openai_streaming_chat_llm() {rate_limiter=}")
-
-    print(
-        "fnllm/openai/factories/chat.py _create_openai_streaming_chat_llm() return OpenAIStreamingChatLLMImpl() start...")
-    print()
     return OpenAIStreamingChatLLMImpl(
         client,
         model=config.model,
         model_parameters=config.chat_parameters,
         events=events,
         emit_usage=config.track_stream_usage,
+        encoder=create_encoder(config),
         variable_injector=VariableInjector(),
         rate_limiter=rate_limiter,
+        circuit_breaker=create_circuit_breaker(config=config, events=events),
     )
@@ -4,17 +4,30 @@
 
 from typing import cast
 
-# from openai import AsyncAzureOpenAI, AsyncOpenAI
-from langfuse.openai import AsyncAzureOpenAI, AsyncOpenAI
+from openai import AsyncAzureOpenAI, AsyncOpenAI
 
+from fnllm.observability.recorder import ObservabilityRecorder
 from fnllm.openai.config import AzureOpenAIConfig, OpenAIConfig, PublicOpenAIConfig
+from fnllm.openai.llm.observed_client import ObservedOpenAIClient
 from fnllm.openai.types.client import OpenAIClient
 
+from .http_client import get_http_client
 
-def create_openai_client(config: OpenAIConfig) -> OpenAIClient:
-    """Create a new OpenAI client instance."""
-    print()
-    print("fnllm/openai/factories/client.py create_openai_client() start...")
+
+def create_openai_client(
+        config: OpenAIConfig, *, recorder: ObservabilityRecorder | None = None
+) -> OpenAIClient:
+    """Create a new OpenAI client instance, on the HTTP connection pool shared by equivalent configurations.
+
+    Requests are only recorded for observability when a `recorder` is given.
+    """
+    client = _create_client(config)
+    if recorder is not None:
+        return cast(OpenAIClient, ObservedOpenAIClient(client, recorder))
+    return client
+
+
+def _create_client(config: OpenAIConfig) -> OpenAIClient:
     if config.azure:
         from azure.identity import DefaultAzureCredential, get_bearer_token_provider
 
@@ -38,11 +51,10 @@ def create_openai_client(config: OpenAIConfig) -> OpenAIClient:
             azure_deployment=config.deployment,
             timeout=config.timeout,
             max_retries=0,
+            http_client=get_http_client(config),
         )
 
     config = cast(PublicOpenAIConfig, config)
-    print("fnllm/openai/factories/client.py create_openai_client() return AsyncOpenAI()...")
-    print()
 
     return AsyncOpenAI(
         api_key=config.api_key,
@@ -50,4 +62,5 @@ def create_openai_client(config: OpenAIConfig) -> OpenAIClient:
         organization=config.organization,
         timeout=config.timeout,
         max_retries=0,
+        http_client=get_http_client(config),
     )
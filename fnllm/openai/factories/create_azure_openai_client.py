@@ -2,14 +2,20 @@
 
 """Create OpenAI client instance."""
 
-from azure.core.credentials import TokenProvider
-from azure.identity import DefaultAzureCredential, get_bearer_token_provider
-# from openai import AsyncAzureOpenAI
-from langfuse.openai import AsyncAzureOpenAI
-from openai.lib.azure import AsyncAzureADTokenProvider
+from __future__ import annotations
 
-from fnllm.openai.config import AzureOpenAIConfig
-from fnllm.openai.types.client import OpenAIClient
+from typing import TYPE_CHECKING
+
+from openai import AsyncAzureOpenAI
+
+from .http_client import get_http_client
+
+if TYPE_CHECKING:
+    from azure.core.credentials import TokenProvider
+    from openai.lib.azure import AsyncAzureADTokenProvider
+
+    from fnllm.openai.config import AzureOpenAIConfig
+    from fnllm.openai.types.client import OpenAIClient
 
 
 def create_azure_openai_client(
@@ -26,6 +32,7 @@ def create_azure_openai_client(
         azure_deployment=config.deployment,
         timeout=config.timeout,
         max_retries=0,
+        http_client=get_http_client(config),
     )
 
 
@@ -36,5 +43,8 @@ def _get_azure_ad_token_provider(
     if config.api_key is not None:
         return None
 
+    # azure.identity is slow to import and only needed for Entra ID authentication
+    from azure.identity import DefaultAzureCredential, get_bearer_token_provider
+
     credential = credential or DefaultAzureCredential()
     return get_bearer_token_provider(credential, config.cognitive_services_endpoint)
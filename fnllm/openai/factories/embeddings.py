@@ -12,7 +12,14 @@ from fnllm.services.cache_interactor import CacheInteractor
 from fnllm.services.variable_injector import VariableInjector
 
 from .client import create_openai_client
-from .utils import create_limiter, create_rate_limiter, create_retryer
+from .utils import (
+    create_circuit_breaker,
+    create_events,
+    create_hedger,
+    create_rate_limiter,
+    create_retryer,
+    get_limiter,
+)
 
 
 def create_openai_embeddings_llm(
@@ -29,7 +36,8 @@ def create_openai_embeddings_llm(
     if client is None:
         client = create_openai_client(config)
 
-    limiter = create_limiter(config)
+    limiter = get_limiter(config)
+    events = create_events(config, events)
     return OpenAIEmbeddingsLLMImpl(
         client,
         model=config.model,
@@ -40,4 +48,6 @@ def create_openai_embeddings_llm(
         variable_injector=VariableInjector(),
         rate_limiter=create_rate_limiter(config=config, events=events, limiter=limiter),
         retryer=create_retryer(config=config, operation=operation, events=events),
+        hedger=create_hedger(config=config, operation=operation),
+        circuit_breaker=create_circuit_breaker(config=config, events=events),
     )
@@ -0,0 +1,163 @@
+# Copyright (c) 2024 Microsoft Corporation.
+
+"""Shared HTTP connection pools of the OpenAI clients."""
+
+from __future__ import annotations
+
+import asyncio
+import weakref
+from typing import TYPE_CHECKING, Any
+
+import httpx
+from openai import DefaultAsyncHttpxClient
+
+if TYPE_CHECKING:
+    from fnllm.openai.config import OpenAIConfig
+
+_PUBLIC_OPENAI_URL = "https://api.openai.com/v1"
+
+
+class _LoopBoundTransport(httpx.AsyncBaseTransport):
+    """Keeps one connection pool per event loop, as connections are bound to the loop that opened them."""
+
+    def __init__(self, limits: httpx.Limits, *, http2: bool):
+        self._limits = limits
+        self._http2 = http2
+        self._pools: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, httpx.AsyncHTTPTransport
+        ] = weakref.WeakKeyDictionary()
+
+    def _pool(self) -> httpx.AsyncHTTPTransport:
+        loop = asyncio.get_running_loop()
+        pool = self._pools.get(loop)
+        if pool is None:
+            # the pools of closed loops cannot be used anymore
+            for closed in [other for other in self._pools if other.is_closed()]:
+                del self._pools[closed]
+            pool = self._pools[loop] = httpx.AsyncHTTPTransport(
+                limits=self._limits, http2=self._http2
+            )
+        return pool
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        """Send the request with the pool of the running loop."""
+        return await self._pool().handle_async_request(request)
+
+    async def aclose(self) -> None:
+        """Close the pool of the running loop and forget the others, which cannot be closed from it."""
+        pool = self._pools.pop(asyncio.get_running_loop(), None)
+        self._pools.clear()
+        if pool is not None:
+            await pool.aclose()
+
+
+class SharedAsyncHttpxClient(DefaultAsyncHttpxClient):
+    """An HTTP client shared by the OpenAI clients of equivalent configurations.
+
+    Every OpenAI client holds a reference to it, closing the OpenAI client releases it and
+    the pool is closed with the last reference (or by `close_http_clients`). A pool is kept
+    per event loop, so the client can be used across `asyncio.run` calls.
+    """
+
+    def __init__(self, *, limits: httpx.Limits, http2: bool):
+        """Create a new SharedAsyncHttpxClient."""
+        super().__init__(
+            limits=limits,
+            http2=http2,
+            transport=_LoopBoundTransport(limits, http2=http2),
+        )
+        self._references = 0
+
+    def acquire(self) -> SharedAsyncHttpxClient:
+        """Take a reference to the client, released by `aclose`."""
+        self._references += 1
+        return self
+
+    async def aclose(self) -> None:
+        """Release a reference, closing the pool once no OpenAI client uses it."""
+        self._references -= 1
+        if self._references <= 0:
+            await self.close_pool()
+
+    async def close_pool(self) -> None:
+        """Close the connection pool."""
+        await super().aclose()
+
+
+_http_clients: dict[tuple[Any, ...], SharedAsyncHttpxClient] = {}
+
+
+def http_limits(config: OpenAIConfig) -> httpx.Limits:
+    """Get the connection pool limits of the configuration, sized from `max_concurrency`."""
+    max_connections = config.http_max_connections or config.max_concurrency or 1000
+    max_keepalive = config.http_max_keepalive_connections or max_connections
+    return httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive,
+        keepalive_expiry=config.http_keepalive_expiry,
+    )
+
+
+def get_http_client(config: OpenAIConfig) -> SharedAsyncHttpxClient:
+    """Take a reference to the HTTP client (connection pool) shared by equivalent configurations, creating it if needed.
+
+    The reference is released by closing the client (`aclose`), as the OpenAI client using it does.
+    """
+    return _shared_http_client(config).acquire()
+
+
+def _shared_http_client(config: OpenAIConfig) -> SharedAsyncHttpxClient:
+    limits = http_limits(config)
+    key = (
+        limits.max_connections,
+        limits.max_keepalive_connections,
+        limits.keepalive_expiry,
+        config.http2,
+    )
+    client = _http_clients.get(key)
+    if client is None or client.is_closed:
+        client = _http_clients[key] = SharedAsyncHttpxClient(
+            limits=limits, http2=config.http2
+        )
+    return client
+
+
+async def close_http_clients() -> None:
+    """Close every shared HTTP client, including the ones OpenAI clients still use."""
+    clients = list(_http_clients.values())
+    _http_clients.clear()
+    await asyncio.gather(*(client.close_pool() for client in clients))
+
+
+async def prewarm_openai_client(
+        config: OpenAIConfig, *, connections: int | None = None
+) -> None:
+    """Open `connections` (defaults to `http_prewarm_connections`) HTTP connections to the endpoint of the configuration.
+
+    Call it at startup to pay the DNS lookups and TLS handshakes before the first requests.
+    A single connection is opened with HTTP/2, which multiplexes the requests over it.
+    """
+    if connections is None:
+        connections = config.http_prewarm_connections
+    if config.http2:
+        connections = min(connections, 1)
+    if connections <= 0:
+        return
+
+    url = _endpoint_url(config)
+    client = _shared_http_client(config)
+
+    async def connect() -> None:
+        # the response does not matter (e.g. 401/404), the connection stays in the pool
+        try:
+            await client.head(url)
+        except httpx.HTTPError:
+            pass
+
+    await asyncio.gather(*(connect() for _ in range(connections)))
+
+
+def _endpoint_url(config: OpenAIConfig) -> str:
+    if config.azure:
+        return config.endpoint
+    return config.base_url or _PUBLIC_OPENAI_URL
@@ -0,0 +1,83 @@
+# Copyright (c) 2024 Microsoft Corporation.
+
+"""Factory functions for creating load balanced OpenAI LLMs."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from fnllm.openai.llm.load_balancer import LoadBalancedEndpoint, OpenAILoadBalancedLLM
+
+from .chat import create_openai_chat_llm
+from .embeddings import create_openai_embeddings_llm
+from .utils import endpoint_name, get_circuit
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+
+    from fnllm.caching.base import Cache
+    from fnllm.events.base import LLMEvents
+    from fnllm.openai.config import OpenAIConfig
+
+
+def create_openai_load_balanced_chat_llm(
+        configs: Sequence[OpenAIConfig],
+        *,
+        weights: Sequence[float] | None = None,
+        cache: Cache | None = None,
+        events: LLMEvents | None = None,
+) -> OpenAILoadBalancedLLM:
+    """Create an OpenAI chat LLM routing every call to one of the endpoints of `configs`.
+
+    Every endpoint gets its own client, limiter and circuit. Use a low `max_retries` on the
+    configurations so throttled calls fail over to another endpoint quickly.
+    """
+    return _create_load_balanced_llm(
+        configs,
+        lambda config: create_openai_chat_llm(config, cache=cache, events=events),
+        weights=weights,
+    )
+
+
+def create_openai_load_balanced_embeddings_llm(
+        configs: Sequence[OpenAIConfig],
+        *,
+        weights: Sequence[float] | None = None,
+        cache: Cache | None = None,
+        events: LLMEvents | None = None,
+) -> OpenAILoadBalancedLLM:
+    """Create an OpenAI embeddings LLM routing every call to one of the endpoints of `configs`.
+
+    Every endpoint gets its own client, limiter and circuit. Use a low `max_retries` on the
+    configurations so throttled calls fail over to another endpoint quickly.
+    """
+    return _create_load_balanced_llm(
+        configs,
+        lambda config: create_openai_embeddings_llm(config, cache=cache, events=events),
+        weights=weights,
+    )
+
+
+def _create_load_balanced_llm(
+        configs: Sequence[OpenAIConfig],
+        create_llm: Callable[[OpenAIConfig], Any],
+        *,
+        weights: Sequence[float] | None,
+) -> OpenAILoadBalancedLLM:
+    if weights is not None and len(weights) != len(configs):
+        msg = "weights must match configs"
+        raise ValueError(msg)
+
+    endpoints = []
+    for index, config in enumerate(configs):
+        llm = create_llm(config)
+        endpoints.append(
+            LoadBalancedEndpoint(
+                name=endpoint_name(config),
+                llm=llm,
+                rate_limiter=llm.rate_limiter,
+                circuit=get_circuit(config),
+                weight=weights[index] if weights is not None else 1,
+            )
+        )
+    return OpenAILoadBalancedLLM(endpoints)
@@ -0,0 +1,110 @@
+# Copyright (c) 2024 Microsoft Corporation.
+
+"""Registry of OpenAI clients and LLMs shared across calls."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING, Any
+
+from .chat import create_openai_chat_llm
+from .client import create_openai_client
+from .embeddings import create_openai_embeddings_llm
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from fnllm.caching.base import Cache
+    from fnllm.events.base import LLMEvents
+    from fnllm.observability.recorder import ObservabilityRecorder
+    from fnllm.openai.config import OpenAIConfig
+    from fnllm.openai.types.client import (
+        OpenAIChatLLM,
+        OpenAIClient,
+        OpenAIEmbeddingsLLM,
+    )
+
+
+class OpenAILLMRegistry:
+    """Keeps one client and LLM per configuration, so code building them per request (e.g. per chat message) reuses the warmed ones.
+
+    Configurations are compared by value: equal configurations get the same instances, with
+    their HTTP connections, encoder, decorator chain and limiter state.
+    """
+
+    def __init__(
+            self,
+            *,
+            cache: Cache | None = None,
+            events: LLMEvents | None = None,
+            recorder: ObservabilityRecorder | None = None,
+    ):
+        """Create a new OpenAILLMRegistry, its LLMs using `cache` and `events` and its clients recording to `recorder`."""
+        self._cache = cache
+        self._events = events
+        self._recorder = recorder
+        self._clients: dict[str, OpenAIClient] = {}
+        self._chat_llms: dict[str, OpenAIChatLLM] = {}
+        self._embeddings_llms: dict[str, OpenAIEmbeddingsLLM] = {}
+
+    def client(self, config: OpenAIConfig) -> OpenAIClient:
+        """Get the client of the configuration, creating it the first time."""
+        return _get_or_create(
+            self._clients,
+            config,
+            lambda: create_openai_client(config, recorder=self._recorder),
+        )
+
+    def chat_llm(self, config: OpenAIConfig) -> OpenAIChatLLM:
+        """Get the chat LLM of the configuration, creating it the first time."""
+        return _get_or_create(
+            self._chat_llms,
+            config,
+            lambda: create_openai_chat_llm(
+                config,
+                client=self.client(config),
+                cache=self._cache,
+                events=self._events,
+            ),
+        )
+
+    def embeddings_llm(self, config: OpenAIConfig) -> OpenAIEmbeddingsLLM:
+        """Get the embeddings LLM of the configuration, creating it the first time."""
+        return _get_or_create(
+            self._embeddings_llms,
+            config,
+            lambda: create_openai_embeddings_llm(
+                config,
+                client=self.client(config),
+                cache=self._cache,
+                events=self._events,
+            ),
+        )
+
+    async def aclose(self) -> None:
+        """Close the clients and the recorder, and forget every LLM.
+
+        The shared HTTP connection pools are closed once no other client uses them.
+        """
+        clients = list(self._clients.values())
+        self._clients.clear()
+        self._chat_llms.clear()
+        self._embeddings_llms.clear()
+        await asyncio.gather(*(client.close() for client in clients))
+        if self._recorder is not None:
+            await self._recorder.aclose()
+
+
+def _get_or_create(
+        instances: dict[str, Any], config: OpenAIConfig, factory: Callable[[], Any]
+) -> Any:
+    # the configurations are frozen but hold dicts, so they are keyed by their JSON
+    key = f"{type(config).__name__}:{config.model_dump_json()}"
+    instance = instances.get(key)
+    if instance is None:
+        instance = instances[key] = factory()
+    return instance
+
+
+openai_llm_registry = OpenAILLMRegistry()
+"""The process-wide OpenAI LLM registry."""
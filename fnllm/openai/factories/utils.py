@@ -4,18 +4,32 @@
 
 from __future__ import annotations
 
+import hashlib
+import json
 from typing import TYPE_CHECKING, Any
 
-import tiktoken
-
+from fnllm.events.budget import LLMBudgetEvents
+from fnllm.events.composite import LLMCompositeEvents
+from fnllm.limiting.budget import BudgetLimiter, TokenBudget
 from fnllm.limiting.composite import CompositeLimiter
 from fnllm.limiting.concurrency import ConcurrencyLimiter
+from fnllm.limiting.registry import limiter_registry
 from fnllm.limiting.rpm import RPMLimiter
+from fnllm.limiting.snapshots import LimiterSnapshots
+from fnllm.limiting.tenant import TenantLimiter
 from fnllm.limiting.tpm import TPMLimiter
+from fnllm.openai.llm.services.circuit_breaker import OpenAICircuitBreaker
 from fnllm.openai.llm.services.rate_limiter import OpenAIRateLimiter
 from fnllm.openai.llm.services.retryer import OpenAIRetryer
+from fnllm.services.circuit_breaker import Circuit
+from fnllm.services.hedger import Hedger
+from fnllm.services.retry_budget import RetryBudget
 
 if TYPE_CHECKING:
+    from collections.abc import Hashable
+
+    import tiktoken
+
     from fnllm.events.base import LLMEvents
     from fnllm.limiting.base import Limiter
     from fnllm.openai.config import OpenAIConfig
@@ -24,18 +38,80 @@ if TYPE_CHECKING:
 
 
 def _get_encoding(encoding_name: str) -> tiktoken.Encoding:
-    print()
-    print("fnllm/openai/factories/utils.py _get_encoding() start...")
-    print(f"fnllm/openai/factories/utils.py _get_encoding() return tiktoken.get_encoding({encoding_name=})...")
-    print()
+    # tiktoken is slow to import, only load it once an LLM is created
+    import tiktoken
+
     return tiktoken.get_encoding(encoding_name)
 
 
+_LIMIT_SETTINGS = {
+    "max_concurrency",
+    "tokens_per_minute",
+    "requests_per_minute",
+    "requests_burst_mode",
+    "requests_burst_size",
+    "tokens_burst_size",
+    "atomic_limiting",
+    "tenant_weights",
+    "max_concurrency_per_tenant",
+    "tokens_per_minute_per_tenant",
+    "max_queue_size",
+    "priority_aging_interval",
+    "token_budgets",
+    "budget_path",
+    "budget_project",
+    "wait_for_budget",
+}
+
+_budgets: dict[tuple[str, str], TokenBudget] = {}
+_snapshots: dict[str, LimiterSnapshots] = {}
+_retry_budgets: dict[tuple[float, int, float], RetryBudget] = {}
+_circuits: dict[str, Circuit] = {}
+
+
+def get_limiter(config: OpenAIConfig) -> Limiter:
+    """Get the shared LLM limiter of the quota targeted by the configuration, creating it if needed."""
+    key = limiter_key(config)
+
+    def create() -> Limiter:
+        limiter = create_limiter(config)
+        if config.limiter_state_path:
+            snapshots = _snapshots.get(config.limiter_state_path)
+            if snapshots is None:
+                snapshots = _snapshots[config.limiter_state_path] = LimiterSnapshots(
+                    config.limiter_state_path, interval=config.limiter_state_interval
+                )
+            # a stable name across restarts, without the raw key material
+            name = hashlib.sha256(repr(key).encode()).hexdigest()
+            snapshots.track(name, limiter)
+        return limiter
+
+    return limiter_registry.get_or_create(key, create)
+
+
+def limiter_key(config: OpenAIConfig) -> Hashable:
+    """Get the key identifying the quota targeted by the configuration."""
+    if config.quota_pool:
+        return ("quota_pool", config.quota_pool)
+
+    if config.azure:
+        target = (config.endpoint, config.deployment or config.model)
+    else:
+        target = (config.base_url or "", config.model)
+
+    # never keep the raw API key around
+    api_key = hashlib.sha256((config.api_key or "").encode()).hexdigest()
+    settings = json.dumps(config.model_dump(include=_LIMIT_SETTINGS), sort_keys=True)
+    return (*target, api_key, settings)
+
+
 def create_limiter(config: OpenAIConfig) -> Limiter:
     """Create an LLM limiter based on the incoming configuration."""
-    print()
-    print("fnllm/openai/factories/utils.py create_limiter() start...")
-    limiters = []
+    limiters: list[Limiter] = []
+
+    if config.max_concurrency_per_tenant or config.tokens_per_minute_per_tenant:
+        # acquired first, so a tenant over its caps does not hold shared capacity
+        limiters.append(TenantLimiter(lambda _: _create_tenant_limiter(config)))
 
     if config.max_concurrency:
         limiters.append(ConcurrencyLimiter.from_max_concurrency(config.max_concurrency))
@@ -43,44 +119,119 @@ def create_limiter(config: OpenAIConfig) -> Limiter:
     if config.requests_per_minute:
         limiters.append(
             RPMLimiter.from_rpm(
-                config.requests_per_minute, burst_mode=config.requests_burst_mode
+                config.requests_per_minute,
+                burst_mode=config.requests_burst_mode,
+                burst_size=config.requests_burst_size,
             )
         )
 
     if config.tokens_per_minute:
-        limiters.append(TPMLimiter.from_tpm(config.tokens_per_minute))
-    print(f"fnllm/openai/factories/utils.py create_limiter() {limiters=}")
-    print(f"fnllm/openai/factories/utils.py create_limiter() return CompositeLimiter({limiters=})...")
+        limiters.append(
+            TPMLimiter.from_tpm(
+                config.tokens_per_minute, burst_size=config.tokens_burst_size
+            )
+        )
+
+    limiter: Limiter = CompositeLimiter(
+        limiters,
+        atomic=config.atomic_limiting,
+        priority_aging_interval=config.priority_aging_interval,
+        tenant_weights=config.tenant_weights,
+        max_queue_size=config.max_queue_size,
+    )
+
+    budget = get_budget(config)
+    if budget is not None:
+        # checked ahead of the (possibly atomic) rate limits, so requests over budget
+        # are rejected instead of waiting in their queue
+        budget_limiter = BudgetLimiter(budget, wait=config.wait_for_budget)
+        limiter = CompositeLimiter([budget_limiter, limiter])
+
+    return limiter
+
+
+def get_budget(config: OpenAIConfig) -> TokenBudget | None:
+    """Get the shared token budget of the configuration project, if it has budgets."""
+    if not config.token_budgets:
+        return None
+
+    key = (config.budget_path, config.budget_project)
+    budget = _budgets.get(key)
+    if budget is None:
+        budget = _budgets[key] = TokenBudget(
+            config.budget_path, config.token_budgets, project=config.budget_project
+        )
+    return budget
+
+
+def get_retry_budget(config: OpenAIConfig) -> RetryBudget | None:
+    """Get the process-wide retry budget of the configuration, if it has one."""
+    if config.retry_budget_ratio is None:
+        return None
+
+    key = (
+        config.retry_budget_ratio,
+        config.retry_budget_min_retries,
+        config.retry_budget_window,
+    )
+    retry_budget = _retry_budgets.get(key)
+    if retry_budget is None:
+        retry_budget = _retry_budgets[key] = RetryBudget(
+            config.retry_budget_ratio,
+            min_retries=config.retry_budget_min_retries,
+            window=config.retry_budget_window,
+        )
+    return retry_budget
+
+
+def create_events(config: OpenAIConfig, events: LLMEvents | None) -> LLMEvents | None:
+    """Add the handlers required by the configuration (e.g. budget recording) to the LLM events."""
+    budget = get_budget(config)
+    if budget is None:
+        return events
+
+    budget_events = LLMBudgetEvents(budget)
+    if events is None:
+        return budget_events
+    return LLMCompositeEvents([events, budget_events])
+
+
+def _create_tenant_limiter(config: OpenAIConfig) -> Limiter:
+    limiters: list[Limiter] = []
+
+    if config.max_concurrency_per_tenant:
+        limiters.append(
+            ConcurrencyLimiter.from_max_concurrency(config.max_concurrency_per_tenant)
+        )
+
+    if config.tokens_per_minute_per_tenant:
+        limiters.append(TPMLimiter.from_tpm(config.tokens_per_minute_per_tenant))
 
     return CompositeLimiter(limiters)
 
 
+def create_encoder(config: OpenAIConfig) -> tiktoken.Encoding:
+    """Create the encoder counting the tokens of the configured model."""
+    return _get_encoding(config.encoding)
+
+
 def create_rate_limiter(
         *,
         limiter: Limiter,
         config: OpenAIConfig,
         events: LLMEvents | None,
+        max_tokens: int | None = None,
 ) -> RateLimiter[Any, Any, Any, Any]:
     """Wraps the LLM to be rate limited."""
-    print()
-    print("fnllm/openai/factories/utils.py create_rate_limiter() start...")
-    print(f"fnllm/openai/factories/utils.py create_rate_limiter() {limiter=}")
-    print(f"fnllm/openai/factories/utils.py create_rate_limiter() {config=}")
-    print(f"fnllm/openai/factories/utils.py create_rate_limiter() {events=}")
-    print(f"fnllm/openai/factories/utils.py create_rate_limiter() invoke _get_encoding() start...")
     encoder = _get_encoding(config.encoding)
-    print(f"fnllm/openai/factories/utils.py create_rate_limiter() invoke _get_encoding() end...")
 
-    print(f"fnllm/openai/factories/utils.py create_rate_limiter() invoke OpenAIRateLimiter() start...")
     openai_rate_limiter = OpenAIRateLimiter(
         encoder=encoder,
         limiter=limiter,
+        reserve_output_tokens=config.reserve_output_tokens,
+        max_tokens=max_tokens,
         events=events,
     )
-    print(f"fnllm/openai/factories/utils.py create_rate_limiter() invoke OpenAIRateLimiter() end...")
-
-    print(f"fnllm/openai/factories/utils.py create_rate_limiter() return {openai_rate_limiter=}...")
-    print()
 
     return openai_rate_limiter
 
@@ -92,22 +243,71 @@ def create_retryer(
         events: LLMEvents | None,
 ) -> Retryer[Any, Any, Any, Any]:
     """Wraps the LLM with retry logic."""
-    print()
-    print("fnllm/openai/factories/utils.py create_retryer() start...")
-    print(f"fnllm/openai/factories/utils.py create_retryer() {config=}")
-    print(f"fnllm/openai/factories/utils.py create_retryer() {operation=}")
-    print(f"fnllm/openai/factories/utils.py create_retryer() {events=}")
 
-    print(f"fnllm/openai/factories/utils.py create_retryer() invoke OpenAIRetryer() start...")
     openai_retryer = OpenAIRetryer(
         tag=operation,
         max_retries=config.max_retries,
         max_retry_wait=config.max_retry_wait,
         sleep_on_rate_limit_recommendation=config.sleep_on_rate_limit_recommendation,
+        retry_budget=get_retry_budget(config),
         events=events,
     )
-    print(f"fnllm/openai/factories/utils.py create_retryer() invoke OpenAIRetryer() end...")
 
-    print(f"fnllm/openai/factories/utils.py create_retryer() return {openai_retryer=}...")
-    print()
     return openai_retryer
+
+
+def create_hedger(
+        *,
+        config: OpenAIConfig,
+        operation: str,
+) -> Hedger[Any, Any, Any, Any] | None:
+    """Wraps the LLM with hedged requests, if enabled."""
+    if config.hedge_quantile is None:
+        return None
+
+    return Hedger(
+        tag=operation,
+        quantile=config.hedge_quantile,
+        max_hedges=config.max_hedges,
+        min_delay=config.hedge_min_delay,
+    )
+
+
+def endpoint_name(config: OpenAIConfig) -> str:
+    """Get the name of the endpoint/deployment targeted by the configuration."""
+    if config.azure:
+        parts = (config.endpoint, config.deployment or config.model)
+    else:
+        parts = (config.base_url, config.model)
+    return "/".join(part for part in parts if part)
+
+
+def get_circuit(config: OpenAIConfig) -> Circuit | None:
+    """Get the shared circuit of the endpoint/deployment targeted by the configuration, if enabled."""
+    if config.circuit_failure_rate is None:
+        return None
+
+    key = endpoint_name(config)
+    circuit = _circuits.get(key)
+    if circuit is None:
+        circuit = _circuits[key] = Circuit(
+            key,
+            failure_rate=config.circuit_failure_rate,
+            min_calls=config.circuit_min_calls,
+            window=config.circuit_window,
+            open_duration=config.circuit_open_duration,
+        )
+    return circuit
+
+
+def create_circuit_breaker(
+        *,
+        config: OpenAIConfig,
+        events: LLMEvents | None,
+) -> OpenAICircuitBreaker[Any, Any, Any, Any] | None:
+    """Wraps the LLM with a circuit breaker, if enabled."""
+    circuit = get_circuit(config)
+    if circuit is None:
+        return None
+
+    return OpenAICircuitBreaker(circuit, events=events)
@@ -0,0 +1,257 @@
+# Copyright (c) 2024 Microsoft Corporation.
+
+"""OpenAI Batch API client."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import tempfile
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Final
+
+from fnllm.openai.types.aliases import (
+    OpenAIChatCompletionModel,
+    OpenAICreateEmbeddingResponseModel,
+)
+from fnllm.services.errors import BatchRequestError, DeadlineExceededError
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from fnllm.openai.types.client import OpenAIClient
+
+_TERMINAL_STATUSES: Final = frozenset({"completed", "failed", "expired", "cancelled"})
+
+
+@dataclass
+class _BatchRequest:
+    custom_id: str
+    body: dict[str, Any]
+    parse: Callable[[Any], Any]
+    future: asyncio.Future[Any]
+
+
+class _Completions:
+    def __init__(self, batch_client: OpenAIBatchClient):
+        self._batch_client = batch_client
+
+    async def create(self, *, timeout: Any = None, **body: Any) -> Any:
+        """Run a chat completion through the next batch, waiting at most `timeout` seconds."""
+        return await self._batch_client.submit(
+            "/chat/completions",
+            body,
+            OpenAIChatCompletionModel.model_validate,
+            timeout=timeout,
+        )
+
+
+class _Chat:
+    def __init__(self, batch_client: OpenAIBatchClient):
+        self.completions = _Completions(batch_client)
+
+
+class _Embeddings:
+    def __init__(self, batch_client: OpenAIBatchClient):
+        self._batch_client = batch_client
+
+    async def create(self, *, timeout: Any = None, **body: Any) -> Any:
+        """Run an embeddings request through the next batch, waiting at most `timeout` seconds."""
+        return await self._batch_client.submit(
+            "/embeddings",
+            body,
+            OpenAICreateEmbeddingResponseModel.model_validate,
+            timeout=timeout,
+        )
+
+
+class OpenAIBatchClient:
+    """Runs chat completions and embeddings through the Batch API.
+
+    Stands in for the OpenAI client of `OpenAITextChatLLMImpl`/`OpenAIEmbeddingsLLMImpl`:
+    calls are accumulated into a JSONL request file per endpoint, submitted as a batch once
+    `max_batch_size` calls are pending or `flush_interval` seconds after the first one, and
+    every caller is resolved from the output file once the batch completes. Batches are
+    half price and not rate limited, at the cost of a completion window of up to 24h.
+    """
+
+    def __init__(
+            self,
+            client: OpenAIClient,
+            *,
+            max_batch_size: int = 50_000,
+            flush_interval: float = 5,
+            poll_interval: float = 30,
+            batch_dir: str | Path | None = None,
+            url_prefix: str = "/v1",
+    ):
+        """Create a new OpenAIBatchClient submitting its batches with `client`."""
+        self._client = client
+        self._max_batch_size = max_batch_size
+        self._flush_interval = flush_interval
+        self._poll_interval = poll_interval
+        self._batch_dir = Path(batch_dir or tempfile.gettempdir())
+        # request files written to a user directory are kept for auditing
+        self._keep_files = batch_dir is not None
+        self._url_prefix = url_prefix
+        self._pending: dict[str, list[_BatchRequest]] = {}
+        self._flush_timers: dict[str, asyncio.TimerHandle] = {}
+        self._batches: set[asyncio.Task[None]] = set()
+        self.chat = _Chat(self)
+        self.embeddings = _Embeddings(self)
+
+    async def submit(
+            self,
+            endpoint: str,
+            body: dict[str, Any],
+            parse: Callable[[Any], Any],
+            *,
+            timeout: Any = None,
+    ) -> Any:
+        """Add a request to the next batch of `endpoint` and wait for its parsed response.
+
+        A numeric `timeout` (the remaining time of the caller's deadline) bounds the wait:
+        once it elapses, the request is withdrawn if its batch was not submitted yet (a
+        submitted batch cannot drop a single request, its response is then discarded) and
+        DeadlineExceededError is raised.
+        """
+        request = _BatchRequest(
+            custom_id=uuid.uuid4().hex,
+            body=body,
+            parse=parse,
+            future=asyncio.get_running_loop().create_future(),
+        )
+        pending = self._pending.setdefault(endpoint, [])
+        pending.append(request)
+        if len(pending) >= self._max_batch_size:
+            self._flush(endpoint)
+        elif endpoint not in self._flush_timers:
+            self._flush_timers[endpoint] = asyncio.get_running_loop().call_later(
+                self._flush_interval, self._flush, endpoint
+            )
+
+        if not isinstance(timeout, (int, float)):
+            return await request.future
+
+        try:
+            return await asyncio.wait_for(request.future, timeout)
+        except asyncio.TimeoutError:
+            self._withdraw(endpoint, request)
+            raise DeadlineExceededError(
+                request.custom_id, "waiting for its batch"
+            ) from None
+
+    async def flush(self) -> None:
+        """Submit the pending requests right away and wait for every batch to complete."""
+        for endpoint in list(self._pending):
+            self._flush(endpoint)
+        while self._batches:
+            await asyncio.gather(*self._batches, return_exceptions=True)
+
+    async def aclose(self) -> None:
+        """Flush the pending requests and close the underlying client."""
+        await self.flush()
+        await self._client.close()
+
+    def _flush(self, endpoint: str) -> None:
+        timer = self._flush_timers.pop(endpoint, None)
+        if timer is not None:
+            timer.cancel()
+
+        requests = self._pending.pop(endpoint, [])
+        if not requests:
+            return
+
+        task = asyncio.create_task(self._run_batch(endpoint, requests))
+        self._batches.add(task)
+        task.add_done_callback(self._batches.discard)
+
+    def _withdraw(self, endpoint: str, request: _BatchRequest) -> None:
+        pending = self._pending.get(endpoint)
+        if pending is None or request not in pending:
+            return
+
+        pending.remove(request)
+        if not pending:
+            del self._pending[endpoint]
+            timer = self._flush_timers.pop(endpoint, None)
+            if timer is not None:
+                timer.cancel()
+
+    async def _run_batch(self, endpoint: str, requests: list[_BatchRequest]) -> None:
+        by_id = {request.custom_id: request for request in requests}
+        try:
+            path = self._write_requests(endpoint, requests)
+            try:
+                input_file = await self._client.files.create(file=path, purpose="batch")
+            finally:
+                if not self._keep_files:
+                    path.unlink(missing_ok=True)
+            batch = await self._client.batches.create(
+                input_file_id=input_file.id,
+                endpoint=f"{self._url_prefix}{endpoint}",  # type: ignore[arg-type]
+                completion_window="24h",
+            )
+            while batch.status not in _TERMINAL_STATUSES:
+                await asyncio.sleep(self._poll_interval)
+                batch = await self._client.batches.retrieve(batch.id)
+
+            for file_id in (batch.output_file_id, batch.error_file_id):
+                if file_id:
+                    content = await self._client.files.content(file_id)
+                    self._resolve(by_id, content.text)
+
+            reason = f"batch {batch.id} ended as {batch.status} without a response"
+            for request in by_id.values():
+                _set_exception(request, BatchRequestError(request.custom_id, reason))
+        except Exception as error:  # noqa: BLE001
+            for request in by_id.values():
+                _set_exception(request, error)
+
+    def _write_requests(self, endpoint: str, requests: list[_BatchRequest]) -> Path:
+        self._batch_dir.mkdir(parents=True, exist_ok=True)
+        path = self._batch_dir / f"fnllm_batch_{uuid.uuid4().hex}.jsonl"
+        with path.open("w", encoding="utf-8") as file:
+            for request in requests:
+                line = {
+                    "custom_id": request.custom_id,
+                    "method": "POST",
+                    "url": f"{self._url_prefix}{endpoint}",
+                    "body": request.body,
+                }
+                file.write(json.dumps(line, default=_to_json) + "\n")
+        return path
+
+    def _resolve(self, by_id: dict[str, _BatchRequest], output: str) -> None:
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+
+            result = json.loads(line)
+            request = by_id.pop(result.get("custom_id"), None)
+            if request is None or request.future.done():
+                continue
+
+            response = result.get("response") or {}
+            if result.get("error") or response.get("status_code") != 200:
+                error = result.get("error") or response.get("body", {}).get("error")
+                request.future.set_exception(
+                    BatchRequestError(request.custom_id, json.dumps(error))
+                )
+            else:
+                request.future.set_result(request.parse(response["body"]))
+
+
+def _set_exception(request: _BatchRequest, error: BaseException) -> None:
+    if not request.future.done():
+        request.future.set_exception(error)
+
+
+def _to_json(value: Any) -> Any:
+    # messages and parameters may hold pydantic models (e.g. previous responses)
+    if hasattr(value, "model_dump"):
+        return value.model_dump(exclude_unset=True)
+    msg = f"{type(value).__name__} is not JSON serializable"
+    raise TypeError(msg)
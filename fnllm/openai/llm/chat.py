@@ -3,15 +3,18 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any, Literal, overload
+from typing import TYPE_CHECKING, Any, Final, Literal, overload
 
 from typing_extensions import Unpack
 
+from fnllm.base.bulk import LLMMapMixin
 from fnllm.openai.types.client import (
     OpenAIChatLLM,
     OpenAIStreamingChatLLM,
     OpenAITextChatLLM,
 )
+from fnllm.services.errors import CircuitOpenError, RetriesExhaustedError
+from fnllm.utils.deadline import resolve_timeout
 
 if TYPE_CHECKING:
     from fnllm.openai.types.chat.io import (
@@ -21,38 +24,63 @@ if TYPE_CHECKING:
         OpenAIStreamingChatOutput,
     )
     from fnllm.openai.types.chat.parameters import OpenAIChatParameters
+    from fnllm.services.rate_limiter import RateLimiter
     from fnllm.types.generics import TJsonModel
     from fnllm.types.io import LLMInput, LLMOutput
 
+FALLBACK_ERRORS: Final[tuple[type[Exception], ...]] = (
+    RetriesExhaustedError,
+    CircuitOpenError,
+)
+"""Errors a call falls back to the next model of the chain on.
+
+Not `BudgetExhaustedError`: the models of a chain share their token budgets.
+"""
+
 
-class OpenAIChatLLMImpl(OpenAIChatLLM):
-    """The OpenAIChatLLM Facade."""
+class OpenAIChatLLMImpl(LLMMapMixin, OpenAIChatLLM):
+    """The OpenAIChatLLM Facade.
+
+    With a `fallback`, calls go to the fallback LLM (another model) when this model fails
+    with one of `FALLBACK_ERRORS`, or right away when the wait `rate_limiter` projects for
+    the request rate limits exceeds `fallback_wait_threshold` seconds.
+    """
 
     def __init__(
             self,
             *,
             text_chat_llm: OpenAITextChatLLM,
             streaming_chat_llm: OpenAIStreamingChatLLM,
+            model: str | None = None,
+            fallback: OpenAIChatLLMImpl | None = None,
+            rate_limiter: RateLimiter[Any, Any, Any, Any] | None = None,
+            fallback_wait_threshold: float | None = None,
     ):
         """Create a new OpenAI Chat Facade."""
-        print()
-        print("fnllm/openai/llm/chat.py OpenAIChatLLMImpl.__init__() start...")
         self._text_chat_llm = text_chat_llm
         self._streaming_chat_llm = streaming_chat_llm
-        print("fnllm/openai/llm/chat.py OpenAIChatLLMImpl.__init__() end...")
-        print()
+        self._model = model
+        self._fallback = fallback
+        self._rate_limiter = rate_limiter
+        self._fallback_wait_threshold = fallback_wait_threshold
+
+    @property
+    def rate_limiter(self) -> RateLimiter[Any, Any, Any, Any] | None:
+        """The rate limiter shared by the text and streaming LLMs, if known."""
+        return self._rate_limiter
 
     def child(self, name: str) -> OpenAIChatLLMImpl:
         """Create a child LLM (with child cache)."""
-        print()
-        print("fnllm/openai/llm/chat.py OpenAIChatLLMImpl.child() start...")
-        print("fnllm/openai/llm/chat.py OpenAIChatLLMImpl.child() {name=}")
-        print("fnllm/openai/llm/chat.py OpenAIChatLLMImpl.child() return OpenAIChatLLMImpl()...")
-        print()
 
         return OpenAIChatLLMImpl(
             text_chat_llm=self._text_chat_llm.child(name),
             streaming_chat_llm=self._streaming_chat_llm.child(name),
+            model=self._model,
+            fallback=self._fallback.child(name) if self._fallback else None,
+            rate_limiter=self._rate_limiter.child(name)
+            if self._rate_limiter
+            else None,
+            fallback_wait_threshold=self._fallback_wait_threshold,
         )
 
     @overload
@@ -91,16 +119,49 @@ class OpenAIChatLLMImpl(OpenAIChatLLM):
         OpenAIChatHistoryEntry,
     ]:
         """Invoke the streaming chat output."""
-        print()
-        print("fnllm/openai/llm/chat.py OpenAIChatLLMImpl.__call__() start...")
-        print(f"fnllm/openai/llm/chat.py OpenAIChatLLMImpl.__call__() {stream=}")
+        if self._fallback is not None:
+            # the whole chain shares one deadline, a fallback does not restart the timeout
+            kwargs = resolve_timeout(kwargs)
+            if self._wait_exceeds_threshold(prompt, kwargs):
+                return await self._fallback(prompt, stream=stream, **kwargs)
+
+            try:
+                return await self._invoke(prompt, stream=stream, **kwargs)
+            except FALLBACK_ERRORS:
+                return await self._fallback(prompt, stream=stream, **kwargs)
+
+        return await self._invoke(prompt, stream=stream, **kwargs)
+
+    async def _invoke(
+            self,
+            prompt: OpenAIChatCompletionInput,
+            *,
+            stream: bool | None = None,
+            **kwargs: Unpack[
+                LLMInput[TJsonModel, OpenAIChatHistoryEntry, OpenAIChatParameters]
+            ],
+    ) -> LLMOutput[
+        Any | OpenAIStreamingChatOutput | OpenAIChatOutput,
+        TJsonModel,
+        OpenAIChatHistoryEntry,
+    ]:
         if stream:
-            print(
-                f"fnllm/openai/llm/chat.py OpenAIChatLLMImpl.__call__() return self._streaming_chat_llm(prompt, **kwargs)")
-            print()
-            return await self._streaming_chat_llm(prompt, **kwargs)
-
-        print(
-            f"fnllm/openai/llm/chat.py OpenAIChatLLMImpl.__call__() return self._text_chat_llm(prompt, **kwargs)")
-        print()
-        return await self._text_chat_llm(prompt, **kwargs)
+            result = await self._streaming_chat_llm(prompt, **kwargs)
+            result.model = self._model
+            return result
+
+        result = await self._text_chat_llm(prompt, **kwargs)
+        result.model = self._model
+        return result
+
+    def _wait_exceeds_threshold(
+            self,
+            prompt: OpenAIChatCompletionInput,
+            kwargs: LLMInput[TJsonModel, OpenAIChatHistoryEntry, OpenAIChatParameters],
+    ) -> bool:
+        if self._rate_limiter is None or self._fallback_wait_threshold is None:
+            return False
+        # waits for concurrency slots are not projected, they are short-lived and
+        # always taken in bulk runs (or while streaming)
+        wait = self._rate_limiter.projected_wait(prompt, kwargs)
+        return wait > self._fallback_wait_threshold
@@ -4,9 +4,14 @@
 
 from __future__ import annotations
 
+import asyncio
+import functools
+import time
 import traceback
-from collections.abc import AsyncIterator, Callable, Iterator
-from typing import TYPE_CHECKING, TypeAlias, cast
+import weakref
+from collections.abc import AsyncIterator, Callable, Coroutine, Iterator
+from contextlib import suppress
+from typing import TYPE_CHECKING, Any, TypeAlias, cast
 
 from openai import AsyncStream
 from openai.types.chat import ChatCompletionChunk
@@ -20,13 +25,22 @@ from fnllm.openai.types.chat.io import (
     OpenAIStreamingChatOutput,
 )
 from fnllm.openai.types.chat.parameters import OpenAIChatParameters
-from fnllm.types import LLMMetrics, LLMUsageMetrics
-from .utils import build_chat_messages
+from fnllm.types import (
+    LLMMetrics,
+    LLMStreamMetrics,
+    LLMUsageMetrics,
+    StreamEndCallback,
+)
+from fnllm.utils.tracing import tracer
+from .utils import build_chat_messages, request_timeout
 
 if TYPE_CHECKING:
+    from tiktoken import Encoding
+
     from fnllm.events.base import LLMEvents
     from fnllm.openai.types.aliases import OpenAIChatModel
     from fnllm.openai.types.client import OpenAIClient
+    from fnllm.services.circuit_breaker import CircuitBreaker
     from fnllm.services.rate_limiter import RateLimiter
     from fnllm.services.retryer import Retryer
     from fnllm.services.variable_injector import VariableInjector
@@ -66,39 +80,61 @@ class OpenAIStreamingChatLLMImpl(
                          OpenAIChatParameters,
                      ]
                      | None = None,
+            circuit_breaker: CircuitBreaker[
+                                 OpenAIChatCompletionInput,
+                                 OpenAIStreamingChatOutput,
+                                 OpenAIChatHistoryEntry,
+                                 OpenAIChatParameters,
+                             ]
+                             | None = None,
             emit_usage: bool = False,
+            encoder: Encoding | None = None,
             model_parameters: OpenAIChatParameters | None = None,
             events: LLMEvents | None = None,
     ):
-        """Create a new OpenAIChatLLM."""
-        print("fnllm/openai/llm/chat_streaming.py OpenAIStreamingChatLLMImpl.__init__() start...")
+        """Create a new OpenAIChatLLM.
+
+        `encoder` counts the streamed output tokens when the usage is not reported.
+        """
         super().__init__(
             events=events,
             variable_injector=variable_injector,
             rate_limiter=rate_limiter,
             retryer=retryer,
+            circuit_breaker=circuit_breaker,
         )
 
         self._client = client
         self._model = model
         self._emit_usage = emit_usage
+        self._encoder = encoder
         self._global_model_parameters = model_parameters or {}
 
     def child(self, name: str) -> OpenAIStreamingChatLLMImpl:
         """Create a child LLM."""
+        if self._rate_limiter is not None:
+            return OpenAIStreamingChatLLMImpl(
+                self._client,
+                self._model,
+                variable_injector=self._variable_injector,
+                rate_limiter=self._rate_limiter.child(name),
+                retryer=self._retryer,
+                circuit_breaker=self._circuit_breaker,
+                emit_usage=self._emit_usage,
+                encoder=self._encoder,
+                model_parameters=self._global_model_parameters,
+                events=self._events,
+            )
         return self
 
     def _build_completion_parameters(
             self, local_parameters: OpenAIChatParameters | None
     ) -> OpenAIChatParameters:
-        print("fnllm/openai/llm/chat_streaming.py OpenAIStreamingChatLLMImpl._build_completion_parameters() start...")
         params: OpenAIChatParameters = {
             "model": self._model,
             **self._global_model_parameters,
             **(local_parameters or {}),
         }
-        print(
-            f"fnllm/openai/llm/chat_streaming.py OpenAIStreamingChatLLMImpl._build_completion_parameters() return {params=}...")
         return params
 
     async def _execute_llm(
@@ -108,7 +144,6 @@ class OpenAIStreamingChatLLMImpl(
                 LLMInput[TJsonModel, OpenAIChatHistoryEntry, OpenAIChatParameters]
             ],
     ) -> OpenAIStreamingChatOutput:
-        print("fnllm/openai/llm/chat_streaming.py OpenAIStreamingChatLLMImpl._execute_llm() start...")
         history = kwargs.get("history", [])
         local_model_parameters = kwargs.get("model_parameters")
         messages, prompt_message = build_chat_messages(prompt, history)
@@ -116,7 +151,11 @@ class OpenAIStreamingChatLLMImpl(
             local_model_parameters
         )
 
-        completion_kwargs = {**completion_parameters, "stream": True}
+        completion_kwargs = {
+            **completion_parameters,
+            "stream": True,
+            "timeout": request_timeout(kwargs.get("deadline")),
+        }
         if self._emit_usage:
             completion_kwargs["stream_options"] = {"include_usage": True}
 
@@ -125,84 +164,228 @@ class OpenAIStreamingChatLLMImpl(
             **completion_kwargs,
         )
 
-        iterator = StreamingChatIterator(chunks=completion, events=self._events)
+        rate_limiter = self._rate_limiter
+        iterator = StreamingChatIterator(
+            chunks=completion,
+            events=self._events,
+            encoder=self._encoder,
+            input_tokens=functools.partial(
+                rate_limiter.estimate_input_tokens, prompt, kwargs
+            )
+            if rate_limiter is not None
+            else None,
+        )
         result = OpenAIStreamingChatOutput(
             raw_input=prompt_message,
             content=iterator.iterator,
             close=iterator.close,
+            on_stream_end=iterator.on_end,
         )
+        # the stream references the handler, it must not keep the output alive
+        result_ref = weakref.ref(result)
 
         def handle_usage(usage: LLMUsageMetrics) -> None:
-            result.usage = usage
+            output = result_ref()
+            if output is not None:
+                output.usage = usage
 
         iterator.on_usage(handle_usage)
         return result
 
 
+_collecting: set[asyncio.Task[None]] = set()
+"""Tasks ending the garbage collected streams (the loop only keeps weak references to them)."""
+
+
+class _StreamState:
+    """State shared by a stream and its iterator, running the stream end callbacks once however the stream ends.
+
+    It must not reference the iterator or the output, so they are freed (and the stream
+    ended) as soon as the consumer drops them, without waiting for the cyclic collector.
+    """
+
+    def __init__(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._start = time.monotonic()
+        self._callbacks: list[StreamEndCallback] = []
+        self.on_usage: Callable[[LLMUsageMetrics], None] | None = None
+        self.started = False
+        self.metrics: LLMStreamMetrics | None = None
+
+    def add(self, callback: StreamEndCallback) -> None:
+        if self.metrics is None:
+            self._callbacks.append(callback)
+        else:
+            self._spawn(callback(self.metrics))
+
+    async def end(
+            self,
+            *,
+            completed: bool,
+            usage: LLMUsageMetrics | None = None,
+            usage_reported: bool = False,
+    ) -> None:
+        if self.metrics is not None:
+            return
+
+        self.on_usage = None
+        self.metrics = LLMStreamMetrics(
+            duration=time.monotonic() - self._start,
+            completed=completed,
+            usage=usage,
+            usage_reported=usage_reported,
+        )
+        if tracer.info:
+            tracer.emit(
+                "llm.stream", duration=self.metrics.duration, completed=completed
+            )
+        callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            await callback(self.metrics)
+
+    def collected(self, chunks: ChunkStream) -> None:
+        """End the stream, garbage collected before being read.
+
+        Once read, the stream is closed by the event loop when garbage collected, as any
+        async generator.
+        """
+        if self.metrics is None and not self.started and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._spawn, self._close(chunks))
+
+    async def _close(self, chunks: ChunkStream) -> None:
+        try:
+            await chunks.close()
+        finally:
+            await self.end(completed=False)
+
+    def _spawn(self, coroutine: Coroutine[Any, Any, None]) -> None:
+        task = self._loop.create_task(coroutine)
+        _collecting.add(task)
+        task.add_done_callback(_collecting.discard)
+
+
 class StreamingChatIterator:
-    """A streaming llm response iterator."""
+    """A streaming llm response iterator.
+
+    The stream ends when it is read to the end, closed, or dropped by the consumer (once
+    garbage collected), the callbacks registered with `on_end` then run once (e.g. to
+    release the rate limits and charge the usage). When the LLM did not report the usage,
+    the streamed output tokens are counted with `encoder` and reported in its place, along
+    with the estimated input tokens of the request (`input_tokens`).
+
+    A consumer that stops reading without dropping the stream, e.g. because its task was
+    cancelled, must `close()` it (in a `finally`) to end it.
+    """
 
     def __init__(
             self,
             chunks: ChunkStream,
             events: LLMEvents,
+            *,
+            encoder: Encoding | None = None,
+            input_tokens: Callable[[], int] | None = None,
     ):
         """Create a new Response."""
         self._chunks = chunks
-        self._events = events
-        self._iterator = self.__stream__()
+        self._state = _StreamState()
+        self._iterator = _stream(chunks, events, self._state, encoder, input_tokens)
+        finalizer = weakref.finalize(self, self._state.collected, chunks)
+        finalizer.atexit = False
 
     def on_usage(self, cb: Callable[[LLMUsageMetrics], None]) -> None:
         """Handle usage events."""
-        print("fnllm/openai/llm/chat_streaming.py StreamingChatIterator.on_usage() start...")
-        self._on_usage = cb
-        print("fnllm/openai/llm/chat_streaming.py StreamingChatIterator.on_usage() end...")
-
-    async def __stream__(self) -> AsyncIterator[str | None]:
-        """Read chunks from the stream."""
-        print("fnllm/openai/llm/chat_streaming.py StreamingChatIterator.__stream__() start...")
-        usage = LLMUsageMetrics()
-        try:
-            print(
-                "fnllm/openai/llm/chat_streaming.py StreamingChatIterator.__stream__() run `async for chunk in self._chunks` start...")
-            async for chunk in self._chunks:
-                # Note: this is only emitted _just_ prior to the stream completing.
-                if chunk.usage:
-                    usage = LLMUsageMetrics(
-                        input_tokens=chunk.usage.prompt_tokens,
-                        output_tokens=chunk.usage.completion_tokens,
-                    )
-                    if self._on_usage:
-                        self._on_usage(usage)
-                    await self._events.on_usage(usage)
-
-                if chunk.choices and len(chunk.choices) > 0:
-                    yield chunk.choices[0].delta.content
-            print(
-                "fnllm/openai/llm/chat_streaming.py StreamingChatIterator.__stream__() run `async for chunk in self._chunks` end...")
-        except BaseException as e:
-            stack_trace = traceback.format_exc()
-            await self._events.on_error(e, stack_trace, {"streaming": True})
-            raise
-
-        self._on_usage = None
-        await self._events.on_success(
-            LLMMetrics(
-                estimated_input_tokens=usage.input_tokens,
-                usage=usage,
-            )
-        )
+        self._state.on_usage = cb
+
+    def on_end(self, cb: StreamEndCallback) -> None:
+        """Run `cb` once the stream ends."""
+        self._state.add(cb)
 
     @property
     def iterator(self) -> AsyncIterator[str | None]:
         """Return the content."""
-        print()
-        print("fnllm/openai/llm/chat_streaming.py StreamingChatIterator.iterator() start...")
-        print(f"fnllm/openai/llm/chat_streaming.py StreamingChatIterator.iterator() return {self._iterator=}...")
-        print()
         return self._iterator
 
     async def close(self) -> None:
         """Close the stream."""
-        print("chat_streaming.py StreamingChatIterator.close() start...")
         await self._chunks.close()
+        # the content may be read by another task, which then ends the stream itself
+        with suppress(RuntimeError):
+            await self._iterator.aclose()
+        await self._state.end(completed=False)
+
+
+async def _stream(
+        chunks: ChunkStream,
+        events: LLMEvents,
+        state: _StreamState,
+        encoder: Encoding | None,
+        input_tokens: Callable[[], int] | None,
+) -> AsyncIterator[str | None]:
+    """Read chunks from the stream."""
+    state.started = True
+    usage = LLMUsageMetrics()
+    usage_reported = False
+    # only kept to count the output tokens when no usage is reported
+    streamed: list[str] = []
+    completed = False
+    try:
+        async for chunk in chunks:
+            # Note: this is only emitted _just_ prior to the stream completing.
+            if chunk.usage:
+                usage = LLMUsageMetrics(
+                    input_tokens=chunk.usage.prompt_tokens,
+                    output_tokens=chunk.usage.completion_tokens,
+                )
+                usage_reported = True
+                streamed.clear()
+                if state.on_usage:
+                    state.on_usage(usage)
+                await events.on_usage(usage)
+
+            if chunk.choices and len(chunk.choices) > 0:
+                content = chunk.choices[0].delta.content
+                if content and encoder is not None and not usage_reported:
+                    streamed.append(content)
+                yield content
+        completed = True
+    except GeneratorExit:
+        # closed before the end, not an error
+        raise
+    except BaseException as e:
+        stack_trace = traceback.format_exc()
+        await events.on_error(e, stack_trace, {"streaming": True})
+        raise
+    finally:
+        if not completed:
+            await chunks.close()
+        if usage_reported:
+            await state.end(completed=completed, usage=usage, usage_reported=True)
+        else:
+            counted = _count_usage(encoder, streamed, input_tokens)
+            if counted is not None:
+                usage = counted
+                if state.on_usage:
+                    state.on_usage(usage)
+                await events.on_usage(usage)
+            await state.end(completed=completed, usage=counted)
+
+    await events.on_success(
+        LLMMetrics(
+            estimated_input_tokens=usage.input_tokens,
+            usage=usage,
+            stream=state.metrics,
+        )
+    )
+
+
+def _count_usage(
+        encoder: Encoding | None,
+        streamed: list[str],
+        input_tokens: Callable[[], int] | None,
+) -> LLMUsageMetrics | None:
+    if encoder is None:
+        return None
+    return LLMUsageMetrics(
+        input_tokens=input_tokens() if input_tokens is not None else 0,
+        output_tokens=len(encoder.encode("".join(streamed))),
+    )
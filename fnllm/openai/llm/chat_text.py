@@ -21,13 +21,15 @@ from fnllm.openai.types.chat.parameters import OpenAIChatParameters
 from fnllm.types.metrics import LLMUsageMetrics
 from .services.history_extractor import OpenAIHistoryExtractor
 from .services.usage_extractor import OpenAIUsageExtractor
-from .utils import build_chat_messages
+from .utils import build_chat_messages, request_timeout
 
 if TYPE_CHECKING:
     from fnllm.events.base import LLMEvents
     from fnllm.openai.types.client import OpenAIClient
     from fnllm.services.cache_interactor import Cached, CacheInteractor
     from fnllm.services.json import JsonHandler
+    from fnllm.services.circuit_breaker import CircuitBreaker
+    from fnllm.services.hedger import Hedger
     from fnllm.services.rate_limiter import RateLimiter
     from fnllm.services.retryer import Retryer
     from fnllm.services.variable_injector import VariableInjector
@@ -68,32 +70,42 @@ class OpenAITextChatLLMImpl(
                          OpenAIChatParameters,
                      ]
                      | None = None,
+            circuit_breaker: CircuitBreaker[
+                                 OpenAIChatCompletionInput,
+                                 OpenAIChatOutput,
+                                 OpenAIChatHistoryEntry,
+                                 OpenAIChatParameters,
+                             ]
+                             | None = None,
+            hedger: Hedger[
+                        OpenAIChatCompletionInput,
+                        OpenAIChatOutput,
+                        OpenAIChatHistoryEntry,
+                        OpenAIChatParameters,
+                    ]
+                    | None = None,
             model_parameters: OpenAIChatParameters | None = None,
             events: LLMEvents | None = None,
             json_handler: JsonHandler[OpenAIChatOutput, OpenAIChatHistoryEntry]
                           | None = None,
     ):
         """Create a new OpenAIChatLLM."""
-        print()
-        print("fnllm/openai/llm/chat_text.py OpenAITextChatLLMImpl.__init__() start...")
-        print("fnllm/openai/llm/chat_text.py OpenAITextChatLLMImpl.__init__() invoke super().__init__() start...")
         super().__init__(
             events=events,
             usage_extractor=usage_extractor,
             history_extractor=history_extractor,
             variable_injector=variable_injector,
             retryer=retryer,
+            circuit_breaker=circuit_breaker,
+            hedger=hedger,
             rate_limiter=rate_limiter,
             json_handler=json_handler,
         )
-        print("fnllm/openai/llm/chat_text.py OpenAITextChatLLMImpl.__init__() invoke super().__init__() end...")
 
         self._client = client
         self._model = model
         self._global_model_parameters = model_parameters or {}
         self._cache = cache
-        print("fnllm/openai/llm/chat_text.py OpenAITextChatLLMImpl.__init__() start...")
-        print()
 
     def child(self, name: str) -> Any:
         """Create a child LLM."""
@@ -107,8 +119,10 @@ class OpenAITextChatLLMImpl(
             ),
             history_extractor=cast(OpenAIHistoryExtractor, self._history_extractor),
             variable_injector=self._variable_injector,
-            rate_limiter=self._rate_limiter,
+            rate_limiter=self._rate_limiter.child(name) if self._rate_limiter else None,
             retryer=self._retryer,
+            circuit_breaker=self._circuit_breaker,
+            hedger=self._hedger,
             model_parameters=self._global_model_parameters,
             json_handler=self._json_handler,
         )
@@ -116,7 +130,6 @@ class OpenAITextChatLLMImpl(
     def _build_completion_parameters(
             self, local_parameters: OpenAIChatParameters | None
     ) -> OpenAIChatParameters:
-        print("chat_text.py _build_completion_parameters() start...")
         params: OpenAIChatParameters = {
             "model": self._model,
             **self._global_model_parameters,
@@ -132,12 +145,14 @@ class OpenAITextChatLLMImpl(
             messages: list[OpenAIChatHistoryEntry],
             parameters: OpenAIChatParameters,
             bypass_cache: bool,
+            deadline: float | None = None,
     ) -> Cached[OpenAIChatCompletionModel]:
         # TODO: check if we need to remove max_tokens and n from the keys
         return await self._cache.get_or_insert(
             lambda: self._client.chat.completions.create(
                 messages=cast(Iterator[ChatCompletionMessageParam], messages),
                 **parameters,
+                timeout=request_timeout(deadline),
             ),
             prefix=f"chat_{name}" if name else "chat",
             key_data={"messages": messages, "parameters": parameters},
@@ -153,7 +168,6 @@ class OpenAITextChatLLMImpl(
                 LLMInput[TJsonModel, OpenAIChatHistoryEntry, OpenAIChatParameters]
             ],
     ) -> OpenAIChatOutput:
-        print("fnllm/openai/llm/chat_text.py _execute_llm() start...")
         name = kwargs.get("name")
         history = kwargs.get("history", [])
         bypass_cache = kwargs.get("bypass_cache", False)
@@ -168,6 +182,7 @@ class OpenAITextChatLLMImpl(
             messages=messages,
             parameters=completion_parameters,
             bypass_cache=bypass_cache,
+            deadline=kwargs.get("deadline"),
         )
         completion = response.value
 
@@ -184,4 +199,5 @@ class OpenAITextChatLLMImpl(
             raw_output=result,
             content=result.content,
             usage=usage or LLMUsageMetrics(),
+            cache_key=response.key,
         )
@@ -6,7 +6,6 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING, cast
 
-from langfuse.decorators import observe, langfuse_context
 from typing_extensions import Unpack
 
 from fnllm.base.base import BaseLLM
@@ -18,11 +17,14 @@ from fnllm.openai.types.embeddings.io import (
 from fnllm.openai.types.embeddings.parameters import OpenAIEmbeddingsParameters
 from fnllm.types.metrics import LLMUsageMetrics
 from .services.usage_extractor import OpenAIUsageExtractor
+from .utils import request_timeout
 
 if TYPE_CHECKING:
     from fnllm.events.base import LLMEvents
     from fnllm.openai.types.client import OpenAIClient
     from fnllm.services.cache_interactor import Cached, CacheInteractor
+    from fnllm.services.circuit_breaker import CircuitBreaker
+    from fnllm.services.hedger import Hedger
     from fnllm.services.rate_limiter import RateLimiter
     from fnllm.services.retryer import Retryer
     from fnllm.services.variable_injector import VariableInjector
@@ -58,6 +60,20 @@ class OpenAIEmbeddingsLLMImpl(
                          OpenAIEmbeddingsParameters,
                      ]
                      | None = None,
+            circuit_breaker: CircuitBreaker[
+                                 OpenAIEmbeddingsInput,
+                                 OpenAIEmbeddingsOutput,
+                                 None,
+                                 OpenAIEmbeddingsParameters,
+                             ]
+                             | None = None,
+            hedger: Hedger[
+                        OpenAIEmbeddingsInput,
+                        OpenAIEmbeddingsOutput,
+                        None,
+                        OpenAIEmbeddingsParameters,
+                    ]
+                    | None = None,
             model_parameters: OpenAIEmbeddingsParameters | None = None,
             events: LLMEvents | None = None,
     ):
@@ -68,6 +84,8 @@ class OpenAIEmbeddingsLLMImpl(
             variable_injector=variable_injector,
             rate_limiter=rate_limiter,
             retryer=retryer,
+            circuit_breaker=circuit_breaker,
+            hedger=hedger,
         )
 
         self._client = client
@@ -85,8 +103,10 @@ class OpenAIEmbeddingsLLMImpl(
                 OpenAIUsageExtractor[OpenAIEmbeddingsOutput], self._usage_extractor
             ),
             variable_injector=self._variable_injector,
-            rate_limiter=self._rate_limiter,
+            rate_limiter=self._rate_limiter.child(name) if self._rate_limiter else None,
             retryer=self._retryer,
+            circuit_breaker=self._circuit_breaker,
+            hedger=self._hedger,
             model_parameters=self._global_model_parameters,
             events=self._events,
         )
@@ -102,28 +122,6 @@ class OpenAIEmbeddingsLLMImpl(
 
         return params
 
-    @observe(as_type="generation", name="OpenAI-embeddings")
-    async def _base_create_embeddings(self, prompt, parameters):
-        print("fnllm/openai/llm/embeddings.py OpenAIEmbeddingsLLMImpl._base_create_embeddings() start...")
-        print(f"fnllm/openai/llm/embeddings.py OpenAIEmbeddingsLLMImpl._base_create_embeddings() {parameters=}")
-        parameters_clone = parameters.copy()
-        model = parameters_clone.pop('model', None)
-
-        res = await self._client.embeddings.create(
-            input=prompt,
-            **parameters,
-        )
-        langfuse_context.update_current_observation(
-            model=model,
-            metadata=parameters_clone,
-            usage_details={
-                "input": res.usage.prompt_tokens,
-                "output": res.usage.total_tokens - res.usage.prompt_tokens,
-                "total": res.usage.total_tokens,
-            }
-        )
-        return res
-
     async def _call_embeddings_or_cache(
             self,
             name: str | None,
@@ -131,14 +129,15 @@ class OpenAIEmbeddingsLLMImpl(
             prompt: OpenAIEmbeddingsInput,
             parameters: OpenAIEmbeddingsParameters,
             bypass_cache: bool,
+            deadline: float | None = None,
     ) -> Cached[OpenAICreateEmbeddingResponseModel]:
         # TODO: check if we need to remove max_tokens and n from the keys
         return await self._cache.get_or_insert(
-            # lambda: self._client.embeddings.create(
-            #     input=prompt,
-            #     **parameters,
-            # ),
-            lambda: self._base_create_embeddings(prompt, parameters),
+            lambda: self._client.embeddings.create(
+                input=prompt,
+                **parameters,
+                timeout=request_timeout(deadline),
+            ),
             prefix=f"embeddings_{name}" if name else "embeddings",
             key_data={"input": prompt, "parameters": parameters},
             name=name,
@@ -149,7 +148,6 @@ class OpenAIEmbeddingsLLMImpl(
     async def _execute_llm(
             self, prompt: OpenAIEmbeddingsInput, **kwargs: Unpack[LLMInput]
     ) -> OpenAIEmbeddingsOutput:
-        print("fnllm/openai/llm/embeddings.py _execute_llm() start...")
         name = kwargs.get("name")
         local_model_parameters = kwargs.get("model_parameters")
         bypass_cache = kwargs.get("bypass_cache", False)
@@ -163,6 +161,7 @@ class OpenAIEmbeddingsLLMImpl(
             prompt=prompt,
             parameters=embeddings_parameters,
             bypass_cache=bypass_cache,
+            deadline=kwargs.get("deadline"),
         )
         result = response.value
         usage: LLMUsageMetrics | None = None
@@ -176,4 +175,5 @@ class OpenAIEmbeddingsLLMImpl(
             raw_output=result.data,
             embeddings=[d.embedding for d in result.data],
             usage=usage or LLMUsageMetrics(),
+            cache_key=response.key,
         )
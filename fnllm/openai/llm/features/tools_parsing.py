@@ -9,6 +9,7 @@ from typing import TYPE_CHECKING
 import pydantic
 from typing_extensions import Unpack
 
+from fnllm.base.bulk import LLMMapMixin
 from fnllm.openai.llm.utils import llm_tools_to_param
 from fnllm.openai.types.chat.io import (
     OpenAIChatCompletionInput,
@@ -32,6 +33,7 @@ if TYPE_CHECKING:
 
 
 class OpenAIParseToolsLLM(
+    LLMMapMixin,
     LLM[
         OpenAIChatCompletionInput,
         OpenAIChatOutput,
@@ -51,11 +53,7 @@ class OpenAIParseToolsLLM(
             ],
     ):
         """Create a new OpenAIParseToolsLLM."""
-        print()
-        print("fnllm/openai/llm/features/tools_parsing.py OpenAIParseToolsLLM.__init__() start...")
         self._delegate = delegate
-        print("fnllm/openai/llm/features/tools_parsing.py OpenAIParseToolsLLM.__init__() end...")
-        print()
 
     def child(self, name: str) -> "OpenAIParseToolsLLM":
         """Create a child LLM (with child cache)."""
@@ -66,7 +64,6 @@ class OpenAIParseToolsLLM(
             parameters: LLMInput[TJsonModel, OpenAIChatHistoryEntry, OpenAIChatParameters],
             tools: Sequence[type[LLMTool]],
     ) -> LLMInput[TJsonModel, OpenAIChatHistoryEntry, OpenAIChatParameters]:
-        print("tools_parsing.py _add_tools_to_parameters() start...")
         new_parameters = parameters.copy()
 
         new_parameters["model_parameters"] = new_parameters.get("model_parameters", {})
@@ -81,11 +78,7 @@ class OpenAIParseToolsLLM(
             json_model: type[LLMTool],
             raw_output: OpenAIChatCompletionMessageModel,
     ) -> LLMTool:
-        print("fnllm/openai/llm/features/tools_parsing.py _parse_arguments.__init__() start...")
         try:
-            print("fnllm/openai/llm/features/tools_parsing.py _parse_arguments.__init__() end...")
-            print(
-                "fnllm/openai/llm/features/tools_parsing.py _parse_arguments.__init__() return json_model.model_validate_json()...")
             return json_model.model_validate_json(tool_call.function.arguments)
         except pydantic.ValidationError as err:
             raise ToolInvalidArgumentsError(
@@ -101,7 +94,6 @@ class OpenAIParseToolsLLM(
             *,
             tools: Sequence[type[LLMTool]],
     ) -> list[LLMTool]:
-        print("tools_parsing.py _parse_tool_calls() start...")
         result = []
         tool_calls = raw_output.tool_calls or []
 
@@ -130,7 +122,6 @@ class OpenAIParseToolsLLM(
             ],
     ) -> LLMOutput[OpenAIChatOutput, TJsonModel, OpenAIChatHistoryEntry]:
         """Call the LLM."""
-        print("tools_parsing.py __call__() start...")
         tools = kwargs.get("tools", [])
 
         if not tools:
@@ -0,0 +1,158 @@
+# Copyright (c) 2024 Microsoft Corporation.
+
+"""Load balancing of OpenAI LLM calls across endpoints."""
+
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING, Any, Final
+
+from openai import APIConnectionError, InternalServerError, RateLimitError
+
+from fnllm.base.bulk import LLMMapMixin
+from fnllm.limiting.errors import LimiterQueueFullError
+from fnllm.services.circuit_breaker import CircuitState
+from fnllm.services.errors import CircuitOpenError, RetriesExhaustedError
+from fnllm.types.generalized import StreamingLLMOutput
+from fnllm.utils.deadline import resolve_timeout
+from fnllm.utils.rolling_quantile import RollingQuantile
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from fnllm.services.circuit_breaker import Circuit
+    from fnllm.services.rate_limiter import RateLimiter
+
+OPENAI_FAILOVER_ERRORS: Final[tuple[type[Exception], ...]] = (
+    RateLimitError,
+    InternalServerError,
+    APIConnectionError,
+    RetriesExhaustedError,
+    CircuitOpenError,
+    LimiterQueueFullError,
+)
+"""Errors a request fails over to another endpoint on."""
+
+_UNKNOWN_LATENCY: Final = 1.0
+"""Latency assumed for endpoints without successful calls yet, so they get traffic."""
+
+_OPEN_CIRCUIT_SHARE: Final = 0.01
+"""Share of its usual traffic an endpoint with an open circuit gets, so it gets probed."""
+
+
+@dataclass
+class EndpointHealth:
+    """Observed health of an endpoint, shared by the children of a load balanced LLM."""
+
+    latencies: RollingQuantile = field(default_factory=RollingQuantile)
+    """Latencies of the last successful requests, without their limiter waits and retries."""
+
+    failures: int = 0
+    """Failures since the last successful call."""
+
+
+@dataclass
+class LoadBalancedEndpoint:
+    """An endpoint (deployment, region or API key) of a load balanced LLM."""
+
+    name: str
+    """The name of the endpoint."""
+
+    llm: Any
+    """The LLM calling the endpoint."""
+
+    rate_limiter: RateLimiter[Any, Any, Any, Any] | None = None
+    """The rate limiter of the endpoint LLM, used to project the wait of its quota for a call."""
+
+    circuit: Circuit | None = None
+    """The circuit of the endpoint, if any."""
+
+    weight: float = 1
+    """Relative share of the traffic the endpoint gets, all else being equal."""
+
+    health: EndpointHealth = field(default_factory=EndpointHealth)
+    """Observed health of the endpoint."""
+
+
+class OpenAILoadBalancedLLM(LLMMapMixin):
+    """Routes every call to one of several endpoints, failing over to the others.
+
+    Endpoints are picked at random, weighted by their `weight` divided by the expected
+    time to serve the call: the wait their rate limits project for the call (so the
+    remaining quota counts) plus their median request latency, scaled up by their recent
+    failures. Endpoints with an open circuit get a tiny share of the traffic, enough to
+    probe them. A call failing with a rate limit, server, connection or open circuit error
+    is sent to another endpoint, each endpoint being tried once, all within the deadline
+    of the call.
+    """
+
+    def __init__(self, endpoints: Sequence[LoadBalancedEndpoint]):
+        """Create a new OpenAILoadBalancedLLM."""
+        if not endpoints:
+            msg = "at least one endpoint is required"
+            raise ValueError(msg)
+        self._endpoints = list(endpoints)
+
+    @property
+    def endpoints(self) -> list[LoadBalancedEndpoint]:
+        """The endpoints of the LLM."""
+        return list(self._endpoints)
+
+    def child(self, name: str) -> OpenAILoadBalancedLLM:
+        """Create a child LLM (with child caches), sharing the endpoint health."""
+        return OpenAILoadBalancedLLM([
+            replace(
+                endpoint,
+                llm=endpoint.llm.child(name),
+                rate_limiter=endpoint.rate_limiter.child(name)
+                if endpoint.rate_limiter
+                else None,
+            )
+            for endpoint in self._endpoints
+        ])
+
+    async def __call__(self, prompt: Any, **kwargs: Any) -> Any:
+        """Invoke the LLM of the best endpoint, failing over to the others."""
+        # every endpoint tried shares one deadline, a failover does not restart the timeout
+        kwargs = resolve_timeout(kwargs)  # type: ignore[arg-type]
+        remaining = list(self._endpoints)
+        while True:
+            endpoint = self._choose(remaining, prompt, kwargs)
+            try:
+                result = await endpoint.llm(prompt, **kwargs)
+            except OPENAI_FAILOVER_ERRORS:
+                endpoint.health.failures += 1
+                remaining.remove(endpoint)
+                if not remaining:
+                    raise
+                continue
+
+            endpoint.health.failures = 0
+            metrics = result.metrics
+            # cache hits report no usage, they say nothing about latency (streams report
+            # theirs once they end)
+            is_stream = isinstance(result.output, StreamingLLMOutput)
+            if metrics.request_time and (metrics.usage.total_tokens > 0 or is_stream):
+                endpoint.health.latencies.insert(metrics.request_time)
+            return result
+
+    def _choose(
+            self, endpoints: list[LoadBalancedEndpoint], prompt: Any, kwargs: Any
+    ) -> LoadBalancedEndpoint:
+        scores = [self._score(endpoint, prompt, kwargs) for endpoint in endpoints]
+        if not any(scores):
+            return endpoints[0]
+        return random.choices(endpoints, weights=scores)[0]  # noqa: S311
+
+    def _score(self, endpoint: LoadBalancedEndpoint, prompt: Any, kwargs: Any) -> float:
+        weight = endpoint.weight
+        if endpoint.circuit is not None and endpoint.circuit.state == CircuitState.OPEN:
+            weight *= _OPEN_CIRCUIT_SHARE
+
+        wait = 0.0
+        if endpoint.rate_limiter is not None:
+            wait = endpoint.rate_limiter.projected_wait(prompt, kwargs)
+
+        latency = endpoint.health.latencies.quantile(0.5) or _UNKNOWN_LATENCY
+        return weight / ((latency + wait) * (1 + endpoint.health.failures))
@@ -0,0 +1,133 @@
+# Copyright (c) 2024 Microsoft Corporation.
+
+"""OpenAI client recording its requests for observability."""
+
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING, Any
+
+from fnllm.observability.base import Generation
+
+if TYPE_CHECKING:
+    from fnllm.observability.recorder import ObservabilityRecorder
+    from fnllm.openai.types.client import OpenAIClient
+
+
+class _Completions:
+    def __init__(self, observed: ObservedOpenAIClient):
+        self._observed = observed
+
+    async def create(self, *, messages: Any, **body: Any) -> Any:
+        """Create a chat completion, recording it when sampled."""
+        return await self._observed.request(
+            "chat.completions",
+            self._observed.client.chat.completions.create,
+            "messages",
+            messages,
+            body,
+        )
+
+
+class _Chat:
+    def __init__(self, observed: ObservedOpenAIClient):
+        self.completions = _Completions(observed)
+
+
+class _Embeddings:
+    def __init__(self, observed: ObservedOpenAIClient):
+        self._observed = observed
+
+    async def create(self, *, input: Any, **body: Any) -> Any:  # noqa: A002
+        """Create embeddings, recording them when sampled."""
+        return await self._observed.request(
+            "embeddings",
+            self._observed.client.embeddings.create,
+            "input",
+            input,
+            body,
+        )
+
+
+class ObservedOpenAIClient:
+    """Wraps an OpenAI client, recording the sampled chat completions and embeddings.
+
+    Only the request is timed on the hot path, the generation is handed to the recorder,
+    which exports it in the background. Streams are recorded when their first chunk
+    arrives, without output or usage. Anything else is delegated to the wrapped client.
+    """
+
+    def __init__(self, client: OpenAIClient, recorder: ObservabilityRecorder):
+        """Create a new ObservedOpenAIClient."""
+        self.client = client
+        self.recorder = recorder
+        self.chat = _Chat(self)
+        self.embeddings = _Embeddings(self)
+
+    def __getattr__(self, name: str) -> Any:
+        """Delegate to the wrapped client."""
+        return getattr(self.client, name)
+
+    async def request(
+            self,
+            name: str,
+            create: Any,
+            input_name: str,
+            input_value: Any,
+            body: dict[str, Any],
+    ) -> Any:
+        """Send a request with `create`, recording it when sampled."""
+        if not self.recorder.sampled():
+            return await create(**{input_name: input_value}, **body)
+
+        start_time = time.time()
+        try:
+            response = await create(**{input_name: input_value}, **body)
+        except Exception as error:
+            self._record(name, input_value, body, start_time, error=repr(error))
+            raise
+
+        if body.get("stream"):
+            self._record(name, input_value, body, start_time)
+        else:
+            self._record(name, input_value, body, start_time, response=response)
+        return response
+
+    def _record(
+            self,
+            name: str,
+            input_value: Any,
+            body: dict[str, Any],
+            start_time: float,
+            *,
+            response: Any = None,
+            error: str | None = None,
+    ) -> None:
+        parameters = {
+            key: value
+            for key, value in body.items()
+            if key not in ("model", "timeout")
+        }
+        usage = None
+        if response is not None and response.usage is not None:
+            total = response.usage.total_tokens
+            input_tokens = response.usage.prompt_tokens
+            usage = {
+                "input": input_tokens,
+                "output": total - input_tokens,
+                "total": total,
+            }
+
+        self.recorder.record(
+            Generation(
+                name=name,
+                model=body.get("model"),
+                input=input_value,
+                parameters=parameters,
+                output=response,
+                usage=usage,
+                start_time=start_time,
+                end_time=time.time(),
+                error=error,
+            )
+        )
@@ -0,0 +1,35 @@
+# Copyright (c) 2024 Microsoft Corporation.
+
+"""Circuit breaker LLM implementation for OpenAI."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Final, Generic
+
+from openai import APIConnectionError, InternalServerError
+
+from fnllm.services.circuit_breaker import CircuitBreaker
+from fnllm.types.generics import THistoryEntry, TInput, TModelParameters, TOutput
+
+if TYPE_CHECKING:
+    from fnllm.events.base import LLMEvents
+    from fnllm.services.circuit_breaker import Circuit
+
+OPENAI_CIRCUIT_FAILURE_ERRORS: Final[list[type[Exception]]] = [
+    APIConnectionError,
+    InternalServerError,
+]
+"""Errors showing the endpoint is unhealthy, rate limits only show it is busy."""
+
+
+class OpenAICircuitBreaker(
+    CircuitBreaker[TInput, TOutput, THistoryEntry, TModelParameters],
+    Generic[TInput, TOutput, THistoryEntry, TModelParameters],
+):
+    """A circuit breaker for an OpenAI endpoint/deployment."""
+
+    def __init__(self, circuit: Circuit, *, events: LLMEvents | None = None):
+        """Create a new OpenAICircuitBreaker."""
+        super().__init__(
+            circuit, failure_errors=OPENAI_CIRCUIT_FAILURE_ERRORS, events=events
+        )
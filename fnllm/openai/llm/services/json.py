@@ -30,23 +30,12 @@ def create_json_handler(
         max_retries: int,
 ) -> JsonHandler[OpenAIChatOutput, OpenAIChatHistoryEntry]:
     """Create a JSON handler for OpenAI."""
-    print()
-    print("fnllm/openai/llm/services/json.py create_json_handler() start...")
-    print(f"fnllm/openai/llm/services/json.py create_json_handler() {strategy=}")
-    print(f"fnllm/openai/llm/services/json.py create_json_handler() {max_retries=}")
     marshaler = OpenAIJsonMarshaler()
-    print(f"fnllm/openai/llm/services/json.py create_json_handler() {marshaler=}")
 
     match strategy:
         case JsonStrategy.LOOSE:
-            print(
-                "fnllm/openai/llm/services/json.py create_json_handler() return JsonHandler(None, LooseModeJsonReceiver(marshaler, max_retries))...")
-            print()
             return JsonHandler(None, LooseModeJsonReceiver(marshaler, max_retries))
         case JsonStrategy.VALID:
-            print(
-                "fnllm/openai/llm/services/json.py create_json_handler() return JsonHandler(OpenAIJsonRequester(), JsonReceiver(marshaler, max_retries))...")
-            print()
             return JsonHandler(
                 OpenAIJsonRequester(), JsonReceiver(marshaler, max_retries)
             )
@@ -63,11 +52,7 @@ class OpenAIJsonMarshaler(JsonMarshaler[OpenAIChatOutput, OpenAIChatHistoryEntry
             output: LLMOutput[OpenAIChatOutput, TJsonModel, OpenAIChatHistoryEntry],
     ) -> LLMOutput[OpenAIChatOutput, TJsonModel, OpenAIChatHistoryEntry]:
         """Inject the JSON string into the output."""
-        print()
-        print("fnllm/openai/llm/services/json.py inject_json_string() start...")
         output.output.content = json_string
-        print(f"fnllm/openai/llm/services/json.py inject_json_string() return {output=}...")
-        print()
 
         return output
 
@@ -75,10 +60,6 @@ class OpenAIJsonMarshaler(JsonMarshaler[OpenAIChatOutput, OpenAIChatHistoryEntry
             self, output: LLMOutput[OpenAIChatOutput, TJsonModel, OpenAIChatHistoryEntry]
     ) -> str | None:
         """Extract the JSON string from the output."""
-        print()
-        print("fnllm/openai/llm/services/json.py extract_json_string() start...")
-        print(f"fnllm/openai/llm/services/json.py extract_json_string() return {output.output.content=}...")
-        print()
 
         return output.output.content
 
@@ -102,22 +83,16 @@ class OpenAIJsonRequester(
         LLMInput[TJsonModel, OpenAIChatHistoryEntry, OpenAIChatParameters],
     ]:
         """Rewrite the input prompt and arguments.."""
-        print()
-        print("fnllm/openai/llm/services/json.py OpenAIJsonRequester.rewrite_args() start...")
         kwargs["model_parameters"] = self._enable_oai_json_mode(
             kwargs.get("model_parameters", {})
         )
-        print(f"fnllm/openai/llm/services/json.py OpenAIJsonRequester.rewrite_args() return {prompt=}, {kwargs=}...")
-        print()
 
         return prompt, kwargs
 
     def _enable_oai_json_mode(
             self, parameters: OpenAIChatParameters
     ) -> OpenAIChatParameters:
-        print("fnllm/openai/llm/services/json.py OpenAIJsonRequester._enable_oai_json_mode() start...")
         result: OpenAIChatParameters = parameters.copy()
         result["response_format"] = {"type": "json_object"}
-        print("fnllm/openai/llm/services/json.py OpenAIJsonRequester._enable_oai_json_mode() return {result=}...")
 
         return result
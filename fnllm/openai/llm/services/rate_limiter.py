@@ -5,7 +5,7 @@
 from __future__ import annotations
 
 import json
-from typing import TYPE_CHECKING, Final, Generic
+from typing import TYPE_CHECKING, Any, Final, Generic, cast
 
 from openai import APIConnectionError, InternalServerError, RateLimitError
 
@@ -44,44 +44,48 @@ class OpenAIRateLimiter(
             limiter: Limiter,
             encoder: Encoding,
             *,
+            reserve_output_tokens: bool = False,
+            max_tokens: int | None = None,
             events: LLMEvents | None = None,
     ):
         """Create a new BaseRateLimitLLM."""
-        print()
-        print("fnllm/openai/llm/services/rate_limiter.py OpenAIRateLimiter.__init__() start...")
-        print(
-            "fnllm/openai/llm/services/rate_limiter.py OpenAIRateLimiter.__init__() invoke super().__init__() start...")
         super().__init__(
             limiter,
+            reserve_output_tokens=reserve_output_tokens,
             events=events,
         )
-        print("fnllm/openai/llm/services/rate_limiter.py OpenAIRateLimiter.__init__() invoke super().__init__() end...")
 
         self._encoding = encoder
-        print("fnllm/openai/llm/services/rate_limiter.py OpenAIRateLimiter.__init__() end...")
-        print()
+        self._max_tokens = max_tokens
 
     def _estimate_request_tokens(
             self,
             prompt: TInput,
             kwargs: LLMInput[TJsonModel, THistoryEntry, TModelParameters],
     ) -> int:
-        print("fnllm/openai/llm/services/rate_limiter.py OpenAIRateLimiter._estimate_request_tokens() start...")
-        print(f"fnllm/openai/llm/services/rate_limiter.py OpenAIRateLimiter._estimate_request_tokens() {prompt=}")
-        print(f"fnllm/openai/llm/services/rate_limiter.py OpenAIRateLimiter._estimate_request_tokens() {kwargs=}")
         history = kwargs.get("history", [])
 
-        print(
-            f"fnllm/openai/llm/services/rate_limiter.py OpenAIRateLimiter._estimate_request_tokens() invoke llm_tools_to_param() start...")
         tools = llm_tools_to_param(kwargs.get("tools", []))
-        print(
-            f"fnllm/openai/llm/services/rate_limiter.py OpenAIRateLimiter._estimate_request_tokens() invoke llm_tools_to_param() end...")
 
-        print(f"fnllm/openai/llm/services/rate_limiter.py OpenAIRateLimiter._estimate_request_tokens() {tools=}")
         tokens_usage = sum(
             len(self._encoding.encode(json.dumps(entry)))
             for entry in (*history, *tools, prompt)
         )
-        print(
-            f"fnllm/openai/llm/services/rate_limiter.py OpenAIRateLimiter._estimate_request_tokens() return {tokens_usage=}")
         return tokens_usage
+
+    def _estimate_output_tokens(
+            self,
+            prompt: TInput,
+            kwargs: LLMInput[TJsonModel, THistoryEntry, TModelParameters],
+    ) -> int:
+        """Reserve `max_completion_tokens`/`max_tokens` when set, otherwise fall back to the learned estimate."""
+        model_parameters = cast(dict[str, Any], kwargs.get("model_parameters") or {})
+        max_tokens = (
+            model_parameters.get("max_completion_tokens")
+            or model_parameters.get("max_tokens")
+            or self._max_tokens
+        )
+        if max_tokens:
+            return max_tokens
+
+        return super()._estimate_output_tokens(prompt, kwargs)
@@ -4,16 +4,27 @@
 
 from __future__ import annotations
 
-import asyncio
+import re
+from contextlib import suppress
+from datetime import datetime
+from email.utils import parsedate_to_datetime
 from typing import TYPE_CHECKING, Final, Generic
 
-from openai import APIConnectionError, InternalServerError, RateLimitError
+from openai import (
+    APIConnectionError,
+    APIStatusError,
+    InternalServerError,
+    RateLimitError,
+)
 
 from fnllm.services.retryer import Retryer
 from fnllm.types.generics import THistoryEntry, TInput, TModelParameters, TOutput
 
 if TYPE_CHECKING:
+    import httpx
+
     from fnllm.events.base import LLMEvents
+    from fnllm.services.retry_budget import RetryBudget
 
 OPENAI_RETRYABLE_ERRORS: Final[list[type[Exception]]] = [
     RateLimitError,
@@ -21,6 +32,10 @@ OPENAI_RETRYABLE_ERRORS: Final[list[type[Exception]]] = [
     InternalServerError,
 ]
 
+_PLEASE_RETRY_AFTER_MSG: Final = re.compile(
+    r"Rate limit is exceeded\. Try again in (\d+(?:\.\d+)?) second"
+)
+
 
 class OpenAIRetryer(
     Retryer[TInput, TOutput, THistoryEntry, TModelParameters],
@@ -34,67 +49,63 @@ class OpenAIRetryer(
             tag: str = "OpenAIRetryingLLM",
             max_retries: int = 10,
             max_retry_wait: float = 10,
-            sleep_on_rate_limit_recommendation: bool = False,
+            sleep_on_rate_limit_recommendation: bool = True,
+            retry_budget: RetryBudget | None = None,
             events: LLMEvents | None = None,
     ):
         """Create a new BaseRateLimitLLM."""
-        print()
-        print("fnllm/openai/llm/services/retryer.py OpenAIRetryer.__init__() start...")
-        print("fnllm/openai/llm/services/retryer.py OpenAIRetryer.__init__() invoke super().__init__() start...")
         super().__init__(
             retryable_errors=OPENAI_RETRYABLE_ERRORS,
             tag=tag,
             max_retries=max_retries,
             max_retry_wait=max_retry_wait,
+            retry_budget=retry_budget,
             events=events,
         )
-        print("fnllm/openai/llm/services/retryer.py OpenAIRetryer.__init__() invoke super().__init__() end...")
 
         self._sleep_on_rate_limit_recommendation = sleep_on_rate_limit_recommendation
-        print("fnllm/openai/llm/services/retryer.py OpenAIRetryer.__init__() end...")
-        print()
 
     async def _on_retryable_error(self, error: BaseException) -> None:
-        print()
-        print("fnllm/openai/llm/services/retryer.py OpenAIRetryer._on_retryable_error() start...")
-        print(
-            f"fnllm/openai/llm/services/retryer.py OpenAIRetryer._on_retryable_error() invoke self._extract_sleep_recommendation({error=}) start...")
-        sleep_recommendation = self._extract_sleep_recommendation(error)
-        print(
-            f"fnllm/openai/llm/services/retryer.py OpenAIRetryer._on_retryable_error() invoke self._extract_sleep_recommendation({error=}) end...")
-        if sleep_recommendation > 0:
-            print(
-                f"fnllm/openai/llm/services/retryer.py OpenAIRetryer._on_retryable_error() invoke asyncio.sleep({sleep_recommendation=}) end...")
-            await asyncio.sleep(sleep_recommendation)
-            print(
-                f"fnllm/openai/llm/services/retryer.py OpenAIRetryer._on_retryable_error() invoke asyncio.sleep({sleep_recommendation=}) end...")
-
-        print("fnllm/openai/llm/services/retryer.py OpenAIRetryer._on_retryable_error() end...")
-
-    def _extract_sleep_recommendation(self, error: BaseException) -> float:
-        """Extract the sleep time value from a RateLimitError. This is usually only available in Azure."""
-        print("fnllm/openai/llm/services/retryer.py OpenAIRetryer._extract_sleep_recommendation() start...")
-        please_retry_after_msg: Final = "Rate limit is exceeded. Try again in "
-
-        print(f"fnllm/openai/llm/services/retryer.py OpenAIRetryer._extract_sleep_recommendation() {error=}")
-        print(
-            f"fnllm/openai/llm/services/retryer.py OpenAIRetryer._extract_sleep_recommendation() {self._sleep_on_rate_limit_recommendation=}")
+        """Do nothing, the recommended delay is applied by the retry wait."""
+
+    def _retry_after(self, error: BaseException) -> float | None:
+        """Get the delay recommended by the service, preferring the response headers."""
         if not self._sleep_on_rate_limit_recommendation:
-            print(f"fnllm/openai/llm/services/retryer.py OpenAIRetryer._extract_sleep_recommendation() return 0...")
-            return 0
+            return None
+
+        if isinstance(error, APIStatusError):
+            retry_after = _parse_retry_after(error.response.headers)
+            if retry_after is not None:
+                return retry_after
 
-        error_str = str(error)
+        return self._extract_sleep_recommendation(error)
 
-        if (
-                not isinstance(error, RateLimitError)
-                or please_retry_after_msg not in error_str
-        ):
-            print(f"fnllm/openai/llm/services/retryer.py OpenAIRetryer._extract_sleep_recommendation() return 0...")
-            return 0
+    def _extract_sleep_recommendation(self, error: BaseException) -> float | None:
+        """Extract the sleep time value from a RateLimitError message. This is usually only available in Azure."""
+        if not isinstance(error, RateLimitError):
+            return None
 
         # could be second or seconds
-        print(
-            f"fnllm/openai/llm/services/retryer.py OpenAIRetryer._extract_sleep_recommendation() {please_retry_after_msg=}")
-        print(
-            "fnllm/openai/llm/services/retryer.py OpenAIRetryer._extract_sleep_recommendation() return int(error_str.split(please_retry_after_msg)[1].split(' second')[0])...")
-        return int(error_str.split(please_retry_after_msg)[1].split(" second")[0])
+        match = _PLEASE_RETRY_AFTER_MSG.search(str(error))
+        return float(match.group(1)) if match else None
+
+
+def _parse_retry_after(headers: httpx.Headers) -> float | None:
+    """Parse the `retry-after-ms` or `retry-after` (seconds or HTTP date) header."""
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms is not None:
+        with suppress(ValueError):
+            return max(0.0, float(retry_after_ms) / 1000)
+
+    retry_after = headers.get("retry-after")
+    if retry_after is None:
+        return None
+
+    with suppress(ValueError):
+        return max(0.0, float(retry_after))
+
+    with suppress(TypeError, ValueError):
+        retry_at = parsedate_to_datetime(retry_after)
+        return max(0.0, (retry_at - datetime.now(retry_at.tzinfo)).total_seconds())
+
+    return None
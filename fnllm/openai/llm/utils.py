@@ -6,6 +6,8 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING, cast
 
+from openai import NOT_GIVEN, NotGiven
+
 from fnllm.openai.types.aliases import (
     OpenAIChatCompletionAssistantMessageParam,
     OpenAIChatCompletionMessageModel,
@@ -20,6 +22,7 @@ from fnllm.openai.types.aliases import (
     OpenAIFunctionParam,
 )
 from fnllm.openai.types.chat.io import OpenAIChatCompletionInput, OpenAIChatHistoryEntry
+from fnllm.utils.deadline import remaining_time
 
 if TYPE_CHECKING:
     from collections.abc import Iterable, Sequence
@@ -31,8 +34,6 @@ def function_call_to_param(
         func: OpenAIFunctionCallModel | None,
 ) -> OpenAIFunctionCallParam | None:
     """Parses FunctionCall base model to the equivalent typed dict."""
-    print("function_call_to_param() start...")
-    print(f"{func=}")
     if not func:
         return None
 
@@ -75,10 +76,6 @@ def llm_tools_to_param(
         tools: Sequence[type[LLMTool]],
 ) -> Iterable[OpenAIChatCompletionToolParam]:
     """Parses a list of classes that implements LLMTool to the equivalent typed dicts."""
-    print()
-    print("fnllm/openai/llm/utils.py llm_tools_to_param() start...")
-    print("fnllm/openai/llm/utils.py llm_tools_to_param() return OpenAIChatCompletionToolParam()...")
-    print()
     return [
         OpenAIChatCompletionToolParam(
             function=llm_tool_to_param(tool),
@@ -92,8 +89,6 @@ def chat_completion_message_to_param(
         message: OpenAIChatCompletionMessageModel,
 ) -> OpenAIChatCompletionAssistantMessageParam:
     """Parses ChatCompletionMessage base model to the equivalent typed dict."""
-    print("fnllm/openai/llm/utils.py chat_completion_message_to_param() start...")
-    print(f"{message=}")
     param = OpenAIChatCompletionAssistantMessageParam(
         role=message.role, content=message.content
     )
@@ -116,8 +111,6 @@ def build_chat_messages(
         history: Sequence[OpenAIChatHistoryEntry],
 ) -> tuple[list[OpenAIChatHistoryEntry], OpenAIChatHistoryEntry]:
     """Builds a chat history list from the prompt and existing history, along with the prompt message."""
-    print()
-    print("fnllm/openai/llm/utils.py build_chat_messages() start...")
     if isinstance(prompt, str):
         prompt = OpenAIChatCompletionUserMessageParam(
             content=prompt,
@@ -127,6 +120,12 @@ def build_chat_messages(
     if prompt is not None:
         messages.append(prompt)
 
-    print("fnllm/openai/llm/utils.py build_chat_messages() return messages, cast(OpenAIChatHistoryEntry, prompt)...")
-    print()
     return messages, cast(OpenAIChatHistoryEntry, prompt)
+
+
+def request_timeout(deadline: float | None) -> float | NotGiven:
+    """Get the HTTP timeout of a request that has to complete before `deadline`."""
+    remaining = remaining_time(deadline)
+    if remaining is None:
+        return NOT_GIVEN
+    return max(remaining, 0)
@@ -5,13 +5,13 @@
 from collections.abc import AsyncIterable, Awaitable, Callable
 from typing import ClassVar, TypeAlias
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import ConfigDict, Field
 
 from fnllm.openai.types.aliases import (
     OpenAIChatCompletionMessageModel,
     OpenAIChatCompletionMessageParam,
 )
-from fnllm.types.generalized import ChatLLMOutput
+from fnllm.types.generalized import ChatLLMOutput, StreamingLLMOutput
 from fnllm.types.metrics import LLMUsageMetrics
 
 OpenAIChatMessageInput: TypeAlias = OpenAIChatCompletionMessageParam
@@ -36,8 +36,11 @@ class OpenAIChatOutput(ChatLLMOutput):
     usage: LLMUsageMetrics | None
     """Usage statistics for the completion request."""
 
+    cache_key: str | None = None
+    """The cache key of the response, if the cache was used."""
 
-class OpenAIStreamingChatOutput(BaseModel, arbitrary_types_allowed=True):
+
+class OpenAIStreamingChatOutput(StreamingLLMOutput, arbitrary_types_allowed=True):
     """Async iterable chat content."""
 
     model_config: ClassVar[ConfigDict] = ConfigDict(arbitrary_types_allowed=True)
@@ -54,5 +57,6 @@ class OpenAIStreamingChatOutput(BaseModel, arbitrary_types_allowed=True):
     content: AsyncIterable[str | None] = Field(exclude=True)
 
     close: Callable[[], Awaitable[None]] = Field(
-        description="Close the underlying iterator", exclude=True
+        description="Close the underlying iterator. Call it when the content is not read to the end (e.g. in a `finally` of a task that may be cancelled) to release the rate limits the stream holds right away.",
+        exclude=True,
     )
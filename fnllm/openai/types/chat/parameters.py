@@ -36,6 +36,8 @@ class OpenAIChatParameters(TypedDict):
 
     logprobs: NotRequired[bool | None]
 
+    max_completion_tokens: NotRequired[int | None]
+
     max_tokens: NotRequired[int | None]
 
     n: NotRequired[int | None]
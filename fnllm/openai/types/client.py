@@ -13,8 +13,7 @@ from typing import (
     runtime_checkable,
 )
 
-# from openai import AsyncAzureOpenAI, AsyncOpenAI
-from langfuse.openai import AsyncAzureOpenAI, AsyncOpenAI
+from openai import AsyncAzureOpenAI, AsyncOpenAI
 from typing_extensions import Unpack
 
 from fnllm.openai.types.chat.io import (
@@ -23,3 +23,6 @@ class OpenAIEmbeddingsOutput(EmbeddingsLLMOutput):
 
     usage: LLMUsageMetrics | None
     """Usage statistics for the embeddings request."""
+
+    cache_key: str | None = None
+    """The cache key of the response, if the cache was used."""
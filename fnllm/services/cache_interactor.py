@@ -8,6 +8,7 @@ from dataclasses import dataclass
 from typing import TYPE_CHECKING, Any, Generic, TypeVar
 
 from fnllm.events.base import LLMEvents
+from fnllm.utils.tracing import TraceLevel, tracer
 
 if TYPE_CHECKING:
     from collections.abc import Awaitable, Callable
@@ -24,6 +25,8 @@ class Cached(Generic[T]):
 
     value: T
     hit: bool
+    key: str | None = None
+    """The cache key of the value, `None` if the cache was not used."""
 
 
 class CacheInteractor:
@@ -62,11 +65,15 @@ class CacheInteractor:
         if cached_value is not None:
             entry = json_model.model_validate(cached_value)
             hit = True
+            if tracer.debug:
+                tracer.emit("cache.hit", TraceLevel.DEBUG, key=key)
             await self._events.on_cache_hit(key, name)
         else:
             entry = await func()
             hit = False
+            if tracer.debug:
+                tracer.emit("cache.miss", TraceLevel.DEBUG, key=key)
             await self._cache.set(key, entry.model_dump(), {"input": key_data})
             await self._events.on_cache_miss(key, name)
 
-        return Cached(value=entry, hit=hit)
+        return Cached(value=entry, hit=hit, key=key)
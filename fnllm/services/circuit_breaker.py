@@ -0,0 +1,236 @@
+# Copyright (c) 2024 Microsoft Corporation.
+
+"""Circuit breaker LLM implementation."""
+
+from __future__ import annotations
+
+import time
+from collections import deque
+from enum import Enum
+from typing import TYPE_CHECKING, Any, Generic
+
+from typing_extensions import Unpack
+
+from fnllm.events.base import LLMEvents
+from fnllm.services.errors import CircuitOpenError
+from fnllm.types.generics import TInput, TJsonModel, TModelParameters
+from fnllm.utils.tracing import tracer
+from .decorator import LLMDecorator, THistoryEntry, TOutput
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Sequence
+
+    from fnllm.types.io import LLMInput, LLMOutput
+
+
+class CircuitState(str, Enum):
+    """States of a circuit."""
+
+    CLOSED = "closed"
+    """Requests go through."""
+
+    OPEN = "open"
+    """Requests fail fast."""
+
+    HALF_OPEN = "half_open"
+    """A single probe request goes through to check whether the service recovered."""
+
+
+class Circuit:
+    """Health of a service (e.g. an endpoint/deployment), shared by the LLMs calling it.
+
+    The circuit opens when at least `failure_rate` of the calls of the last `window` seconds
+    failed (and there were at least `min_calls` of them). After `open_duration` seconds, a
+    single probe call is let through: its success closes the circuit, its failure opens it
+    again.
+    """
+
+    def __init__(
+            self,
+            name: str,
+            *,
+            failure_rate: float = 0.5,
+            min_calls: int = 20,
+            window: float = 30,
+            open_duration: float = 30,
+    ):
+        """Create a new closed Circuit."""
+        self._name = name
+        self._failure_rate = failure_rate
+        self._min_calls = min_calls
+        self._window = window
+        self._open_duration = open_duration
+        self._state = CircuitState.CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        self._changes: list[tuple[CircuitState, CircuitState]] = []
+        # [second, calls, failures] counters, oldest first
+        self._buckets: deque[list[int]] = deque()
+        self._calls = 0
+        self._failures = 0
+
+    @property
+    def name(self) -> str:
+        """The name of the circuit."""
+        return self._name
+
+    @property
+    def state(self) -> CircuitState:
+        """The current state."""
+        return self._state
+
+    def pop_changes(self) -> list[tuple[CircuitState, CircuitState]]:
+        """Get the `(old, new)` state changes since the last call."""
+        changes, self._changes = self._changes, []
+        return changes
+
+    def try_call(self) -> bool:
+        """Check whether a call can go through, claiming the probe when half-open."""
+        if (
+                self._state == CircuitState.OPEN
+                and time.monotonic() - self._opened_at >= self._open_duration
+        ):
+            self._set_state(CircuitState.HALF_OPEN)
+
+        match self._state:
+            case CircuitState.CLOSED:
+                return True
+            case CircuitState.OPEN:
+                return False
+            case CircuitState.HALF_OPEN:
+                if self._probing:
+                    return False
+                self._probing = True
+                return True
+
+    def record(self, *, failed: bool, probe: bool = False) -> None:
+        """Record the outcome of a call let through by `try_call`, `probe` if it was let through half-open."""
+        if probe:
+            self._probing = False
+            if failed:
+                self._open()
+            else:
+                self._close()
+            return
+
+        if self._state != CircuitState.CLOSED:
+            # a call started before the circuit opened
+            return
+
+        bucket = self._bucket()
+        bucket[1] += 1
+        self._calls += 1
+        if failed:
+            bucket[2] += 1
+            self._failures += 1
+
+        if (
+                self._calls >= self._min_calls
+                and self._failures >= self._failure_rate * self._calls
+        ):
+            self._open()
+
+    def abandon(self, *, probe: bool = False) -> None:
+        """Give up a call without outcome (e.g. cancelled), freeing the probe if it was one."""
+        if probe:
+            self._probing = False
+
+    def _open(self) -> None:
+        self._set_state(CircuitState.OPEN)
+        self._opened_at = time.monotonic()
+
+    def _close(self) -> None:
+        self._set_state(CircuitState.CLOSED)
+        self._buckets.clear()
+        self._calls = 0
+        self._failures = 0
+
+    def _set_state(self, state: CircuitState) -> None:
+        if state != self._state:
+            self._changes.append((self._state, state))
+            self._state = state
+
+    def _bucket(self) -> list[int]:
+        now = int(time.monotonic())
+        buckets = self._buckets
+        while buckets and buckets[0][0] <= now - self._window:
+            _, calls, failures = buckets.popleft()
+            self._calls -= calls
+            self._failures -= failures
+
+        if not buckets or buckets[-1][0] != now:
+            buckets.append([now, 0, 0])
+        return buckets[-1]
+
+
+class CircuitBreaker(
+    LLMDecorator[TOutput, THistoryEntry],
+    Generic[TInput, TOutput, THistoryEntry, TModelParameters],
+):
+    """Fails fast with `CircuitOpenError` while the circuit of the service is open.
+
+    Only `failure_errors` (e.g. server and connection errors) count as failures, any other
+    outcome shows the service is answering. The breaker sits between the retryer and the
+    rate limiter, so rejected requests never hold limiter passes and are not retried.
+    """
+
+    def __init__(
+            self,
+            circuit: Circuit,
+            *,
+            failure_errors: Sequence[type[Exception]],
+            events: LLMEvents | None = None,
+    ):
+        """Create a new CircuitBreaker."""
+        self._circuit = circuit
+        self._failure_errors = tuple(failure_errors)
+        self._events = events or LLMEvents()
+
+    @property
+    def circuit(self) -> Circuit:
+        """The circuit of the service."""
+        return self._circuit
+
+    def decorate(
+            self,
+            delegate: Callable[
+                ..., Awaitable[LLMOutput[TOutput, TJsonModel, THistoryEntry]]
+            ],
+    ) -> Callable[..., Awaitable[LLMOutput[TOutput, TJsonModel, THistoryEntry]]]:
+        """Execute the LLM behind the circuit breaker."""
+
+        async def invoke(prompt: TInput, **kwargs: Unpack[LLMInput[Any, Any, Any]]):
+            circuit = self._circuit
+            allowed = circuit.try_call()
+            await self._emit_state_changes()
+            if not allowed:
+                if tracer.info:
+                    tracer.emit("circuit.rejected", circuit=circuit.name)
+                raise CircuitOpenError(kwargs.get("name") or circuit.name, circuit.name)
+            probe = circuit.state == CircuitState.HALF_OPEN
+
+            try:
+                result = await delegate(prompt, **kwargs)
+            except self._failure_errors:
+                circuit.record(failed=True, probe=probe)
+                await self._emit_state_changes()
+                raise
+            except Exception:
+                circuit.record(failed=False, probe=probe)
+                await self._emit_state_changes()
+                raise
+            except BaseException:
+                circuit.abandon(probe=probe)
+                raise
+
+            circuit.record(failed=False, probe=probe)
+            await self._emit_state_changes()
+            return result
+
+        return invoke
+
+    async def _emit_state_changes(self) -> None:
+        for old_state, new_state in self._circuit.pop_changes():
+            await self._events.on_circuit_state_change(
+                self._circuit.name, old_state.value, new_state.value
+            )
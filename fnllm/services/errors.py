@@ -15,5 +15,31 @@ class RetriesExhaustedError(RuntimeError):
         )
 
 
+class DeadlineExceededError(TimeoutError):
+    """Deadline exceeded error."""
+
+    def __init__(self, name: str, stage: str) -> None:
+        """Init method definition."""
+        super().__init__(f"Operation '{name}' missed its deadline while {stage}.")
+
+
+class CircuitOpenError(RuntimeError):
+    """Circuit open error."""
+
+    def __init__(self, name: str, circuit: str) -> None:
+        """Init method definition."""
+        super().__init__(
+            f"Operation '{name}' rejected - circuit '{circuit}' is open."
+        )
+
+
+class BatchRequestError(RuntimeError):
+    """Batch request error."""
+
+    def __init__(self, request_id: str, reason: str) -> None:
+        """Init method definition."""
+        super().__init__(f"Batch request '{request_id}' failed - {reason}.")
+
+
 class FailedToGenerateValidJsonError(RuntimeError):
     """Failed to create valid JSON error."""
@@ -0,0 +1,152 @@
+# Copyright (c) 2024 Microsoft Corporation.
+
+"""Hedged requests LLM implementation."""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+from typing import TYPE_CHECKING, Any, Generic
+
+from typing_extensions import Unpack
+
+from fnllm.types.generics import TInput, TJsonModel, TModelParameters
+from fnllm.utils.deadline import remaining_time
+from fnllm.utils.lru import LRUDict
+from fnllm.utils.rolling_quantile import RollingQuantile
+from fnllm.utils.tracing import tracer
+from .decorator import LLMDecorator, THistoryEntry, TOutput
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+    from fnllm.types.io import LLMInput, LLMOutput
+
+    from .rate_limiter import RateLimiter
+
+
+class Hedger(
+    LLMDecorator[TOutput, THistoryEntry],
+    Generic[TInput, TOutput, THistoryEntry, TModelParameters],
+):
+    """Sends duplicate requests for calls slower than usual and keeps the first success.
+
+    A call still running after the `quantile` latency of its `name` (e.g. p95) gets a
+    duplicate request, up to `max_hedges` per call. The first successful response wins and
+    the other requests are cancelled. Hedging starts once `min_samples` latencies are known.
+    Cache hits are not counted as latencies, and latencies are kept for the `max_names`
+    most recently used names.
+
+    The hedger sits inside the rate limiter, so only the requests are timed (not the wait
+    for the limits) and calls still waiting for the limits are never hedged. Bound to the
+    rate limiter (see `with_rate_limiter`), every duplicate request acquires its own
+    limiter pass for the estimate of its call and is charged like any other request; the
+    requests cancelled once sent are charged their estimated input tokens.
+    """
+
+    def __init__(
+            self,
+            *,
+            tag: str = "HedgingLLM",
+            quantile: float = 0.95,
+            max_hedges: int = 1,
+            min_delay: float = 0,
+            min_samples: int = 20,
+            max_names: int = 1000,
+    ):
+        """Create a new Hedger."""
+        self._tag = tag
+        self._quantile = quantile
+        self._max_hedges = max_hedges
+        self._min_delay = min_delay
+        self._min_samples = min_samples
+        self._latencies = LRUDict[str, RollingQuantile](max_names)
+        self._rate_limiter: RateLimiter[Any, Any, Any, Any] | None = None
+
+    def with_rate_limiter(
+            self, rate_limiter: RateLimiter[Any, Any, Any, Any]
+    ) -> Hedger[TInput, TOutput, THistoryEntry, TModelParameters]:
+        """Create a hedger sharing the same latencies whose duplicate requests are limited by `rate_limiter`."""
+        hedger = copy.copy(self)
+        hedger._rate_limiter = rate_limiter  # noqa: SLF001
+        return hedger
+
+    def hedge_delay(self, name: str) -> float | None:
+        """Get the seconds a call named `name` runs before being hedged, if it is hedged."""
+        latencies = self._latencies.get(name)
+        if latencies is None or len(latencies) < self._min_samples:
+            return None
+
+        latency = latencies.quantile(self._quantile) or 0
+        return max(self._min_delay, latency)
+
+    def decorate(
+            self,
+            delegate: Callable[
+                ..., Awaitable[LLMOutput[TOutput, TJsonModel, THistoryEntry]]
+            ],
+    ) -> Callable[..., Awaitable[LLMOutput[TOutput, TJsonModel, THistoryEntry]]]:
+        """Execute the LLM with hedged requests."""
+        hedge = (
+            self._rate_limiter.decorate(delegate) if self._rate_limiter else delegate
+        )
+
+        async def invoke(prompt: TInput, **kwargs: Unpack[LLMInput[Any, Any, Any]]):
+            name = kwargs.get("name") or self._tag
+            delay = self.hedge_delay(name)
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+
+            primary = asyncio.ensure_future(delegate(prompt, **kwargs))
+            pending = {primary}
+            num_hedges = 0
+            errors: list[BaseException] = []
+            try:
+                while pending:
+                    timeout = None
+                    if delay is not None and num_hedges < self._max_hedges:
+                        timeout = delay
+
+                    done, pending = await asyncio.wait(
+                        pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    if not done:
+                        remaining = remaining_time(kwargs.get("deadline"))
+                        if remaining is not None and remaining <= 0:
+                            # a new request cannot make it anymore
+                            delay = None
+                            continue
+
+                        num_hedges += 1
+                        if tracer.info:
+                            tracer.emit("hedge", delay=delay, hedges=num_hedges)
+                        pending.add(asyncio.ensure_future(hedge(prompt, **kwargs)))
+                        continue
+
+                    for task in done:
+                        task_error = task.exception()
+                        if task_error is None:
+                            result = task.result()
+                            # cache hits report no usage, they say nothing about latency
+                            if result.metrics.usage.total_tokens > 0:
+                                self._latencies.get_or_create(
+                                    name, RollingQuantile
+                                ).insert(loop.time() - start)
+                            result.metrics.retry.num_hedges = num_hedges
+                            return result
+
+                        # keep waiting for the other requests, if any
+                        errors.append(task_error)
+            finally:
+                for task in pending:
+                    task.cancel()
+                # let the cancelled requests release (and charge) their limiter passes
+                await asyncio.gather(*pending, return_exceptions=True)
+                if self._rate_limiter and primary in pending and primary.cancelled():
+                    # the call keeps its pass for the winner, charge the sent primary
+                    # like the hedges charge themselves
+                    await self._rate_limiter.charge_cancelled(prompt, kwargs)
+
+            raise errors[0]
+
+        return invoke
@@ -4,6 +4,10 @@
 
 from __future__ import annotations
 
+import asyncio
+import copy
+import math
+import time
 from abc import abstractmethod
 from typing import TYPE_CHECKING, Any, Generic
 
@@ -11,13 +15,21 @@ from typing_extensions import Unpack
 
 from fnllm.events.base import LLMEvents
 from fnllm.limiting import Limiter, Manifest
+from fnllm.services.errors import DeadlineExceededError
+from fnllm.types.generalized import StreamingLLMOutput
 from fnllm.types.generics import TInput, TJsonModel, TModelParameters
+from fnllm.types.metrics import LLMMetrics, LLMUsageMetrics
+from fnllm.utils.deadline import remaining_time
+from fnllm.utils.lru import LRUDict
+from fnllm.utils.rolling_quantile import RollingQuantile
+from fnllm.utils.tracing import tracer
 from .decorator import LLMDecorator, THistoryEntry, TOutput
 
 if TYPE_CHECKING:
     from collections.abc import Awaitable, Callable
 
     from fnllm.types.io import LLMInput, LLMOutput
+    from fnllm.types.metrics import LLMStreamMetrics
 
 
 class RateLimiter(
@@ -30,15 +42,33 @@ class RateLimiter(
             self,
             limiter: Limiter,
             *,
+            reserve_output_tokens: bool = False,
+            output_tokens_quantile: float = 0.9,
+            max_names: int = 1000,
             events: LLMEvents | None = None,
     ):
         """Create a new BaseRateLimitLLM."""
-        print()
-        print("fnllm/services/rate_limiter.py RateLimiter.__init__() start...")
         self._limiter = limiter
+        self._reserve_output_tokens = reserve_output_tokens
+        self._output_tokens_quantile = output_tokens_quantile
+        # bounded, names are often unique per item
+        self._output_tokens = LRUDict[str, RollingQuantile](max_names)
         self._events = events or LLMEvents()
-        print("fnllm/services/rate_limiter.py RateLimiter.__init__() end...")
-        print()
+        self._tenant = ""
+
+    def child(
+            self, name: str
+    ) -> RateLimiter[TInput, TOutput, THistoryEntry, TModelParameters]:
+        """Create a rate limiter sharing the same limits that accounts requests to the `name` tenant.
+
+        A rate limiter that already belongs to a tenant keeps it.
+        """
+        if self._tenant:
+            return self
+
+        child = copy.copy(self)
+        child._tenant = name  # noqa: SLF001
+        return child
 
     @abstractmethod
     def _estimate_request_tokens(
@@ -48,20 +78,123 @@ class RateLimiter(
     ) -> int:
         """Estimate how many tokens are on the request input."""
 
+    def _estimate_output_tokens(
+            self,
+            prompt: TInput,
+            kwargs: LLMInput[TJsonModel, THistoryEntry, TModelParameters],
+    ) -> int:
+        """Estimate how many tokens the response will use, learned from previous responses with the same name."""
+        history = self._output_tokens.get(kwargs.get("name", ""))
+        estimate = history.quantile(self._output_tokens_quantile) if history else None
+        return math.ceil(estimate or 0)
+
+    def _track_output_tokens(
+            self,
+            kwargs: LLMInput[TJsonModel, THistoryEntry, TModelParameters],
+            metrics: LLMMetrics,
+    ) -> None:
+        usage = metrics.usage
+        # nothing to learn from when no usage was reported (e.g. cache hits or streams,
+        # which are tracked once they end)
+        if usage.total_tokens > 0:
+            self._output_tokens.get_or_create(
+                kwargs.get("name", ""), RollingQuantile
+            ).insert(usage.output_tokens)
+
+    def _request_manifest(
+            self,
+            prompt: TInput,
+            kwargs: LLMInput[TJsonModel, THistoryEntry, TModelParameters],
+    ) -> tuple[Manifest, int, int]:
+        """Build the manifest of a request, with its estimated input and output tokens."""
+        estimated_input_tokens = self._estimate_request_tokens(prompt, kwargs)
+        estimated_output_tokens = (
+            self._estimate_output_tokens(prompt, kwargs)
+            if self._reserve_output_tokens
+            else 0
+        )
+        manifest = Manifest(
+            request_tokens=estimated_input_tokens + estimated_output_tokens,
+            priority=kwargs.get("priority", 0),
+            tenant=kwargs.get("tenant", self._tenant),
+            deadline=kwargs.get("deadline"),
+        )
+        return manifest, estimated_input_tokens, estimated_output_tokens
+
+    def projected_wait(
+            self,
+            prompt: TInput,
+            kwargs: LLMInput[TJsonModel, THistoryEntry, TModelParameters],
+    ) -> float:
+        """Estimate how many seconds the rate limits would delay the request right now.
+
+        Waits for other requests to complete (e.g. for a concurrency slot) are not counted.
+        """
+        manifest, _, _ = self._request_manifest(prompt, kwargs)
+        return self._limiter.rate_delay(manifest)
+
+    def estimate_input_tokens(
+            self,
+            prompt: TInput,
+            kwargs: LLMInput[TJsonModel, THistoryEntry, TModelParameters],
+    ) -> int:
+        """Estimate the input tokens of a request, as acquired from the limits."""
+        return self._estimate_request_tokens(prompt, kwargs)
+
+    async def charge_cancelled(
+            self,
+            prompt: TInput,
+            kwargs: LLMInput[TJsonModel, THistoryEntry, TModelParameters],
+    ) -> None:
+        """Charge the usage (e.g. to the budgets) of a request cancelled once sent, such as a hedge losing the race.
+
+        Its prompt is billed anyway, only its estimated input tokens are known.
+        """
+        await self._charge_cancelled(self.estimate_input_tokens(prompt, kwargs))
+
+    async def _charge_cancelled(self, input_tokens: int) -> None:
+        await self._events.on_usage(LLMUsageMetrics(input_tokens=input_tokens))
+
+    async def _acquire(self, manifest: Manifest, name: str) -> None:
+        """Acquire the limits, giving up as soon as they cannot be acquired before the deadline."""
+        remaining = remaining_time(manifest.deadline)
+        if remaining is None:
+            await self._limiter.acquire(manifest)
+            return
+
+        # waits for concurrency slots are unknown, only give up early on the rate limits
+        if self._limiter.rate_delay(manifest) >= remaining:
+            raise DeadlineExceededError(name, "waiting for rate limits")
+
+        try:
+            await asyncio.wait_for(self._limiter.acquire(manifest), remaining)
+        except asyncio.TimeoutError as error:
+            raise DeadlineExceededError(name, "waiting for rate limits") from error
+
     async def _handle_post_request_limiting(
             self,
-            result: LLMOutput[TOutput, TJsonModel, THistoryEntry],
+            metrics: LLMMetrics,
+            *,
+            priority: int = 0,
+            tenant: str = "",
     ) -> None:
-        print("fnllm/services/rate_limiter.py RateLimiter._handle_post_request_limiting() start...")
-        print(f"RateLimiter._handle_post_request_limiting() {result=}")
-        diff = result.metrics.tokens_diff
-        print(f"RateLimiter._handle_post_request_limiting() {diff=}")
+        diff = metrics.tokens_diff
 
         if diff > 0:
-            manifest = Manifest(post_request_tokens=diff)
+            manifest = Manifest(
+                post_request_tokens=diff, priority=priority, tenant=tenant
+            )
             # consume the token difference
             async with self._limiter.use(manifest):
                 await self._events.on_post_limit(manifest)
+        elif diff < 0 and metrics.usage.total_tokens > 0:
+            # the estimate was too high, give the surplus back. Usage is only
+            # trusted when it is known (e.g. not for cache hits)
+            manifest = Manifest(
+                post_request_tokens=-diff, priority=priority, tenant=tenant
+            )
+            await self._limiter.refund(manifest)
+            await self._events.on_limit_refunded(manifest)
 
     def decorate(
             self,
@@ -70,49 +203,82 @@ class RateLimiter(
             ],
     ) -> Callable[..., Awaitable[LLMOutput[TOutput, TJsonModel, THistoryEntry]]]:
         """Execute the LLM with the configured rate limits."""
-        print("fnllm/services/rate_limiter.py RateLimiter.decorate() start...")
 
         async def invoke(prompt: TInput, **args: Unpack[LLMInput[Any, Any, Any]]):
-            print("fnllm/services/rate_limiter.py RateLimiter.decorate().invoke() start...")
-            print(f"fnllm/services/rate_limiter.py RateLimiter.decorate().invoke() {prompt=}")
-            print(f"fnllm/services/rate_limiter.py RateLimiter.decorate().invoke() {args=}")
-            estimated_input_tokens = self._estimate_request_tokens(prompt, args)
-            print(f"fnllm/services/rate_limiter.py RateLimiter.decorate().invoke() {estimated_input_tokens=}")
-
-            manifest = Manifest(request_tokens=estimated_input_tokens)
-            print(f"fnllm/services/rate_limiter.py RateLimiter.decorate().invoke() {manifest=}")
+            manifest, estimated_input_tokens, estimated_output_tokens = (
+                self._request_manifest(prompt, args)
+            )
             try:
-                print(f"fnllm/services/rate_limiter.py RateLimiter.decorate().invoke() {self._limiter=}")
-                print(
-                    f"fnllm/services/rate_limiter.py RateLimiter.decorate().invoke() run `async with self._limiter.use(manifest)` start...")
-                async with self._limiter.use(manifest):
-                    print(f"fnllm/services/rate_limiter.py RateLimiter.decorate().invoke() {self._events=}")
-                    print(
-                        f"fnllm/services/rate_limiter.py RateLimiter.decorate().invoke() invoke self._events.on_limit_acquired() start...")
-                    await self._events.on_limit_acquired(manifest)
-                    print(
-                        f"fnllm/services/rate_limiter.py RateLimiter.decorate().invoke() invoke self._events.on_limit_acquired() end...")
-                    print(f"fnllm/services/rate_limiter.py RateLimiter.decorate().invoke() invoke delegate() start...")
-                    result = await delegate(prompt, **args)
-                    print(f"fnllm/services/rate_limiter.py RateLimiter.decorate().invoke() invoke delegate() end...")
-                print(
-                    f"fnllm/services/rate_limiter.py RateLimiter.decorate().invoke() run `async with self._limiter.use(manifest)` end...")
-            finally:
-                print(
-                    f"fnllm/services/rate_limiter.py RateLimiter.decorate().invoke() invoke self._events.on_limit_released() start...")
+                wait_start = time.monotonic()
+                await self._acquire(manifest, args.get("name", ""))
+            except BaseException:
                 await self._events.on_limit_released(manifest)
-                print(
-                    f"fnllm/services/rate_limiter.py RateLimiter.decorate().invoke() invoke self._events.on_limit_released() end...")
+                raise
+
+            async def release() -> None:
+                try:
+                    await self._limiter.release(manifest)
+                finally:
+                    await self._events.on_limit_released(manifest)
 
+            try:
+                wait = time.monotonic() - wait_start
+                if tracer.info:
+                    tracer.emit(
+                        "limiter.acquire",
+                        duration=wait,
+                        tokens=manifest.request_tokens,
+                        tenant=manifest.tenant,
+                    )
+                await self._events.on_limit_wait(manifest, wait)
+                await self._events.on_limit_acquired(manifest)
+            except BaseException:
+                await release()
+                raise
+
+            try:
+                request_start = time.monotonic()
+                result = await delegate(prompt, **args)
+            except asyncio.CancelledError:
+                await release()
+                # the limits already hold the estimate
+                await self._charge_cancelled(estimated_input_tokens)
+                raise
+            except BaseException:
+                await release()
+                raise
+
+            result.metrics.request_time = time.monotonic() - request_start
             result.metrics.estimated_input_tokens = estimated_input_tokens
-            print(
-                f"fnllm/services/rate_limiter.py RateLimiter.decorate().invoke() invoke self._handle_post_request_limiting() start...")
-            await self._handle_post_request_limiting(result)
-            print(
-                f"fnllm/services/rate_limiter.py RateLimiter.decorate().invoke() invoke self._handle_post_request_limiting() start...")
+            result.metrics.estimated_output_tokens = estimated_output_tokens
+
+            if isinstance(result.output, StreamingLLMOutput):
+                # the response is still being streamed, hold the limits (e.g. the
+                # concurrency slot) until the stream ends, then charge its usage
+                async def end_stream(stream: LLMStreamMetrics) -> None:
+                    await release()
+                    if stream.usage is None:
+                        return
+
+                    metrics = LLMMetrics(
+                        estimated_input_tokens=estimated_input_tokens,
+                        estimated_output_tokens=estimated_output_tokens,
+                        usage=stream.usage,
+                    )
+                    self._track_output_tokens(args, metrics)
+                    await self._handle_post_request_limiting(
+                        metrics, priority=manifest.priority, tenant=manifest.tenant
+                    )
+
+                result.output.on_stream_end(end_stream)
+                return result
+
+            await release()
+            self._track_output_tokens(args, result.metrics)
+            await self._handle_post_request_limiting(
+                result.metrics, priority=manifest.priority, tenant=manifest.tenant
+            )
 
-            print(f"fnllm/services/rate_limiter.py RateLimiter.decorate().invoke() return {result=}...")
             return result
 
-        print(f"fnllm/services/rate_limiter.py RateLimiter.decorate().invoke() return {invoke=}...")
         return invoke
@@ -0,0 +1,62 @@
+# Copyright (c) 2024 Microsoft Corporation.
+
+"""Retry budget module."""
+
+from __future__ import annotations
+
+import time
+from collections import deque
+
+
+class RetryBudget:
+    """Caps retries to a fraction of the requests made over a sliding time window.
+
+    A retry is allowed while `retries < min_retries + ratio * requests` over the last
+    `window` seconds. During an outage nearly every request fails, and without a budget
+    every one of them would be retried `max_retries` times; with it the extra load stays
+    around `ratio` of the normal traffic. `min_retries` keeps retries possible for callers
+    sending few requests.
+    """
+
+    def __init__(
+            self,
+            ratio: float = 0.1,
+            *,
+            min_retries: int = 10,
+            window: float = 10,
+    ):
+        """Create a new RetryBudget."""
+        self._ratio = ratio
+        self._min_retries = min_retries
+        self._window = window
+        # [second, requests, retries] counters, oldest first
+        self._buckets: deque[list[int]] = deque()
+        self._requests = 0
+        self._retries = 0
+
+    def record_request(self) -> None:
+        """Record a new request (not a retry), which earns `ratio` retries."""
+        self._bucket()[1] += 1
+        self._requests += 1
+
+    def try_retry(self) -> bool:
+        """Spend a retry from the budget, if any is left."""
+        bucket = self._bucket()
+        if self._retries >= self._min_retries + self._ratio * self._requests:
+            return False
+
+        bucket[2] += 1
+        self._retries += 1
+        return True
+
+    def _bucket(self) -> list[int]:
+        now = int(time.monotonic())
+        buckets = self._buckets
+        while buckets and buckets[0][0] <= now - self._window:
+            _, requests, retries = buckets.popleft()
+            self._requests -= requests
+            self._retries -= retries
+
+        if not buckets or buckets[-1][0] != now:
+            buckets.append([now, 0, 0])
+        return buckets[-1]
@@ -10,14 +10,16 @@ from typing import TYPE_CHECKING, Any, Generic
 
 from tenacity import (
     AsyncRetrying,
+    RetryCallState,
     retry_if_exception_type,
     stop_after_attempt,
+    stop_any,
     wait_exponential_jitter,
 )
 from typing_extensions import Unpack
 
 from fnllm.events.base import LLMEvents
-from fnllm.services.errors import RetriesExhaustedError
+from fnllm.services.errors import DeadlineExceededError, RetriesExhaustedError
 from fnllm.types.generics import (
     THistoryEntry,
     TInput,
@@ -26,11 +28,14 @@ from fnllm.types.generics import (
     TOutput,
 )
 from fnllm.types.metrics import LLMRetryMetrics
+from fnllm.utils.deadline import remaining_time
+from fnllm.utils.tracing import tracer
 from .decorator import LLMDecorator
 
 if TYPE_CHECKING:
     from collections.abc import Awaitable, Callable, Sequence
 
+    from fnllm.services.retry_budget import RetryBudget
     from fnllm.types.io import LLMInput, LLMOutput
 
 
@@ -47,23 +52,38 @@ class Retryer(
             tag: str = "RetryingLLM",
             max_retries: int = 10,
             max_retry_wait: float = 10,
+            retry_budget: RetryBudget | None = None,
             events: LLMEvents | None = None,
     ):
-        """Create a new RetryingLLM."""
-        print()
-        print("fnllm/services/retryer.py Retryer.__init__() start...")
+        """Create a new RetryingLLM.
+
+        When a `retry_budget` is given, retries stop as soon as it is spent and the last
+        error is raised as is.
+        """
         self._retryable_errors = retryable_errors
         self._tag = tag
         self._max_retries = max_retries
         self._max_retry_wait = max_retry_wait
+        self._retry_budget = retry_budget
+        self._backoff = wait_exponential_jitter(max=max_retry_wait)
         self._events = events or LLMEvents()
-        print("fnllm/services/retryer.py Retryer.__init__() end...")
-        print()
 
     @abstractmethod
     async def _on_retryable_error(self, error: BaseException) -> None:
         """Called as soon as retryable error happen."""
 
+    def _retry_after(self, error: BaseException) -> float | None:
+        """Get the delay recommended by the service before retrying after `error`, if any."""
+        return None
+
+    def _wait(self, retry_state: RetryCallState) -> float:
+        """Wait as recommended by the service (up to `max_retry_wait`), falling back to exponential backoff."""
+        error = retry_state.outcome.exception() if retry_state.outcome else None
+        retry_after = self._retry_after(error) if error is not None else None
+        if retry_after is None:
+            return self._backoff(retry_state)
+        return min(retry_after, self._max_retry_wait)
+
     def decorate(
             self,
             delegate: Callable[
@@ -73,26 +93,27 @@ class Retryer(
         """Execute the LLM with the configured rate limits."""
 
         async def invoke(prompt: TInput, **kwargs: Unpack[LLMInput[Any, Any, Any]]):
-            print()
-            print("fnllm/services/retryer.py Retryer.decorate().invoke() start...")
             name = kwargs.get("name", self._tag)
+            deadline = kwargs.get("deadline")
+            deadline_reached = False
+            budget_exhausted = False
             attempt_number = 0
             call_times: list[float] = []
 
             async def attempt() -> LLMOutput[TOutput, TJsonModel, THistoryEntry]:
-                print("fnllm/services/retryer.py Retryer.decorate().invoke().attempt() start...")
-                nonlocal call_times
                 call_start = asyncio.get_event_loop().time()
 
                 try:
-                    print(
-                        "fnllm/services/retryer.py Retryer.decorate().invoke().attempt() invoke self._events.on_try() start...")
                     await self._events.on_try(attempt_number)
-                    print("fnllm/services/retryer.py Retryer.decorate().invoke().attempt() return delegate()...")
-                    print()
                     return await delegate(prompt, **kwargs)
                 except BaseException as error:
                     if isinstance(error, tuple(self._retryable_errors)):
+                        if tracer.info:
+                            tracer.emit(
+                                "retry.error",
+                                attempt=attempt_number,
+                                error=type(error).__name__,
+                            )
                         await self._events.on_retryable_error(error, attempt_number)
                         await self._on_retryable_error(error)
                     raise
@@ -100,19 +121,35 @@ class Retryer(
                     call_end = asyncio.get_event_loop().time()
                     call_times.append(call_end - call_start)
 
+            def stop_at_deadline(retry_state: RetryCallState) -> bool:
+                # do not back off past the deadline, the answer would be useless
+                nonlocal deadline_reached
+                remaining = remaining_time(deadline)
+                deadline_reached = (
+                    remaining is not None and retry_state.upcoming_sleep >= remaining
+                )
+                return deadline_reached
+
+            def stop_on_budget(_: RetryCallState) -> bool:
+                # evaluated last, so the budget is only spent on retries that will happen
+                nonlocal budget_exhausted
+                budget_exhausted = (
+                    self._retry_budget is not None and not self._retry_budget.try_retry()
+                )
+                return budget_exhausted
+
             async def execute_with_retry() -> LLMOutput[
                 TOutput, TJsonModel, THistoryEntry
             ]:
-                print("fnllm/services/retryer.py Retryer.decorate().invoke().execute_with_retry() start...")
                 nonlocal attempt_number
                 try:
-                    print(
-                        "fnllm/services/retryer.py Retryer.decorate().invoke().execute_with_retry() return attempt()...")
-                    print()
-
                     async for a in AsyncRetrying(
-                            stop=stop_after_attempt(self._max_retries),
-                            wait=wait_exponential_jitter(max=self._max_retry_wait),
+                            stop=stop_any(
+                                stop_after_attempt(self._max_retries),
+                                stop_at_deadline,
+                                stop_on_budget,
+                            ),
+                            wait=self._wait,
                             reraise=True,
                             retry=retry_if_exception_type(tuple(self._retryable_errors)),
                     ):
@@ -122,32 +159,29 @@ class Retryer(
                 except BaseException as error:
                     if not isinstance(error, tuple(self._retryable_errors)):
                         raise
+                    if deadline_reached:
+                        raise DeadlineExceededError(name, "retrying") from error
+                    if budget_exhausted:
+                        raise
 
                 raise RetriesExhaustedError(name, self._max_retries)
 
+            if self._retry_budget is not None:
+                self._retry_budget.record_request()
+
             start = asyncio.get_event_loop().time()
-            print("fnllm/services/retryer.py Retryer.decorate().invoke() invoke execute_with_retry() start...")
             result = await execute_with_retry()
-            print("fnllm/services/retryer.py Retryer.decorate().invoke() invoke execute_with_retry() end...")
             end = asyncio.get_event_loop().time()
 
-            print("fnllm/services/retryer.py Retryer.decorate().invoke() invoke LLMRetryMetrics() start...")
             result.metrics.retry = LLMRetryMetrics(
                 num_retries=attempt_number - 1,
+                num_hedges=result.metrics.retry.num_hedges,
                 total_time=end - start,
                 call_times=call_times,
             )
-            print(f"fnllm/services/retryer.py Retryer.decorate().invoke() {result.metrics.retry=}")
-            print(f"fnllm/services/retryer.py Retryer.decorate().invoke() invoke LLMRetryMetrics() end...")
 
-            print(f"fnllm/services/retryer.py Retryer.decorate().invoke() invoke self._events.on_success() start...")
             await self._events.on_success(result.metrics)
-            print(f"fnllm/services/retryer.py Retryer.decorate().invoke() invoke self._events.on_success() end...")
 
-            print(f"fnllm/services/retryer.py Retryer.decorate().invoke() {result=}...")
-            print("fnllm/services/retryer.py Retryer.decorate().invoke() return result...")
             return result
 
-        print(f"fnllm/services/retryer.py Retryer.decorate().invoke() {invoke=}...")
-        print("fnllm/services/retryer.py Retryer.decorate().invoke() return invoke...")
         return invoke
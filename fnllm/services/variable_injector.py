@@ -7,6 +7,8 @@ from __future__ import annotations
 from string import Template
 from typing import TYPE_CHECKING, TypeVar, cast
 
+from fnllm.utils.tracing import TraceLevel, tracer
+
 if TYPE_CHECKING:
     from fnllm.types import PromptVariables
 
@@ -20,14 +22,11 @@ class VariableInjector:
             self, prompt: TInput, variables: PromptVariables | None
     ) -> TInput:
         """Call the LLM."""
-        print("fnllm/services/variable_injector.py VariableInjector.inject_variables() start...")
-        print(f"fnllm/services/variable_injector.py {prompt=}")
-        print(f"fnllm/services/variable_injector.py {variables=}")
         parsed_prompt = prompt
 
         if isinstance(parsed_prompt, str) and variables:
             parsed_prompt = Template(parsed_prompt).substitute(**variables)
+            if tracer.debug:
+                tracer.emit("prompt.inject", TraceLevel.DEBUG, prompt=parsed_prompt)
 
-        print(
-            "fnllm/services/variable_injector.py VariableInjector.inject_variables() return cast(TInput, parsed_prompt)...")
         return cast(TInput, parsed_prompt)
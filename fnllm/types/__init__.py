@@ -9,6 +9,8 @@ from .generalized import (
     EmbeddingsLLM,
     EmbeddingsLLMInput,
     EmbeddingsLLMOutput,
+    StreamEndCallback,
+    StreamingLLMOutput,
 )
 from .generics import (
     JSON,
@@ -20,7 +22,12 @@ from .generics import (
     TOutput,
 )
 from .io import LLMInput, LLMOutput
-from .metrics import LLMMetrics, LLMRetryMetrics, LLMUsageMetrics
+from .metrics import (
+    LLMMetrics,
+    LLMRetryMetrics,
+    LLMStreamMetrics,
+    LLMUsageMetrics,
+)
 from .protocol import LLM
 
 __all__ = [
@@ -36,8 +43,11 @@ __all__ = [
     "LLMMetrics",
     "LLMOutput",
     "LLMRetryMetrics",
+    "LLMStreamMetrics",
     "LLMUsageMetrics",
     "PromptVariables",
+    "StreamEndCallback",
+    "StreamingLLMOutput",
     "THistoryEntry",
     "TInput",
     "TJsonModel",
@@ -1,11 +1,13 @@
 # Copyright (c) 2024 Microsoft Corporation.
 """Generalized LLM Types."""
 
+from collections.abc import Awaitable, Callable
 from typing import Any, TypeAlias, TypeVar
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from .generics import THistoryEntry, TModelParameters
+from .metrics import LLMStreamMetrics
 from .protocol import LLM
 
 EmbeddingsLLMInput: TypeAlias = list[str] | str
@@ -46,3 +48,16 @@ TChatInput = TypeVar("TChatInput", bound=ChatLLMInput, covariant=True)
 TChatOutput = TypeVar("TChatOutput", bound=ChatLLMOutput, covariant=True)
 ChatLLM: TypeAlias = LLM[TChatInput, TChatOutput, THistoryEntry, TModelParameters]
 """Generic Completion LLM type alias."""
+
+
+StreamEndCallback: TypeAlias = Callable[[LLMStreamMetrics], Awaitable[None]]
+"""Callback run once a streamed response ends."""
+
+
+class StreamingLLMOutput(BaseModel):
+    """Streamed LLM Output, the response only being complete once the stream ends."""
+
+    on_stream_end: Callable[[StreamEndCallback], None] = Field(
+        description="Register a callback run once the stream ends: read to the end, closed, cancelled or garbage collected",
+        exclude=True,
+    )
@@ -47,6 +47,18 @@ class LLMInput(TypedDict, Generic[TJsonModel, THistoryEntry, TModelParameters]):
     bypass_cache: NotRequired[bool]
     """Bypass the cache (if any) for this LLM invocation."""
 
+    tenant: NotRequired[str]
+    """Tenant the invocation is accounted to for fair sharing and per-tenant limits. Defaults to the child LLM name."""
+
+    timeout: NotRequired[float]
+    """Seconds after which the answer is useless. Converted to a `deadline` that bounds the limiter wait, the retries and the HTTP requests."""
+
+    deadline: NotRequired[float]
+    """The `time.monotonic()` timestamp after which the answer is useless. Set from `timeout` when the LLM is invoked."""
+
+    priority: NotRequired[int]
+    """Scheduling priority when waiting on rate limits, higher is served first (see `fnllm.limiting.Priority`). Defaults to 0."""
+
 
 class LLMOutput(BaseModel, Generic[TOutput, TJsonModel, THistoryEntry]):
     """The output of an LLM invocation."""
@@ -69,6 +81,9 @@ class LLMOutput(BaseModel, Generic[TOutput, TJsonModel, THistoryEntry]):
     metrics: LLMMetrics = Field(default_factory=LLMMetrics)
     """Request/response metrics."""
 
+    model: str | None = None
+    """The model that served the invocation, if known (e.g. a fallback model)."""
+
     @field_serializer("tool_calls")
     def serialize_tool_calls(
             self, tool_calls: list[LLMTool]
@@ -27,6 +27,9 @@ class LLMRetryMetrics(BaseModel):
     num_retries: int = 0
     """Number of times the request was retried."""
 
+    num_hedges: int = 0
+    """Number of duplicate requests sent because the request was slow."""
+
     total_time: float = 0
     """Total time the request took to execute (across all retries)."""
 
@@ -34,20 +37,47 @@ class LLMRetryMetrics(BaseModel):
     """Time taken for each request try."""
 
 
+class LLMStreamMetrics(BaseModel):
+    """Metrics of a streamed response, known once the stream ends."""
+
+    duration: float = 0
+    """Time from the response starting to stream to the stream ending."""
+
+    completed: bool = False
+    """Whether the stream was read to the end, rather than closed, cancelled or garbage collected before."""
+
+    usage: LLMUsageMetrics | None = None
+    """Usage of the stream: the one reported by the LLM, otherwise its output tokens counted locally and its estimated input tokens (None when unknown)."""
+
+    usage_reported: bool = False
+    """Whether the usage was reported by the LLM rather than counted locally."""
+
+
 class LLMMetrics(BaseModel):
     """LLM useful metrics."""
 
     estimated_input_tokens: int = 0
     """Estimated input tokens."""
 
+    estimated_output_tokens: int = 0
+    """Output tokens reserved up front for the response."""
+
     usage: LLMUsageMetrics = Field(default_factory=LLMUsageMetrics)
     """LLM request usage metrics."""
 
     retry: LLMRetryMetrics = Field(default_factory=LLMRetryMetrics)
     """LLM retry metrics."""
 
+    stream: LLMStreamMetrics | None = None
+    """Metrics of the streamed response, set once the stream ends."""
+
+    request_time: float = 0
+    """Time the successful request took, without the waits for the limits nor the retries (set by the rate limiter)."""
+
     @computed_field()
     @property
     def tokens_diff(self) -> int:
-        """Difference between the estimated tokens and the real total token usage."""
-        return self.usage.total_tokens - self.estimated_input_tokens
+        """Difference between the estimated (input and reserved output) tokens and the real total token usage."""
+        return self.usage.total_tokens - (
+            self.estimated_input_tokens + self.estimated_output_tokens
+        )
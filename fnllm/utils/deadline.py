@@ -0,0 +1,42 @@
+# Copyright (c) 2024 Microsoft Corporation.
+
+"""Helpers for per-request deadlines.
+
+Deadlines are `time.monotonic()` timestamps, so wall clock changes (e.g. NTP steps) do not
+expire them early or extend them.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from fnllm.types.io import LLMInput
+
+
+def deadline_from_timeout(timeout: float) -> float:
+    """Get the deadline (a `time.monotonic()` timestamp) `timeout` seconds from now."""
+    return time.monotonic() + timeout
+
+
+def remaining_time(deadline: float | None) -> float | None:
+    """Seconds left until `deadline`, or `None` when there is no deadline."""
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def resolve_timeout(kwargs: LLMInput[Any, Any, Any]) -> LLMInput[Any, Any, Any]:
+    """Turn the `timeout` of the LLM input into a `deadline`, keeping the earliest one.
+
+    Callers trying several LLMs for one call (e.g. fallbacks) resolve it once up front, so
+    every attempt shares the same deadline instead of restarting the timeout.
+    """
+    if "timeout" not in kwargs:
+        return kwargs
+
+    kwargs = kwargs.copy()
+    deadline = deadline_from_timeout(kwargs.pop("timeout"))
+    kwargs["deadline"] = min(deadline, kwargs.get("deadline", deadline))
+    return kwargs
@@ -0,0 +1,37 @@
+# Copyright (c) 2024 Microsoft Corporation.
+
+"""Lazy exports of packages, importing their modules on first use."""
+
+from __future__ import annotations
+
+import importlib
+import sys
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+def lazy_exports(
+        package: str, exports: dict[str, str]
+) -> tuple[Callable[[str], Any], Callable[[], list[str]]]:
+    """Create the module `__getattr__` and `__dir__` of a package exporting `exports` lazily.
+
+    `exports` maps every exported name to the module (relative to `package`) defining it,
+    the module is only imported when the name is first accessed.
+    """
+
+    def __getattr__(name: str) -> Any:  # noqa: N807
+        module = exports.get(name)
+        if module is None:
+            msg = f"module {package!r} has no attribute {name!r}"
+            raise AttributeError(msg)
+        value = getattr(importlib.import_module(module, package), name)
+        # cache it on the package, so next accesses skip __getattr__
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__() -> list[str]:  # noqa: N807
+        return sorted({*vars(sys.modules[package]), *exports})
+
+    return __getattr__, __dir__
@@ -0,0 +1,55 @@
+# Copyright (c) 2024 Microsoft Corporation.
+
+"""Implementation of a size bounded mapping evicting the least recently used entries."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Generic, TypeVar
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+
+class LRUDict(Generic[K, V]):
+    """Keeps the `max_size` most recently used entries, e.g. per-name statistics when names are unique per item."""
+
+    def __init__(self, max_size: int = 1000):
+        """Create a new LRUDict keeping up to `max_size` entries."""
+        self._max_size = max_size
+        self._entries: OrderedDict[K, V] = OrderedDict()
+
+    def __len__(self) -> int:
+        """Number of entries currently kept."""
+        return len(self._entries)
+
+    def __contains__(self, key: K) -> bool:
+        """Check whether an entry is kept, without marking it as used."""
+        return key in self._entries
+
+    def __iter__(self) -> Iterator[K]:
+        """Iterate over the keys, least recently used first."""
+        return iter(self._entries)
+
+    def get(self, key: K) -> V | None:
+        """Get an entry, marking it as used."""
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    def get_or_create(self, key: K, factory: Callable[[], V]) -> V:
+        """Get an entry, creating it with `factory` (and evicting the least recently used one when full) if missing."""
+        value = self.get(key)
+        if value is None:
+            value = self._entries[key] = factory()
+            if len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+        return value
+
+    def pop(self, key: K) -> V | None:
+        """Remove an entry, returning it if it was kept."""
+        return self._entries.pop(key, None)
@@ -0,0 +1,36 @@
+# Copyright (c) 2024 Microsoft Corporation.
+
+"""Implementation of a rolling quantile over the most recent values."""
+
+from __future__ import annotations
+
+import math
+from collections import deque
+
+
+class RollingQuantile:
+    """Tracks quantiles (e.g. p90) over the last `size` inserted values."""
+
+    def __init__(self, size: int = 256):
+        """Create a new rolling quantile that keeps the last `size` values."""
+        self._values = deque[float](maxlen=size)
+
+    def __len__(self) -> int:
+        """Number of values currently tracked."""
+        return len(self._values)
+
+    def insert(self, value: float) -> None:
+        """Insert a new value, evicting the oldest one if the window is full."""
+        self._values.append(value)
+
+    def quantile(self, q: float) -> float | None:
+        """Get the `q` quantile (`0 <= q <= 1`) of the tracked values using the nearest-rank method.
+
+        Returns `None` when no values have been inserted yet.
+        """
+        if not self._values:
+            return None
+
+        values = sorted(self._values)
+        rank = max(1, math.ceil(q * len(values)))
+        return values[rank - 1]
@@ -0,0 +1,220 @@
+# Copyright (c) 2024 Microsoft Corporation.
+
+"""Structured tracing of the LLM invocations."""
+
+from __future__ import annotations
+
+import itertools
+import logging
+import os
+import time
+from collections.abc import Callable
+from contextlib import AbstractContextManager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import TYPE_CHECKING, Any, TypeAlias
+
+if TYPE_CHECKING:
+    from types import TracebackType
+
+_log = logging.getLogger("fnllm.trace")
+
+
+class TraceLevel(IntEnum):
+    """Trace levels, matching the `logging` ones."""
+
+    DEBUG = logging.DEBUG
+    """Every stage, with the payloads (prompts, parameters, responses)."""
+
+    INFO = logging.INFO
+    """The main stages of the invocations (call, limiter wait, request, retries)."""
+
+
+@dataclass(frozen=True)
+class TraceRecord:
+    """A traced stage of an LLM invocation."""
+
+    stage: str
+    """The stage, e.g. `limiter.acquire`."""
+
+    level: TraceLevel
+    """The level of the record."""
+
+    call_id: int | None
+    """The id of the LLM invocation the stage belongs to, if any."""
+
+    timestamp: float
+    """The `time.time()` the stage ended (or happened, for events)."""
+
+    duration: float | None = None
+    """The seconds the stage took, `None` for events."""
+
+    fields: dict[str, Any] = field(default_factory=dict)
+    """Stage specific data."""
+
+    def __str__(self) -> str:
+        """Format the record, only when a sink prints it."""
+        duration = f" {self.duration * 1e3:.2f}ms" if self.duration is not None else ""
+        fields = "".join(f" {key}={value!r}" for key, value in self.fields.items())
+        return f"[call {self.call_id}] {self.stage}{duration}{fields}"
+
+
+TraceSink: TypeAlias = Callable[[TraceRecord], None]
+"""Receives the trace records."""
+
+
+def log_sink(record: TraceRecord) -> None:
+    """Log the record to the `fnllm.trace` logger, formatting it lazily."""
+    _log.log(record.level, "%s", record)
+
+
+_call_ids = itertools.count(1)
+_call_id: ContextVar[int | None] = ContextVar("fnllm_trace_call_id", default=None)
+
+
+class _Span:
+    __slots__ = ("_fields", "_level", "_stage", "_start", "_tracer")
+
+    def __init__(
+            self, tracer: Tracer, stage: str, level: TraceLevel, fields: dict[str, Any]
+    ):
+        self._tracer = tracer
+        self._stage = stage
+        self._level = level
+        self._fields = fields
+        self._start = 0.0
+
+    def set(self, **fields: Any) -> None:
+        """Add fields to the record of the span."""
+        self._fields.update(fields)
+
+    def __enter__(self) -> _Span:
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(
+            self,
+            exc_type: type[BaseException] | None,
+            exc_value: BaseException | None,
+            traceback: TracebackType | None,
+    ) -> None:
+        if exc_type is not None:
+            self._fields["error"] = exc_type.__name__
+        self._tracer.emit(
+            self._stage,
+            self._level,
+            duration=time.perf_counter() - self._start,
+            **self._fields,
+        )
+
+
+class _CallSpan(_Span):
+    __slots__ = ("_token",)
+
+    def __enter__(self) -> _Span:
+        self._token = _call_id.set(next(_call_ids))
+        return super().__enter__()
+
+    def __exit__(
+            self,
+            exc_type: type[BaseException] | None,
+            exc_value: BaseException | None,
+            traceback: TracebackType | None,
+    ) -> None:
+        super().__exit__(exc_type, exc_value, traceback)
+        _call_id.reset(self._token)
+
+
+class _NullSpan(nullcontext):
+    def set(self, **fields: Any) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """Emits structured trace records of the LLM invocations to the sinks.
+
+    Tracing is off unless configured (or enabled with the `FNLLM_TRACE=info|debug`
+    environment variable). The `info` and `debug` flags are plain attributes, call sites
+    check them before building any record, so disabled tracing costs a single attribute
+    read and never formats anything.
+    """
+
+    def __init__(self):
+        """Create a new, disabled Tracer."""
+        self.info = False
+        self.debug = False
+        self._level: TraceLevel | None = None
+        self._sinks: list[TraceSink] = []
+
+    @property
+    def level(self) -> TraceLevel | None:
+        """The lowest level traced, `None` when tracing is off."""
+        return self._level
+
+    def configure(
+            self,
+            level: TraceLevel | str | None,
+            *,
+            sinks: list[TraceSink] | None = None,
+    ) -> None:
+        """Trace the stages of `level` and above to `sinks` (the `fnllm.trace` logger by default), `None` turns tracing off."""
+        if isinstance(level, str):
+            level = TraceLevel[level.upper()]
+        self._level = level
+        self._sinks = list(sinks) if sinks is not None else [log_sink]
+        self.info = level is not None
+        self.debug = level == TraceLevel.DEBUG
+
+    def call(self, stage: str, **fields: Any) -> AbstractContextManager[Any]:
+        """Trace an LLM invocation, giving it (and the tasks it starts) a new call id."""
+        if self._level is None:
+            return _NULL_SPAN
+        return _CallSpan(self, stage, TraceLevel.INFO, fields)
+
+    def span(
+            self, stage: str, level: TraceLevel = TraceLevel.INFO, **fields: Any
+    ) -> AbstractContextManager[Any]:
+        """Trace the duration of a stage, a shared no-op context when not traced."""
+        if self._level is None or level < self._level:
+            return _NULL_SPAN
+        return _Span(self, stage, level, fields)
+
+    def emit(
+            self,
+            stage: str,
+            level: TraceLevel = TraceLevel.INFO,
+            *,
+            duration: float | None = None,
+            **fields: Any,
+    ) -> None:
+        """Trace a stage (or an event, without duration)."""
+        if self._level is None or level < self._level:
+            return
+        record = TraceRecord(
+            stage=stage,
+            level=level,
+            call_id=_call_id.get(),
+            timestamp=time.time(),
+            duration=duration,
+            fields=fields,
+        )
+        for sink in self._sinks:
+            sink(record)
+
+
+tracer = Tracer()
+"""The process-wide tracer."""
+
+if os.environ.get("FNLLM_TRACE", "").upper() in TraceLevel.__members__:
+    tracer.configure(os.environ["FNLLM_TRACE"])
+
+
+def configure_tracing(
+        level: TraceLevel | str | None, *, sinks: list[TraceSink] | None = None
+) -> None:
+    """Configure the process-wide tracer, see `Tracer.configure`."""
+    tracer.configure(level, sinks=sinks)
@@ -8,7 +8,7 @@ from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 
 # from fnllm.oci_genai import PublicOCIGenAIConfig, create_oci_genai_client, create_oci_genai_chat_llm, \
 #     create_oci_genai_embeddings_llm
-from fnllm.openai import create_openai_client, create_openai_chat_llm, PublicOpenAIConfig, create_openai_embeddings_llm
+from fnllm.openai import PublicOpenAIConfig, openai_llm_registry
 
 # read local .env file
 load_dotenv(find_dotenv())
@@ -83,17 +83,11 @@ async def openai_chat(message, history):
     print(f"main.py openai_chat() {configuration=}")
     print("main.py openai_chat() invoke PublicOpenAIConfig() end...")
 
-    print("main.py openai_chat() invoke create_openai_client() start...")
-    client = create_openai_client(configuration)
-    print("main.py openai_chat() invoke create_openai_client() end...")
-
-    print("main.py openai_chat() invoke create_openai_chat_llm() start...")
-    openai_chat_llm = create_openai_chat_llm(
-        configuration,
-        client=client,
-    )
+    # the client and LLM are built on the first message and reused by the next ones
+    print("main.py openai_chat() invoke openai_llm_registry.chat_llm() start...")
+    openai_chat_llm = openai_llm_registry.chat_llm(configuration)
     print(f"main.py openai_chat() {openai_chat_llm=}")
-    print("main.py openai_chat() invoke create_openai_chat_llm() end...")
+    print("main.py openai_chat() invoke openai_llm_registry.chat_llm() end...")
 
     # print("main.py openai_chat() invoke openai_chat_llm() start...")
     # response = await openai_chat_llm(
@@ -162,16 +156,8 @@ async def openai_embedding(message, history):
     print(f"{configuration=}")
     print("create configuration end...")
 
-    print("create client start...")
-    client = create_openai_client(configuration)
-    print(f"{client=}")
-    print("create client end...")
-
     print("create openai_embeddings_llm start...")
-    openai_embeddings_llm = create_openai_embeddings_llm(
-        configuration,
-        client=client,
-    )
+    openai_embeddings_llm = openai_llm_registry.embeddings_llm(configuration)
     print(f"{openai_embeddings_llm=}")
     print("create openai_embeddings_llm end...")
 